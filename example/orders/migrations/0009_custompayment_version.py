@@ -0,0 +1,22 @@
+# Generated by Django 6.0.9 on 2026-10-18 02:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('orders', '0008_alter_custompayment_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='custompayment',
+            name='version',
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text='Incremented on every save; used for optimistic locking.',
+                verbose_name='version',
+            ),
+        ),
+    ]
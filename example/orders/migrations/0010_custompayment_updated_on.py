@@ -0,0 +1,17 @@
+# Generated by Django 6.0.9 on 2026-10-18 03:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('orders', '0009_custompayment_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='custompayment',
+            name='updated_on',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+    ]
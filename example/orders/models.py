@@ -49,3 +49,4 @@ class CustomPayment(AbstractPayment):
     """
 
     custom = models.BooleanField(default=True, editable=False)
+    updated_on = models.DateTimeField(auto_now=True, null=True)
@@ -1,3 +1,5 @@
+import copy
+import functools
 import logging
 import uuid
 from decimal import Decimal
@@ -27,7 +29,11 @@ from getpaid.flow_adapter import (
     _get_processor,
     prepare_transaction,
 )
-from getpaid.repository import DjangoPaymentRepository
+from getpaid.operations import two_phase_enabled
+from getpaid.repository import (
+    DjangoPaymentRepository,
+    optimistic_locking_enabled,
+)
 from getpaid.types import (
     FRAUD_STATUS_CHOICES,
     PAYMENT_STATUS_CHOICES,
@@ -40,6 +46,21 @@ from getpaid.types import (
 logger = logging.getLogger(__name__)
 
 
+def _gateway_atomic(method):
+    """Run a gateway operation in ``atomic()``, unless two-phase
+    operations are enabled and the adapter manages its own transactions.
+    """
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if two_phase_enabled():
+            return method(*args, **kwargs)
+        with atomic():
+            return method(*args, **kwargs)
+
+    return wrapper
+
+
 class AbstractOrder(models.Model):
     """Base class for Order models.
 
@@ -186,6 +207,12 @@ class AbstractPayment(models.Model):
     provider_data = models.JSONField(
         _('provider data'), default=dict, blank=True
     )
+    version = models.PositiveIntegerField(
+        _('version'),
+        default=0,
+        editable=False,
+        help_text=_('Incremented on every save; used for optimistic locking.'),
+    )
 
     class Meta:
         abstract = True
@@ -207,9 +234,63 @@ class AbstractPayment(models.Model):
         super().clean()
         self._normalize_external_id()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._take_snapshot()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(
+            using=using, fields=fields, from_queryset=from_queryset
+        )
+        snapshot = self.__dict__.get('_loaded_values')
+        if fields is None or snapshot is None:
+            self._take_snapshot()
+            return
+        # Only the refreshed fields are clean again; other local changes
+        # must still be saved.
+        for name in fields:
+            attname = self._meta.get_field(name).attname
+            snapshot[attname] = _snapshot_value(getattr(self, attname))
+
     def save(self, *args, **kwargs):
         self._normalize_external_id()
+        if not self._state.adding:
+            self.version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version'}
         super().save(*args, **kwargs)
+        self._take_snapshot()
+
+    def get_dirty_fields(self) -> list[str] | None:
+        """Return names of fields changed since the payment was loaded.
+
+        Returns ``None`` when no snapshot exists (the payment was never
+        loaded or saved), meaning every field must be written.
+        """
+        snapshot = self.__dict__.get('_loaded_values')
+        if snapshot is None:
+            return None
+        dirty = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname not in self.__dict__:
+                continue
+            if (
+                field.attname not in snapshot
+                or getattr(self, field.attname) != snapshot[field.attname]
+            ):
+                dirty.append(field.name)
+        return dirty
+
+    def _take_snapshot(self) -> None:
+        # JSON values are deep-copied so in-place edits show up as changes.
+        self._loaded_values = {
+            field.attname: _snapshot_value(self.__dict__[field.attname])
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
 
     def _normalize_external_id(self) -> None:
         """Normalize empty external_id to None.
@@ -298,11 +379,17 @@ class AbstractPayment(models.Model):
     def fetch_status(self):
         return DjangoPaymentFlowAdapter(self, type(self)).fetch_status()
 
-    @atomic
+    @_gateway_atomic
     def fetch_and_update_status(self):
         # Row-level lock so concurrent status updates (e.g. a webhook
-        # arriving while a PULL status check runs) are serialized.
-        if self.pk is not None:
+        # arriving while a PULL status check runs) are serialized. With
+        # optimistic locking the versioned save detects them instead; in
+        # two-phase mode the adapter locks only around the update.
+        if (
+            self.pk is not None
+            and not optimistic_locking_enabled()
+            and not two_phase_enabled()
+        ):
             list(
                 type(self)
                 ._default_manager.select_for_update()
@@ -378,7 +465,7 @@ class AbstractPayment(models.Model):
             data['message'] = result.content
         return data  # ty: ignore[invalid-return-type]
 
-    @atomic
+    @_gateway_atomic
     def charge(
         self,
         amount: Decimal | float | int | None = None,
@@ -389,13 +476,13 @@ class AbstractPayment(models.Model):
             **kwargs,
         )
 
-    @atomic
+    @_gateway_atomic
     def release_lock(self, **kwargs):
         return DjangoPaymentFlowAdapter(self, type(self)).release_lock(
             **kwargs
         )
 
-    @atomic
+    @_gateway_atomic
     def start_refund(
         self,
         amount: Decimal | float | int | None = None,
@@ -406,13 +493,19 @@ class AbstractPayment(models.Model):
             **kwargs,
         )
 
-    @atomic
+    @_gateway_atomic
     def cancel_refund(self, **kwargs):
         return DjangoPaymentFlowAdapter(self, type(self)).cancel_refund(
             **kwargs
         )
 
 
+def _snapshot_value(value):
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+
 def _handle_paywall_callback(payment, request, **kwargs):
     """Handle paywall callback via core async path."""
     from getpaid.adapters import adapt_callback_request
@@ -425,6 +518,15 @@ def _handle_paywall_callback(payment, request, **kwargs):
     bridge.call_verify_callback(
         processor, data, headers, raw_body, request, **kwargs
     )
+    return _apply_paywall_callback(payment, request, processor, **kwargs)
+
+
+def _apply_paywall_callback(payment, request, processor, **kwargs):
+    """Run ``handle_callback`` for an already verified callback and apply it."""
+    from getpaid.adapters import adapt_callback_request
+    from getpaid.bridge import bridge
+
+    data, headers, raw_body = adapt_callback_request(request)
     update = bridge.call(
         processor,
         processor.handle_callback,
@@ -436,6 +538,7 @@ def _handle_paywall_callback(payment, request, **kwargs):
     if isinstance(update, HttpResponse):
         return update
     if update is not None:
-        apply_payment_update(payment, update)
-        DjangoPaymentRepository(type(payment))._save(payment)
+        DjangoPaymentRepository(type(payment))._apply_update(
+            payment, lambda: update, source='callback'
+        )
     return HttpResponse(b'OK')
@@ -1,11 +1,134 @@
 """Adapters to bridge Django sync views to core async processors."""
 
+import copy
 import json
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any
 
 from django.http import HttpRequest
 
 from getpaid.bridge import bridge
+from getpaid.commlog import log_inbound
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_UNSET = object()
+
+
+def _loads(raw_body: bytes) -> Any:
+    """Parse JSON with ``orjson`` when installed, else the stdlib."""
+    if orjson is not None:
+        try:
+            return orjson.loads(raw_body)
+        except orjson.JSONDecodeError:
+            # orjson rejects some valid documents (e.g. integers wider
+            # than 64 bits); let the stdlib decide or raise.
+            pass
+    return json.loads(raw_body)
+
+
+class CallbackHeaders(dict):  # noqa: FURB189
+    """Callback headers (``HTTP_X_FOO`` -> ``X-FOO``) with case-insensitive
+    lookups, so ``headers['x-foo']`` and ``headers.get('X-Foo')`` work."""
+
+    def __getitem__(self, key):
+        return super().__getitem__(_fold(key))
+
+    def __contains__(self, key):
+        return super().__contains__(_fold(key))
+
+    def get(self, key, default=None):
+        return super().get(_fold(key), default)
+
+
+def _fold(key):
+    return key.upper() if isinstance(key, str) else key
+
+
+class CallbackEnvelope:
+    """One provider callback, parsed once and shared by every stage.
+
+    Built by :func:`callback_envelope` and cached on the request. All
+    attributes are read-only, and ``data`` and ``headers`` are read-only
+    views (:class:`types.MappingProxyType`), so no stage can change what
+    the next one sees. The body is read (and logged) on first use;
+    ``data``, ``headers`` and ``source_ip`` are computed on first access.
+    """
+
+    __slots__ = ('_data', '_headers', '_raw_body', '_request', '_source_ip')
+
+    def __init__(self, request: HttpRequest) -> None:
+        self._request = request
+        self._data = self._headers = self._raw_body = self._source_ip = _UNSET
+
+    @property
+    def request(self) -> HttpRequest:
+        return self._request
+
+    @property
+    def raw_body(self) -> bytes:
+        if self._raw_body is _UNSET:
+            # Read before ``request.POST``, which consumes the stream.
+            self._raw_body = self._request.body
+            log_inbound(self._request, self._raw_body)
+        return self._raw_body
+
+    @property
+    def data(self) -> Mapping[str, Any]:
+        """Parsed JSON or form payload; raises ``json.JSONDecodeError``.
+
+        Top-level JSON values other than objects are returned as parsed.
+        """
+        if self._data is _UNSET:
+            raw_body = self.raw_body
+            content_type = self._request.content_type
+            if content_type and 'json' in content_type:
+                data = _loads(raw_body)
+            else:
+                data = {}
+                for key in self._request.POST:
+                    values = list(self._request.POST.getlist(key))
+                    data[key] = values[0] if len(values) == 1 else values
+            self._data = (
+                MappingProxyType(data) if isinstance(data, dict) else data
+            )
+        return self._data
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        """Case-insensitive view of the ``HTTP_*`` request headers."""
+        if self._headers is _UNSET:
+            self._headers = MappingProxyType(
+                CallbackHeaders(
+                    (key[5:].replace('_', '-'), value)
+                    for key, value in self._request.META.items()
+                    if key.startswith('HTTP_')
+                )
+            )
+        return self._headers
+
+    @property
+    def source_ip(self) -> str:
+        """Client IP used for allowlist checks (see
+        :func:`~getpaid.callback_security.get_callback_request_ip`)."""
+        if self._source_ip is _UNSET:
+            from getpaid.callback_security import get_callback_request_ip
+
+            self._source_ip = get_callback_request_ip(self._request)
+        return self._source_ip
+
+
+def callback_envelope(request: HttpRequest) -> CallbackEnvelope:
+    """Return the request's :class:`CallbackEnvelope`, building it once."""
+    envelope = getattr(request, '_getpaid_envelope', None)
+    if envelope is None:
+        envelope = CallbackEnvelope(request)
+        request._getpaid_envelope = envelope
+    return envelope
 
 
 def adapt_callback_request(
@@ -13,29 +136,23 @@ def adapt_callback_request(
 ) -> tuple[dict[str, Any], dict[str, str], bytes]:
     """Extract (data, headers, raw_body) from Django HttpRequest.
 
+    Served from the request's :class:`CallbackEnvelope`, so repeated
+    calls do not parse the body or scan ``request.META`` again. Each call
+    returns its own copies of ``data`` and ``headers``: processors may
+    change them without affecting the other stages of the callback.
+
     Returns:
         (data, headers, raw_body) tuple suitable for core processor.verify_callback()
     """
-    # Capture raw_body first before accessing POST (which consumes the stream)
-    raw_body = request.body
-
-    # Extract data from request body
-    if request.content_type and 'json' in request.content_type:
-        data = json.loads(raw_body)
-    else:
-        data = {}
-        for key in request.POST:
-            values = list(request.POST.getlist(key))
-            data[key] = values[0] if len(values) == 1 else values
-
-    # Extract headers (HTTP_X_FOO → X-Foo)
-    headers = {
-        key.replace('HTTP_', '', 1).replace('_', '-'): value
-        for key, value in request.META.items()
-        if key.startswith('HTTP_')
-    }
-
-    return data, headers, raw_body
+    envelope = callback_envelope(request)
+    data = envelope.data
+    if isinstance(data, Mapping):
+        data = dict(data)
+    return (
+        copy.deepcopy(data),
+        CallbackHeaders(envelope.headers),
+        envelope.raw_body,
+    )
 
 
 def call_processor_verify_callback(
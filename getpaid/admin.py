@@ -1,10 +1,16 @@
 import logging
 
 from django.contrib import admin, messages
-from django.db import transaction
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
 from getpaid_core.enums import PaymentStatus
 
 from . import models
+from .bulk import (
+    bulk_actions_in_background,
+    enqueue_bulk_job,
+    run_bulk_operation,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -38,42 +44,57 @@ class PaymentAdmin(admin.ModelAdmin):
         success_message,
         failure_message,
     ):
-        """Run a payment method on each matching payment, row-locked.
+        """Run a payment operation on matching payments in locked batches.
 
-        Reports both success and failure counts via admin messages and
-        logs every failure with its traceback.
+        Rows are locked in chunks and gateway calls run concurrently (see
+        :func:`getpaid.bulk.run_bulk_operation`). Reports success, failure
+        and skipped counts via admin messages and logs every failure with
+        its traceback.
         """
-        succeeded = 0
-        failed = 0
-        for payment in queryset.filter(status=status):
-            try:
-                with transaction.atomic():
-                    locked = (
-                        type(payment)
-                        ._default_manager.select_for_update()
-                        .get(pk=payment.pk)
-                    )
-                    getattr(locked, method_name)()
-                succeeded += 1
-            except Exception:
-                failed += 1
-                logger.exception(
-                    'Admin action %r failed for payment %s',
-                    method_name,
-                    payment.pk,
-                )
-        if succeeded:
+        if bulk_actions_in_background():
+            self._enqueue_payment_action(request, queryset, status, method_name)
+            return
+        report = run_bulk_operation(queryset, method_name, status=status)
+        for pk, error in report.failed.items():
+            logger.error(
+                'Admin action %r failed for payment %s',
+                method_name,
+                pk,
+                exc_info=error,
+            )
+        if report.succeeded:
             self.message_user(
                 request,
-                success_message.format(count=succeeded),
+                success_message.format(count=len(report.succeeded)),
                 level=messages.SUCCESS,
             )
-        if failed:
+        if report.failed:
             self.message_user(
                 request,
-                failure_message.format(count=failed),
+                failure_message.format(count=len(report.failed)),
                 level=messages.ERROR,
             )
+        if report.skipped:
+            self.message_user(
+                request,
+                f'{len(report.skipped)} payment(s) skipped: locked by '
+                'another process or no longer eligible.',
+                level=messages.WARNING,
+            )
+
+    def _enqueue_payment_action(self, request, queryset, status, method_name):
+        job = enqueue_bulk_job(queryset, method_name, status=status)
+        url = reverse('admin:getpaid_bulkjob_change', args=[job.pk])
+        self.message_user(
+            request,
+            format_html(
+                '{} payment(s) queued as <a href="{}">{}</a>.',
+                job.total,
+                url,
+                job,
+            ),
+            level=messages.INFO,
+        )
 
     @admin.action(description='Charge selected pre-auth payments')
     def charge_payment(self, request, queryset):
@@ -110,3 +131,171 @@ class PaymentAdmin(admin.ModelAdmin):
             success_message='{count} refund(s) started.',
             failure_message='{count} refund(s) failed to start.',
         )
+
+
+@admin.register(models.BulkJob)
+class BulkJobAdmin(admin.ModelAdmin):
+    """Read-only progress view of queued bulk payment operations."""
+
+    list_display = (
+        'id',
+        'operation',
+        'status',
+        'progress_display',
+        'succeeded',
+        'failed',
+        'skipped',
+        'created_on',
+        'finished_on',
+    )
+    list_filter = ('status', 'operation')
+    fields = (
+        'operation',
+        'payment_model',
+        'source_status',
+        'status',
+        'progress_display',
+        'total',
+        'processed',
+        'succeeded',
+        'failed',
+        'skipped',
+        'failures_display',
+        'created_on',
+        'started_on',
+        'finished_on',
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='progress')
+    def progress_display(self, obj):
+        return f'{obj.progress}% ({obj.processed}/{obj.total})'
+
+    @admin.display(description='failures')
+    def failures_display(self, obj):
+        if not obj.failures:
+            return '-'
+        return format_html(
+            '<ul>{}</ul>',
+            format_html_join(
+                '', '<li>{}: {}</li>', sorted(obj.failures.items())
+            ),
+        )
+
+
+@admin.register(models.PaymentLedgerEntry)
+class PaymentLedgerEntryAdmin(admin.ModelAdmin):
+    """Read-only view of the append-only payment ledger."""
+
+    list_display = (
+        'created_on',
+        'payment_id',
+        'source',
+        'payment_event',
+        'fraud_event',
+        'status_before',
+        'status_after',
+        'amount_paid',
+        'amount_refunded',
+    )
+    list_filter = ('period', 'source', 'status_after')
+    search_fields = ('=payment_id',)
+    readonly_fields = (
+        'period',
+        'payment_id',
+        'source',
+        'payment_event',
+        'fraud_event',
+        'status_before',
+        'status_after',
+        'amount_paid',
+        'amount_locked',
+        'amount_refunded',
+        'provider_data_delta',
+        'created_on',
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(models.CommunicationLogEntry)
+class CommunicationLogEntryAdmin(admin.ModelAdmin):
+    """Read-only view of sampled gateway traffic."""
+
+    list_display = (
+        'created_on',
+        'direction',
+        'backend',
+        'method',
+        'duration_ms',
+        'payload_size',
+        'error',
+    )
+    list_filter = ('direction', 'backend')
+    search_fields = ('=payment_id',)
+    readonly_fields = (
+        'direction',
+        'backend',
+        'payment_id',
+        'method',
+        'duration_ms',
+        'payload_size',
+        'body',
+        'response',
+        'error',
+        'created_on',
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(models.PaymentOperation)
+class PaymentOperationAdmin(admin.ModelAdmin):
+    """Read-only view of two-phase operation intents."""
+
+    list_display = (
+        'created_on',
+        'payment_id',
+        'backend',
+        'operation',
+        'amount',
+        'status_before',
+        'status',
+        'finished_on',
+    )
+    list_filter = ('status', 'operation', 'backend')
+    search_fields = ('=payment_id',)
+    readonly_fields = (
+        'payment_id',
+        'backend',
+        'operation',
+        'amount',
+        'status_before',
+        'status',
+        'error',
+        'created_on',
+        'finished_on',
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
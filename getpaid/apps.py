@@ -6,5 +6,14 @@ class GetpaidConfig(AppConfig):
     default_auto_field = 'django.db.models.AutoField'
 
     def ready(self):
+        from django.core.signals import request_started
+
         # Register configuration system checks.
         from . import checks  # noqa: F401
+        from .async_runner import warm_up
+
+        # Start the async runner in each worker process on its first
+        # request; with a preloaded app that is after the fork.
+        request_started.connect(
+            warm_up, dispatch_uid='getpaid-async-runner-warm-up'
+        )
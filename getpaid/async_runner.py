@@ -4,12 +4,21 @@ from __future__ import annotations
 
 import asyncio
 import atexit
+import os
 import threading
+import weakref
+import zlib
 from collections.abc import Awaitable
 from typing import TypeVar
 
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+
 _Result = TypeVar('_Result')
 
+#: Shard selection strategies understood by :class:`AsyncRunnerPool`.
+RUNNER_STRATEGIES = ('least_loaded', 'backend')
+
 
 class AsyncRunner:
     """Run awaitables on a dedicated event loop thread.
@@ -20,13 +29,51 @@ class AsyncRunner:
     avoiding per-call thread churn at the Django adapter boundary.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, name: str = 'getpaid-async-runner') -> None:
+        self.name = name
         self._lock = threading.Lock()
         self._ready = threading.Event()
         self._thread: threading.Thread | None = None
         self._loop: asyncio.AbstractEventLoop | None = None
+        self._depth_lock = threading.Lock()
+        self._depth = 0
+        self._queued = 0
+        _runners.add(self)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of awaitables submitted to this loop and not yet done."""
+        return self._depth
+
+    @property
+    def queued(self) -> int:
+        """Number of submitted awaitables the loop has not started yet."""
+        return self._queued
+
+    @property
+    def running(self) -> int:
+        """Number of awaitables currently running on the loop."""
+        return max(self._depth - self._queued, 0)
+
+    def run(
+        self,
+        awaitable: Awaitable[_Result],
+        key: str | None = None,
+        timeout: float | None = None,
+    ) -> _Result:
+        """Block until ``awaitable`` completes on the runner loop.
+
+        ``key`` is accepted for interface parity with
+        :class:`AsyncRunnerPool` and ignored: there is only one loop.
+        After ``timeout`` seconds the awaitable is cancelled and
+        ``TimeoutError`` is raised.
 
-    def run(self, awaitable: Awaitable[_Result]) -> _Result:
+        The awaitable runs in a copy of the calling thread's ``contextvars``
+        context (``run_coroutine_threadsafe`` schedules the task with
+        ``call_soon_threadsafe``, which snapshots it with
+        ``contextvars.copy_context()``), so tracing spans and other
+        context-local state carry over to the loop thread.
+        """
         self._ensure_started()
         loop = self._loop
         thread = self._thread
@@ -34,8 +81,32 @@ class AsyncRunner:
             raise RuntimeError('Async runner failed to start.')
         if threading.get_ident() == thread.ident:
             raise RuntimeError('Async runner cannot block on its own loop thread.')
-        future = asyncio.run_coroutine_threadsafe(awaitable, loop)
-        return future.result()
+        started = threading.Event()
+        with self._depth_lock:
+            self._depth += 1
+            self._queued += 1
+        try:
+            future = asyncio.run_coroutine_threadsafe(
+                self._track(awaitable, started), loop
+            )
+            try:
+                return future.result(timeout)
+            except TimeoutError:
+                future.cancel()
+                raise
+        finally:
+            with self._depth_lock:
+                self._depth -= 1
+                if not started.is_set():
+                    self._queued -= 1
+
+    async def _track(
+        self, awaitable: Awaitable[_Result], started: threading.Event
+    ) -> _Result:
+        with self._depth_lock:
+            started.set()
+            self._queued -= 1
+        return await awaitable
 
     def shutdown(self) -> None:
         with self._lock:
@@ -49,6 +120,22 @@ class AsyncRunner:
             self._thread = None
             self._ready.clear()
 
+    def _reset_after_fork(self) -> None:
+        """Forget the parent's loop thread; the next call starts a new one.
+
+        Only the forking thread survives ``fork()``: the loop thread is gone
+        and locks may have been held by other threads. The parent's loop is
+        dropped, not closed, because in the child it still looks like it is
+        running on a thread that no longer exists.
+        """
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+        self._loop = None
+        self._depth_lock = threading.Lock()
+        self._depth = 0
+        self._queued = 0
+
     def _ensure_started(self) -> None:
         if self._thread is not None and self._thread.is_alive():
             return
@@ -58,7 +145,7 @@ class AsyncRunner:
             self._ready.clear()
             self._thread = threading.Thread(
                 target=self._run_loop,
-                name='getpaid-async-runner',
+                name=self.name,
                 daemon=True,
             )
             self._thread.start()
@@ -82,12 +169,184 @@ class AsyncRunner:
             loop.close()
 
 
+class AsyncRunnerPool:
+    """Shard awaitables across several :class:`AsyncRunner` loop threads.
+
+    With a single loop, one slow gateway or one CPU-heavy processor step
+    (signature verification, JSON parsing) delays every in-flight payment
+    operation of the process. The pool spreads calls over ``size`` loops:
+
+    - ``least_loaded`` sends each call to the loop with the fewest
+      in-flight awaitables;
+    - ``backend`` pins every call carrying the same ``key`` (the processor
+      slug) to one loop, isolating backends from each other. Calls without
+      a key fall back to ``least_loaded``.
+    """
+
+    def __init__(self, size: int, strategy: str = 'least_loaded') -> None:
+        if size < 1:
+            raise ValueError('AsyncRunnerPool needs at least one loop.')
+        if strategy not in RUNNER_STRATEGIES:
+            raise ValueError(f'Unknown async runner strategy {strategy!r}.')
+        self.strategy = strategy
+        self.runners = [
+            AsyncRunner(name=f'getpaid-async-runner-{index}')
+            for index in range(size)
+        ]
+
+    def run(
+        self,
+        awaitable: Awaitable[_Result],
+        key: str | None = None,
+        timeout: float | None = None,
+    ) -> _Result:
+        return self.select(key).run(awaitable, timeout=timeout)
+
+    def select(self, key: str | None = None) -> AsyncRunner:
+        """Return the runner that would execute a call for ``key``."""
+        if self.strategy == 'backend' and key:
+            index = zlib.crc32(key.encode()) % len(self.runners)
+            return self.runners[index]
+        return min(self.runners, key=lambda runner: runner.queue_depth)
+
+    def queue_depths(self) -> dict[str, int]:
+        return {runner.name: runner.queue_depth for runner in self.runners}
+
+    def shutdown(self) -> None:
+        for runner in self.runners:
+            runner.shutdown()
+
+
+_runners: weakref.WeakSet[AsyncRunner] = weakref.WeakSet()
 _runner = AsyncRunner()
-atexit.register(_runner.shutdown)
+_active: AsyncRunner | AsyncRunnerPool | None = None
+_active_lock = threading.Lock()
+_warmed_pid: int | None = None
+
+
+def get_runner() -> AsyncRunner | AsyncRunnerPool:
+    """Return the process-wide runner configured by ``GETPAID`` settings.
+
+    ``GETPAID['ASYNC_RUNNER_LOOPS']`` (default ``1``) selects the number of
+    loop threads; more than one builds an :class:`AsyncRunnerPool` using
+    ``GETPAID['ASYNC_RUNNER_STRATEGY']`` (default ``'least_loaded'``).
+    """
+    global _active  # noqa: PLW0603
+    if _active is None:
+        with _active_lock:
+            if _active is None:
+                _active = _build_runner()
+    return _active
+
+
+def queue_depths() -> dict[str, int]:
+    """Return in-flight awaitable counts keyed by loop thread name."""
+    runner = get_runner()
+    if isinstance(runner, AsyncRunnerPool):
+        return runner.queue_depths()
+    return {runner.name: runner.queue_depth}
+
+
+def active_runners() -> list[AsyncRunner]:
+    """Return every loop runner of the configured runner or pool."""
+    runner = get_runner()
+    if isinstance(runner, AsyncRunnerPool):
+        return list(runner.runners)
+    return [runner]
+
+
+def runner_stats() -> dict[str, dict[str, int]]:
+    """Return queued and running awaitable counts keyed by loop name."""
+    return {
+        runner.name: {'queued': runner.queued, 'running': runner.running}
+        for runner in active_runners()
+    }
+
+
+def warm_up(**kwargs) -> None:
+    """Start the configured runner's loop threads in this process.
+
+    Connected to ``request_started`` so every worker process (including
+    ones forked from a preloaded parent) starts its loops on its first
+    request rather than on its first payment call. Later calls only
+    compare the process id.
+    """
+    global _warmed_pid  # noqa: PLW0603
+    pid = os.getpid()
+    if _warmed_pid == pid:
+        return
+    _warmed_pid = pid
+    for runner in active_runners():
+        runner._ensure_started()
+
+
+def reset_runner() -> None:
+    """Drop the configured runner so the next call rebuilds it."""
+    global _active
+    with _active_lock:
+        runner, _active = _active, None
+    if isinstance(runner, AsyncRunnerPool):
+        runner.shutdown()
+
+
+def shutdown() -> None:
+    from getpaid.clients import close_clients
+
+    # Async clients are closed on the loops they were used on, so before
+    # the runners stop.
+    close_clients()
+    reset_runner()
+    _runner.shutdown()
 
 
 def run_awaitable[AwaitedResult](
     awaitable: Awaitable[AwaitedResult],
+    key: str | None = None,
+    timeout: float | None = None,
 ) -> AwaitedResult:
-    """Block synchronously until an awaitable completes."""
-    return _runner.run(awaitable)
+    """Block synchronously until an awaitable completes.
+
+    ``key`` (usually the processor slug) lets a pool with the ``backend``
+    strategy keep each backend on its own loop. After ``timeout`` seconds
+    the awaitable is cancelled on its loop and ``TimeoutError`` is raised.
+    """
+    return get_runner().run(awaitable, key=key, timeout=timeout)
+
+
+def _build_runner() -> AsyncRunner | AsyncRunnerPool:
+    from django.conf import settings
+
+    config = getattr(settings, 'GETPAID', {})
+    try:
+        loops = int(config.get('ASYNC_RUNNER_LOOPS', 1))
+    except (TypeError, ValueError) as exc:
+        raise ImproperlyConfigured(
+            'GETPAID["ASYNC_RUNNER_LOOPS"] must be an integer.'
+        ) from exc
+    if loops <= 1:
+        return _runner
+    strategy = config.get('ASYNC_RUNNER_STRATEGY', 'least_loaded')
+    if strategy not in RUNNER_STRATEGIES:
+        raise ImproperlyConfigured(
+            f'GETPAID["ASYNC_RUNNER_STRATEGY"] must be one of '
+            f'{RUNNER_STRATEGIES!r}, got {strategy!r}.'
+        )
+    return AsyncRunnerPool(loops, strategy=strategy)
+
+
+def _reset_runner_on_settings_change(*, setting, **kwargs) -> None:
+    if setting == 'GETPAID':
+        reset_runner()
+
+
+def _after_fork_in_child() -> None:
+    global _active_lock  # noqa: PLW0603
+    _active_lock = threading.Lock()
+    for runner in list(_runners):
+        runner._reset_after_fork()
+
+
+setting_changed.connect(_reset_runner_on_settings_change)
+atexit.register(shutdown)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
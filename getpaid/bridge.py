@@ -18,9 +18,24 @@ All delegate to ProcessorBridge, which owns:
 
 from __future__ import annotations
 
+import asyncio
+import time
+from collections.abc import Callable, Mapping, Sequence
 from typing import Any
 
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+
+from getpaid import circuit, deadline, tracing
 from getpaid.async_runner import run_awaitable
+from getpaid.commlog import log_outbound
+from getpaid.exceptions import CommunicationError
+
+#: Processor methods that handle a provider's callback locally. They are
+#: not gateway calls, so the circuit breaker neither blocks nor counts them:
+#: an open breaker must not reject the callbacks that report the gateway's
+#: outcomes.
+LOCAL_METHODS = frozenset({'handle_callback', 'verify_callback'})
 
 
 class ProcessorBridge:
@@ -41,12 +56,83 @@ class ProcessorBridge:
             detection on bound methods).
         :param method: The bound method or callable to invoke.
         :return: The method's return value.
+        :raises CircuitOpenError: The backend's circuit breaker is open.
+        """
+        return _call_guarded(processor, method, args, kwargs)
+
+    def call_many(
+        self,
+        calls: Sequence[tuple[Any, Any, Mapping[str, Any]]],
+        *,
+        concurrency: int = 10,
+        limiter_for: Callable[[Any], Any] | None = None,
+    ) -> list[Any]:
+        """Call several processor methods, running async ones concurrently.
+
+        :param calls: ``(processor, method, kwargs)`` triples.
+        :param concurrency: Maximum number of async calls in flight at once.
+        :param limiter_for: Optional rate limiting: called with each call's
+            processor, returns ``None`` or a limiter with a sync ``wait()``
+            and an async ``acquire()`` (e.g.
+            :class:`getpaid.reconcile.RateLimiter`). The limiter is waited
+            on before the call enters its deadline and circuit breaker, so
+            time spent waiting for a slot is neither timed out nor counted
+            as gateway latency.
+        :return: One entry per call, in order: the method's return value,
+            or the exception it raised. Exceptions are returned, not raised,
+            so one failing gateway call does not abort the others.
+
+        Sync methods run inline in the calling thread, one after another.
+        Async methods are gathered in a single runner round-trip, bounded
+        by ``concurrency``.
         """
         from getpaid.async_detection import is_async_callable
 
-        if is_async_callable(method):
-            return run_awaitable(method(*args, **kwargs))
-        return method(*args, **kwargs)
+        results: list[Any] = [None] * len(calls)
+        pending: list[tuple[int, Any, Any, Mapping[str, Any]]] = []
+        keys = set()
+        for position, (processor, method, kwargs) in enumerate(calls):
+            if is_async_callable(method):
+                pending.append((position, processor, method, kwargs))
+                keys.add(_runner_key(processor))
+                continue
+            limiter = limiter_for(processor) if limiter_for else None
+            if limiter is not None:
+                limiter.wait()
+            try:
+                results[position] = _call_guarded(
+                    processor, method, (), kwargs,
+                )
+            except Exception as exc:
+                results[position] = exc
+        if pending:
+            # Keep backend affinity when the whole batch targets one backend.
+            key = keys.pop() if len(keys) == 1 else None
+            gathered = run_awaitable(
+                _gather_bounded(pending, max(1, concurrency), limiter_for),
+                key=key,
+            )
+            for (position, _processor, _method, _kwargs), result in zip(
+                pending, gathered, strict=True,
+            ):
+                results[position] = result
+        return results
+
+    async def acall(
+        self, processor: Any, method: Any, *args: Any, **kwargs: Any,
+    ) -> Any:
+        """Async counterpart of :meth:`call` for code already on a loop.
+
+        Async methods are awaited in place — no hop onto the runner thread.
+        Sync methods run through ``sync_to_async`` so they never block the
+        calling event loop.
+
+        :param processor: The processor instance.
+        :param method: The bound method or callable to invoke.
+        :return: The method's return value.
+        :raises CircuitOpenError: The backend's circuit breaker is open.
+        """
+        return await _acall_guarded(processor, method, args, kwargs)
 
     def is_semantic_callback(self, processor: Any) -> bool:
         """Return True when the processor implements the core async callback
@@ -93,12 +179,218 @@ class ProcessorBridge:
         if verify_method is None:
             return
 
-        if is_async_callable(verify_method):
-            run_awaitable(
-                verify_method(data, headers, raw_body=raw_body, **kwargs),
+        with _processor_span(processor, verify_method):
+            if is_async_callable(verify_method):
+                _call_with_deadline(
+                    processor,
+                    verify_method,
+                    (data, headers),
+                    {'raw_body': raw_body, **kwargs},
+                )
+            else:
+                verify_method(request)
+
+    async def acall_verify_callback(
+        self, processor: Any, data: Any, headers: Any, raw_body: Any,
+        request: Any, **kwargs: Any,
+    ) -> None:
+        """Async counterpart of :meth:`call_verify_callback`.
+
+        Core-style verifiers are awaited directly; Django-style (sync,
+        request-taking) verifiers run through ``sync_to_async``.
+        """
+        from getpaid.async_detection import is_async_callable
+
+        verify_method = getattr(processor, 'verify_callback', None)
+        if verify_method is None:
+            return
+
+        with _processor_span(processor, verify_method):
+            if is_async_callable(verify_method):
+                await _acall_with_deadline(
+                    processor,
+                    verify_method,
+                    (data, headers),
+                    {'raw_body': raw_body, **kwargs},
+                )
+            else:
+                await sync_to_async(verify_method)(request)
+
+
+async def _gather_bounded(
+    pending: Sequence[tuple[int, Any, Any, Mapping[str, Any]]],
+    concurrency: int,
+    limiter_for: Callable[[Any], Any] | None = None,
+) -> list[Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _bounded(
+        processor: Any, method: Any, kwargs: Mapping[str, Any],
+    ) -> Any:
+        # Coroutines are created under the semaphore so at most
+        # ``concurrency`` gateway calls exist at any time.
+        async with semaphore:
+            limiter = limiter_for(processor) if limiter_for else None
+            if limiter is not None:
+                await limiter.acquire()
+            return await _acall_guarded(processor, method, (), kwargs)
+
+    return await asyncio.gather(
+        *(
+            _bounded(processor, method, kwargs)
+            for _position, processor, method, kwargs in pending
+        ),
+        return_exceptions=True,
+    )
+
+
+def _call_guarded(
+    processor: Any, method: Any, args: Sequence[Any], kwargs: Mapping[str, Any],
+) -> Any:
+    """Call ``method`` through its backend's circuit breaker and deadline,
+    recording the outcome in the breaker and the communication log.
+
+    Local callback handling (:data:`LOCAL_METHODS`) bypasses the breaker.
+    """
+    breaker = _get_breaker(processor, method)
+    breaker.acquire()
+    started = time.monotonic()
+    try:
+        with _processor_span(processor, method):
+            result = _call_with_deadline(processor, method, args, kwargs)
+    except Exception as exc:
+        breaker.record(time.monotonic() - started, exc)
+        log_outbound(processor, method, args, kwargs, started, exc)
+        raise
+    breaker.record(time.monotonic() - started)
+    log_outbound(processor, method, args, kwargs, started, response=result)
+    return result
+
+
+async def _acall_guarded(
+    processor: Any, method: Any, args: Sequence[Any], kwargs: Mapping[str, Any],
+) -> Any:
+    """Async counterpart of :func:`_call_guarded`."""
+    breaker = _get_breaker(processor, method)
+    breaker.acquire()
+    started = time.monotonic()
+    try:
+        with _processor_span(processor, method):
+            result = await _acall_with_deadline(
+                processor, method, args, kwargs,
+            )
+    except Exception as exc:
+        breaker.record(time.monotonic() - started, exc)
+        log_outbound(processor, method, args, kwargs, started, exc)
+        raise
+    breaker.record(time.monotonic() - started)
+    log_outbound(processor, method, args, kwargs, started, response=result)
+    return result
+
+
+def _get_breaker(processor: Any, method: Any) -> Any:
+    if getattr(method, '__name__', None) in LOCAL_METHODS:
+        return circuit._NO_BREAKER
+    return circuit.get_breaker(processor)
+
+
+def _call_with_deadline(
+    processor: Any, method: Any, args: Sequence[Any], kwargs: Mapping[str, Any],
+) -> Any:
+    """Call ``method`` under the processor's deadline.
+
+    Async methods run on the async runner and are cancelled there when the
+    deadline passes. Sync methods cannot be interrupted; they only see the
+    deadline through :func:`getpaid.deadline.remaining`.
+    """
+    from getpaid.async_detection import is_async_callable
+
+    with deadline.limit(_processor_timeout(processor)) as remaining:
+        deadline.check(_describe(processor, method))
+        if not is_async_callable(method):
+            return method(*args, **kwargs)
+        try:
+            return run_awaitable(
+                method(*args, **kwargs),
+                key=_runner_key(processor),
+                timeout=remaining,
             )
-        else:
-            verify_method(request)
+        except TimeoutError as exc:
+            if remaining is None:
+                raise
+            raise _timed_out(processor, method, remaining) from exc
+
+
+async def _acall_with_deadline(
+    processor: Any, method: Any, args: Sequence[Any], kwargs: Mapping[str, Any],
+) -> Any:
+    """Async counterpart of :func:`_call_with_deadline`."""
+    from getpaid.async_detection import is_async_callable
+
+    with deadline.limit(_processor_timeout(processor)) as remaining:
+        deadline.check(_describe(processor, method))
+        if not is_async_callable(method):
+            return await sync_to_async(method)(*args, **kwargs)
+        try:
+            async with asyncio.timeout(remaining):
+                return await method(*args, **kwargs)
+        except TimeoutError as exc:
+            if remaining is None:
+                raise
+            raise _timed_out(processor, method, remaining) from exc
+
+
+def _processor_timeout(processor: Any) -> float | None:
+    """Return the backend's ``timeout`` or ``GETPAID['PROCESSOR_TIMEOUT']``."""
+    config = getattr(processor, 'config', None)
+    timeout = config.get('timeout') if isinstance(config, dict) else None
+    if timeout is None:
+        from django.conf import settings
+
+        timeout = getattr(settings, 'GETPAID', {}).get('PROCESSOR_TIMEOUT')
+    if timeout is None:
+        return None
+    if isinstance(timeout, bool) or not isinstance(timeout, int | float):
+        raise ImproperlyConfigured(
+            f'Processor timeout for {_describe(processor)} must be a number '
+            f'of seconds, got {timeout!r}.'
+        )
+    return float(timeout)
+
+
+def _timed_out(
+    processor: Any, method: Any, timeout: float,
+) -> CommunicationError:
+    return CommunicationError(
+        f'{_describe(processor, method)} timed out after {timeout:.3g}s.',
+        context={
+            'backend': _runner_key(processor),
+            'method': tracing.method_name(method),
+            'timeout': timeout,
+        },
+    )
+
+
+def _describe(processor: Any, method: Any = None) -> str:
+    name = _runner_key(processor) or type(processor).__name__
+    if method is None:
+        return name
+    return f'{name}.{tracing.method_name(method)}'
+
+
+def _processor_span(processor: Any, method: Any):
+    name = tracing.method_name(method)
+    return tracing.span(
+        f'getpaid.processor.{name}',
+        backend=getattr(processor, 'slug', None),
+        method=name,
+    )
+
+
+def _runner_key(processor: Any) -> str | None:
+    """Return the runner shard key for a processor (its backend slug)."""
+    slug = getattr(processor, 'slug', None)
+    return slug if isinstance(slug, str) and slug else None
 
 
 #: Module-level singleton — stateless, safe to reuse.
@@ -0,0 +1,544 @@
+"""Batched payment operations for admin actions and maintenance jobs.
+
+Running ``payment.charge()`` in a loop costs one transaction, one locking
+query and one blocking gateway round-trip per payment. The engine here
+processes payments in chunks instead:
+
+1. lock a chunk of rows with ``select_for_update(skip_locked=True)``;
+2. validate every payment and fan the processor calls out concurrently
+   (bounded by ``concurrency``) through :meth:`ProcessorBridge.call_many`;
+3. apply the resulting updates through the core FSM and persist the whole
+   chunk with one ``bulk_update``.
+
+Rows locked by another transaction, or no longer in the expected status,
+are skipped rather than waited for.
+
+In two-phase mode (``GETPAID['TWO_PHASE_OPERATIONS']``, always used by the
+worker) the row locks are released before the gateway calls: each payment
+gets a :class:`~getpaid.models.PaymentOperation` intent, the calls run with
+no transaction open, and the results are applied in a second short
+transaction, as :mod:`getpaid.operations` does for single payments.
+
+With ``GETPAID['ADMIN_BULK_ACTIONS_IN_BACKGROUND']`` the admin actions
+queue a :class:`~getpaid.models.BulkJob` instead (:func:`enqueue_bulk_job`)
+and ``manage.py getpaid_worker`` processes it chunk by chunk
+(:func:`process_next_chunk`).
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from getpaid_core.fsm import apply_payment_update
+
+from getpaid import ledger, operations
+from getpaid.abstracts import AbstractPayment
+from getpaid.bridge import bridge
+from getpaid.flow_adapter import DjangoPaymentFlowAdapter
+from getpaid.models import (
+    BulkJob,
+    BulkJobStatus,
+    PaymentOperation,
+    PaymentOperationStatus,
+)
+from getpaid.repository import (
+    DjangoPaymentRepository,
+    optimistic_locking_enabled,
+)
+
+logger = logging.getLogger(__name__)
+
+#: Operations the engine can run in bulk.
+BULK_OPERATIONS = ('charge', 'release_lock', 'start_refund', 'cancel_refund')
+
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_CONCURRENCY = 10
+DEFAULT_CHUNK_LEASE = 600
+
+
+@dataclass
+class BulkActionReport:
+    """Per-payment outcome of :func:`run_bulk_operation`."""
+
+    operation: str
+    #: Primary keys of payments the operation succeeded for.
+    succeeded: list[Any] = field(default_factory=list)
+    #: Primary key -> exception raised for that payment.
+    failed: dict[Any, BaseException] = field(default_factory=dict)
+    #: Primary keys locked by another transaction or no longer in the
+    #: expected status when their chunk was locked.
+    skipped: list[Any] = field(default_factory=list)
+
+
+def run_bulk_operation(
+    queryset,
+    operation: str,
+    *,
+    status=None,
+    chunk_size: int | None = None,
+    concurrency: int | None = None,
+    two_phase: bool | None = None,
+    **kwargs: Any,
+) -> BulkActionReport:
+    """Run a payment operation on every payment in ``queryset``.
+
+    :param queryset: Payments to process.
+    :param operation: One of :data:`BULK_OPERATIONS`.
+    :param status: Only process payments in this status; rows whose status
+        changes before their chunk is locked are reported as skipped.
+    :param chunk_size: Rows locked per transaction. Defaults to
+        ``GETPAID['BULK_ACTION_CHUNK_SIZE']``.
+    :param concurrency: Async gateway calls in flight at once. Defaults to
+        ``GETPAID['BULK_ACTION_CONCURRENCY']``.
+    :param two_phase: Release the row locks before the gateway calls.
+        Defaults to ``GETPAID['TWO_PHASE_OPERATIONS']``.
+    :param kwargs: Passed to the processor method (e.g. ``amount``).
+    :return: A :class:`BulkActionReport`.
+    """
+    if operation not in BULK_OPERATIONS:
+        raise ValueError(f'Unknown bulk payment operation {operation!r}.')
+    if chunk_size is None:
+        chunk_size = _get_setting('BULK_ACTION_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    if concurrency is None:
+        concurrency = _get_setting(
+            'BULK_ACTION_CONCURRENCY', DEFAULT_CONCURRENCY
+        )
+
+    if two_phase is None:
+        two_phase = operations.two_phase_enabled()
+
+    model_class = queryset.model
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+
+    report = BulkActionReport(operation=operation)
+    for start in range(0, len(pks), chunk_size):
+        chunk = pks[start : start + chunk_size]
+        if two_phase:
+            _run_chunk_two_phase(
+                model_class,
+                chunk,
+                status,
+                operation,
+                kwargs,
+                concurrency,
+                report,
+            )
+            continue
+        with transaction.atomic():
+            payments = _lock_chunk(model_class, chunk, status, report)
+            if _overrides_operation(model_class, operation):
+                _run_model_methods(payments, operation, kwargs, report)
+            else:
+                _run_chunk(
+                    model_class,
+                    payments,
+                    operation,
+                    kwargs,
+                    concurrency,
+                    report,
+                )
+    return report
+
+
+def bulk_actions_in_background() -> bool:
+    """Return True if admin bulk actions should be queued for the worker."""
+    from django.conf import settings
+
+    config = getattr(settings, 'GETPAID', {})
+    return bool(config.get('ADMIN_BULK_ACTIONS_IN_BACKGROUND', False))
+
+
+def enqueue_bulk_job(queryset, operation: str, *, status=None) -> BulkJob:
+    """Queue a bulk operation for ``manage.py getpaid_worker``.
+
+    The matching payment ids are captured now; the status filter is
+    applied again when each chunk is locked.
+    """
+    if operation not in BULK_OPERATIONS:
+        raise ValueError(f'Unknown bulk payment operation {operation!r}.')
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    payment_ids = [
+        str(pk) for pk in queryset.order_by('pk').values_list('pk', flat=True)
+    ]
+    job = BulkJob(
+        operation=operation,
+        payment_model=queryset.model._meta.label,
+        source_status=status or '',
+        payment_ids=payment_ids,
+        total=len(payment_ids),
+    )
+    if not payment_ids:
+        job.status = BulkJobStatus.DONE
+        job.finished_on = timezone.now()
+    job.save()
+    return job
+
+
+def process_next_chunk(chunk_size: int | None = None) -> BulkJob | None:
+    """Claim and process the next chunk of the oldest unfinished job.
+
+    Claiming locks the job row with ``skip_locked`` only long enough to
+    lease a chunk, so several workers can share one job. A chunk whose
+    lease (``GETPAID['BULK_JOB_CHUNK_LEASE']`` seconds) expired before its
+    outcome was recorded is claimed again. Gateway calls are made in two
+    phases, outside the transaction holding the payment row locks.
+    Returns the job the chunk belonged to, or ``None`` if there was
+    nothing to do.
+    """
+    if chunk_size is None:
+        chunk_size = _get_setting('BULK_ACTION_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    lease = timedelta(
+        seconds=_get_setting('BULK_JOB_CHUNK_LEASE', DEFAULT_CHUNK_LEASE)
+    )
+    with transaction.atomic():
+        now = timezone.now()
+        job = (
+            BulkJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                Q(cursor__lt=F('total')) | Q(lease_expires_on__lte=now),
+                status__in=[BulkJobStatus.PENDING, BulkJobStatus.RUNNING],
+            )
+            .order_by('created_on', 'pk')
+            .first()
+        )
+        if job is None:
+            return None
+        token, start, end = _claim_chunk(job, chunk_size, now, now + lease)
+        if job.status == BulkJobStatus.PENDING:
+            job.status = BulkJobStatus.RUNNING
+            job.started_on = now
+        job.save(
+            update_fields=[
+                'cursor',
+                'claims',
+                'lease_expires_on',
+                'status',
+                'started_on',
+            ]
+        )
+
+    chunk = job.payment_ids[start:end]
+    model_class = apps.get_model(job.payment_model)
+    try:
+        report = run_bulk_operation(
+            model_class._default_manager.filter(pk__in=chunk),
+            job.operation,
+            status=job.source_status or None,
+            chunk_size=len(chunk),
+            two_phase=True,
+        )
+    except Exception as exc:
+        logger.exception('Bulk job %s failed to process a chunk', job.pk)
+        report = BulkActionReport(
+            operation=job.operation, failed=dict.fromkeys(chunk, exc)
+        )
+    else:
+        # Payments that left the queryset (deleted, status changed before
+        # listing) are neither locked nor skipped: count them as skipped.
+        seen = {
+            str(pk)
+            for pk in (*report.succeeded, *report.failed, *report.skipped)
+        }
+        report.skipped.extend(pk for pk in chunk if pk not in seen)
+    return _record_chunk(job.pk, token, report)
+
+
+def run_worker(
+    *,
+    once: bool = False,
+    poll_interval: float = 1.0,
+    chunk_size: int | None = None,
+) -> None:
+    """Process queued bulk jobs until interrupted.
+
+    With ``once`` the worker returns as soon as no chunk is left instead of
+    polling every ``poll_interval`` seconds.
+    """
+    while True:
+        if process_next_chunk(chunk_size=chunk_size) is not None:
+            continue
+        if once:
+            return
+        time.sleep(poll_interval)
+
+
+def _claim_chunk(
+    job: BulkJob, chunk_size: int, now: datetime, expires_on: datetime
+) -> tuple[str, int, int]:
+    """Lease the first expired chunk of ``job``, or else its next one.
+
+    Returns the new claim token and the ``payment_ids`` slice bounds.
+    """
+    expired = [
+        token
+        for token, claim in job.claims.items()
+        if datetime.fromisoformat(claim['expires_on']) <= now
+    ]
+    if expired:
+        claim = job.claims.pop(expired[0])
+        start, end = claim['start'], claim['end']
+        logger.warning(
+            'Bulk job %s: lease on payments [%s, %s) expired; claiming '
+            'the chunk again',
+            job.pk,
+            start,
+            end,
+        )
+    else:
+        start = job.cursor
+        end = min(start + chunk_size, job.total)
+        job.cursor = end
+    token = uuid.uuid4().hex
+    job.claims[token] = {
+        'start': start,
+        'end': end,
+        'expires_on': expires_on.isoformat(),
+    }
+    _update_lease(job)
+    return token, start, end
+
+
+def _update_lease(job: BulkJob) -> None:
+    job.lease_expires_on = min(
+        (
+            datetime.fromisoformat(claim['expires_on'])
+            for claim in job.claims.values()
+        ),
+        default=None,
+    )
+
+
+def _record_chunk(job_pk, token: str, report: BulkActionReport) -> BulkJob:
+    for pk, error in report.failed.items():
+        logger.error(
+            'Bulk %r failed for payment %s',
+            report.operation,
+            pk,
+            exc_info=error,
+        )
+    with transaction.atomic():
+        job = BulkJob.objects.select_for_update().get(pk=job_pk)
+        claim = job.claims.pop(token, None)
+        if claim is None:
+            # The lease expired and another worker took the chunk over;
+            # its outcome is counted by that worker.
+            logger.warning(
+                'Bulk job %s: chunk finished after its lease expired; '
+                'not counting it twice',
+                job.pk,
+            )
+            return job
+        _update_lease(job)
+        job.processed += claim['end'] - claim['start']
+        job.succeeded += len(report.succeeded)
+        job.failed += len(report.failed)
+        job.skipped += len(report.skipped)
+        job.failures.update(
+            (str(pk), str(error) or type(error).__name__)
+            for pk, error in report.failed.items()
+        )
+        if job.processed >= job.total and not job.claims:
+            job.status = BulkJobStatus.DONE
+            job.finished_on = timezone.now()
+        job.save()
+    return job
+
+
+def _lock_chunk(model_class, chunk, status, report):
+    """Lock the rows of ``chunk`` that are free and still in ``status``.
+
+    Must run in a transaction. Rows not returned are reported as skipped.
+    """
+    locked = model_class._default_manager.select_for_update(
+        skip_locked=True
+    ).filter(pk__in=chunk)
+    if status is not None:
+        locked = locked.filter(status=status)
+    payments = list(locked.select_related('order').order_by('pk'))
+    locked_pks = {payment.pk for payment in payments}
+    report.skipped.extend(pk for pk in chunk if pk not in locked_pks)
+    return payments
+
+
+def _run_chunk_two_phase(
+    model_class, chunk, status, operation, kwargs, concurrency, report
+):
+    """Process one chunk without holding row locks during gateway calls.
+
+    Intents are recorded under the chunk's locks, the calls run with no
+    transaction open, and the results are applied to the reloaded rows in
+    a second transaction. Intents of calls interrupted in between are
+    resolved by ``manage.py getpaid_recover_operations``.
+    """
+    started = []
+    with transaction.atomic():
+        payments = _lock_chunk(model_class, chunk, status, report)
+        if _overrides_operation(model_class, operation):
+            custom = payments
+        else:
+            custom = []
+            for payment in payments:
+                adapter = DjangoPaymentFlowAdapter(payment, model_class)
+                try:
+                    method = adapter.processor_method(operation)
+                    intent = operations._begin(
+                        adapter, operation, kwargs.get('amount')
+                    )
+                except Exception as exc:
+                    report.failed[payment.pk] = exc
+                    continue
+                started.append((adapter, intent, method))
+    if custom:
+        _run_model_methods(custom, operation, kwargs, report, savepoint=False)
+        return
+
+    results = bridge.call_many(
+        [(adapter.processor, method, kwargs) for adapter, _, method in started],
+        concurrency=concurrency,
+    )
+    called = []
+    for (adapter, intent, _), result in zip(started, results, strict=True):
+        if isinstance(result, BaseException):
+            report.failed[adapter.payment.pk] = result
+            operations._finish(
+                intent, PaymentOperationStatus.FAILED, _describe(result)
+            )
+        else:
+            called.append((adapter, intent, result))
+    if not called:
+        return
+
+    with transaction.atomic():
+        reloaded = model_class._default_manager.filter(
+            pk__in=[adapter.payment.pk for adapter, _, _ in called]
+        ).select_related('order')
+        if not optimistic_locking_enabled():
+            reloaded = reloaded.select_for_update()
+        current = {payment.pk: payment for payment in reloaded}
+        applied = []
+        applied_intents = []
+        for adapter, intent, result in called:
+            pk = adapter.payment.pk
+            try:
+                adapter.payment = current[pk]
+                adapter.check(operation)
+                _apply_result(adapter, operation, result, applied)
+            except Exception as exc:
+                # The gateway already acted; keep the reason for review.
+                report.failed[pk] = exc
+                operations._finish(
+                    intent, PaymentOperationStatus.FAILED, _describe(exc)
+                )
+                continue
+            report.succeeded.append(pk)
+            applied_intents.append(intent.pk)
+        DjangoPaymentRepository(model_class)._bulk_save(
+            [payment for payment, _update, _before in applied]
+        )
+        for payment, update, before in applied:
+            ledger.record(payment, update, before, source=operation)
+        PaymentOperation.objects.filter(pk__in=applied_intents).update(
+            status=PaymentOperationStatus.APPLIED,
+            error='',
+            finished_on=timezone.now(),
+        )
+
+
+def _apply_result(adapter, operation, result, applied) -> None:
+    update = adapter.update_for(operation, result)
+    if update is not None:
+        before = ledger.capture(adapter.payment)
+        apply_payment_update(adapter.payment, update)
+        applied.append((adapter.payment, update, before))
+
+
+def _describe(exc: BaseException) -> str:
+    return str(exc) or type(exc).__name__
+
+
+def _run_chunk(model_class, payments, operation, kwargs, concurrency, report):
+    adapters = []
+    calls = []
+    for payment in payments:
+        adapter = DjangoPaymentFlowAdapter(payment, model_class)
+        try:
+            adapter.check(operation)
+            method = adapter.processor_method(operation)
+        except Exception as exc:
+            report.failed[payment.pk] = exc
+            continue
+        adapters.append(adapter)
+        calls.append((adapter.processor, method, kwargs))
+
+    results = bridge.call_many(calls, concurrency=concurrency)
+
+    applied = []
+    for adapter, result in zip(adapters, results, strict=True):
+        payment = adapter.payment
+        if isinstance(result, BaseException):
+            report.failed[payment.pk] = result
+            continue
+        try:
+            update = adapter.update_for(operation, result)
+            if update is not None:
+                before = ledger.capture(payment)
+                apply_payment_update(payment, update)
+                applied.append((payment, update, before))
+        except Exception as exc:
+            report.failed[payment.pk] = exc
+            continue
+        report.succeeded.append(payment.pk)
+    DjangoPaymentRepository(model_class)._bulk_save(
+        [payment for payment, _update, _before in applied]
+    )
+    for payment, update, before in applied:
+        ledger.record(payment, update, before, source=operation)
+
+
+def _run_model_methods(payments, operation, kwargs, report, *, savepoint=True):
+    """Fallback for payment models that override the operation method.
+
+    Custom ``Payment.charge()`` & co. may carry project logic the batched
+    path would bypass, so they are called one by one, each in a savepoint
+    (or, in two-phase mode, outside any transaction).
+    """
+    for payment in payments:
+        try:
+            with transaction.atomic() if savepoint else nullcontext():
+                getattr(payment, operation)(**kwargs)
+        except Exception as exc:
+            report.failed[payment.pk] = exc
+        else:
+            report.succeeded.append(payment.pk)
+
+
+def _overrides_operation(model_class, operation: str) -> bool:
+    return getattr(model_class, operation) is not getattr(
+        AbstractPayment, operation
+    )
+
+
+def _get_setting(name: str, default: int) -> int:
+    from django.conf import settings
+
+    value = getattr(settings, 'GETPAID', {}).get(name, default)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ImproperlyConfigured(
+            f'GETPAID["{name}"] must be a positive integer.'
+        )
+    return value
@@ -2,14 +2,16 @@
 
 from __future__ import annotations
 
-from ipaddress import ip_address, ip_network
+from ipaddress import ip_address
 from typing import Any
 
 from django.conf import settings as django_settings
 from django.core.exceptions import ImproperlyConfigured
 from getpaid_core.processor import BaseProcessor as CoreBaseProcessor
 
+from getpaid.adapters import callback_envelope
 from getpaid.exceptions import InvalidCallbackError
+from getpaid.ipindex import compile_networks, network_file
 from getpaid.processor import BaseProcessor as DjangoBaseProcessor
 
 
@@ -46,13 +48,20 @@ def _enforce_signed_backend_in_production(processor: Any) -> None:
 
 
 def _enforce_ip_allowlist(processor: Any, request: Any) -> None:
-    allowlist = _get_callback_ip_allowlist(processor)
-    if not allowlist:
+    configured = _get_backend_setting(processor, 'callback_ip_allowlist')
+    networks = compile_networks(configured) if configured else None
+    allowlist_file = _get_backend_setting(
+        processor, 'callback_ip_allowlist_file'
+    )
+    if not isinstance(allowlist_file, str):
+        allowlist_file = None
+    if not networks and not allowlist_file:
         return
 
-    client_ip = ip_address(get_callback_request_ip(request))
-    networks = [ip_network(entry, strict=False) for entry in allowlist]
-    if any(client_ip in network for network in networks):
+    client_ip = ip_address(callback_envelope(request).source_ip)
+    if networks and client_ip in networks:
+        return
+    if allowlist_file and client_ip in network_file(allowlist_file):
         return
 
     raise InvalidCallbackError(
@@ -85,11 +94,8 @@ def get_callback_request_ip(request: Any) -> str:
             'GETPAID["CALLBACK_TRUSTED_PROXIES"].'
         )
 
-    trusted_networks = [
-        ip_network(entry, strict=False) for entry in trusted_proxies
-    ]
-    peer_ip = ip_address(remote_addr)
-    if not any(peer_ip in network for network in trusted_networks):
+    trusted_networks = compile_networks(trusted_proxies)
+    if ip_address(remote_addr) not in trusted_networks:
         return remote_addr
 
     forwarded_value = _get_request_header_value(request, str(source_header))
@@ -114,7 +120,7 @@ def get_callback_request_ip(request: Any) -> str:
             raise InvalidCallbackError(
                 f'Invalid callback IP address value {entry!r}.'
             ) from exc
-        if any(candidate_ip in network for network in trusted_networks):
+        if candidate_ip in trusted_networks:
             continue
         return str(candidate_ip)
 
@@ -123,17 +129,11 @@ def get_callback_request_ip(request: Any) -> str:
     )
 
 
-def _get_callback_ip_allowlist(processor: Any) -> list[str]:
+def _get_backend_setting(processor: Any, name: str) -> Any:
     getter = getattr(processor, 'get_setting', None)
     if not callable(getter):
-        return []
-
-    configured = getter('callback_ip_allowlist', None)
-    if configured is None:
-        return []
-    if isinstance(configured, str):
-        return [configured]
-    return list(configured)
+        return None
+    return getter(name, None)
 
 
 def _get_global_callback_setting(name: str, default: Any) -> Any:
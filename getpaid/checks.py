@@ -55,3 +55,48 @@ def check_backend_settings(app_configs, **kwargs):
             )
         ]
     return []
+
+
+@checks.register(checks.Tags.compatibility)
+def check_async_runner_settings(app_configs, **kwargs):
+    """Validate the async runner pool settings in GETPAID."""
+    from getpaid.async_runner import RUNNER_STRATEGIES
+
+    config = getattr(django_settings, 'GETPAID', {})
+    errors = []
+    loops = config.get('ASYNC_RUNNER_LOOPS', 1)
+    if not isinstance(loops, int) or isinstance(loops, bool) or loops < 1:
+        errors.append(
+            checks.Error(
+                'GETPAID["ASYNC_RUNNER_LOOPS"] must be a positive integer, '
+                f'got {loops!r}.',
+                id='getpaid.E004',
+            )
+        )
+    strategy = config.get('ASYNC_RUNNER_STRATEGY', 'least_loaded')
+    if strategy not in RUNNER_STRATEGIES:
+        errors.append(
+            checks.Error(
+                'GETPAID["ASYNC_RUNNER_STRATEGY"] must be one of '
+                f'{", ".join(RUNNER_STRATEGIES)}, got {strategy!r}.',
+                id='getpaid.E005',
+            )
+        )
+    return errors
+
+
+@checks.register(checks.Tags.compatibility)
+def check_callback_mode(app_configs, **kwargs):
+    """Validate GETPAID["CALLBACK_MODE"]."""
+    from getpaid.inbox import CALLBACK_MODES
+
+    mode = getattr(django_settings, 'GETPAID', {}).get('CALLBACK_MODE', 'sync')
+    if mode in CALLBACK_MODES:
+        return []
+    return [
+        checks.Error(
+            'GETPAID["CALLBACK_MODE"] must be one of '
+            f'{", ".join(CALLBACK_MODES)}, got {mode!r}.',
+            id='getpaid.E006',
+        )
+    ]
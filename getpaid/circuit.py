@@ -0,0 +1,319 @@
+"""Per-backend circuit breakers for processor calls.
+
+When a gateway degrades, every checkout keeps calling it and waiting,
+until the worker threads run out. With the breaker enabled the bridge
+tracks every backend's outbound processor calls in a rolling window
+(callback handling is local and not tracked). A backend is
+*opened* when, after at least ``MIN_CALLS`` calls in the window, either
+
+- the share of failed calls reaches ``ERROR_RATE``, or
+- the share of calls slower than ``SLOW_CALL_DURATION`` reaches
+  ``SLOW_CALL_RATE``.
+
+While open, calls fail fast with
+:class:`~getpaid.exceptions.CircuitOpenError` and the backend is left out of
+:meth:`~getpaid.registry.DjangoPluginRegistry.get_backends` (and so of the
+payment method choices). After ``OPEN_DURATION`` seconds one trial call is
+let through (*half-open*): success closes the breaker, failure opens it
+again.
+
+Breaker state is kept per process.
+
+Configuration (all keys optional)::
+
+    GETPAID = {
+        'CIRCUIT_BREAKER': {
+            'ENABLED': True,
+            'WINDOW': 60,
+            'MIN_CALLS': 20,
+            'ERROR_RATE': 0.5,
+            'SLOW_CALL_DURATION': 10.0,
+            'SLOW_CALL_RATE': 0.8,
+            'OPEN_DURATION': 30,
+        },
+    }
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+
+from getpaid.exceptions import (
+    CircuitOpenError,
+    InvalidCallbackError,
+    InvalidTransitionError,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'WINDOW': 60,
+    'MIN_CALLS': 20,
+    'ERROR_RATE': 0.5,
+    'SLOW_CALL_DURATION': None,
+    'SLOW_CALL_RATE': 0.8,
+    'OPEN_DURATION': 30,
+}
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+#: Errors that say nothing about the gateway's health.
+_IGNORED_ERRORS = (InvalidCallbackError, InvalidTransitionError)
+
+
+class CircuitBreaker:
+    """Rolling-window breaker for one backend.
+
+    The window is kept as one ``[second, calls, failures, slow]`` bucket per
+    second, so its size is bounded by ``window`` regardless of traffic.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window: float = 60,
+        min_calls: int = 20,
+        error_rate: float = 0.5,
+        slow_call_duration: float | None = None,
+        slow_call_rate: float = 0.8,
+        open_duration: float = 30,
+    ) -> None:
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.open_duration = open_duration
+        self.state = CLOSED
+        self._buckets: deque[list[int]] = deque()
+        self._opened_at = 0.0
+        self._trial_started: float | None = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Return False while the breaker rejects calls."""
+        if self.state == CLOSED:
+            return True
+        with self._lock:
+            return self._may_try(time.monotonic())
+
+    def acquire(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call may be made now."""
+        if self.state == CLOSED:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if not self._may_try(now):
+                raise CircuitOpenError(
+                    f'Payment backend {self.name!r} is unavailable '
+                    '(circuit open).',
+                    context={'backend': self.name},
+                )
+            if self.state != CLOSED:
+                self.state = HALF_OPEN
+                self._trial_started = now
+
+    def record(
+        self, duration: float, error: BaseException | None = None
+    ) -> None:
+        """Record a finished call that took ``duration`` seconds."""
+        if isinstance(error, _IGNORED_ERRORS):
+            error = None
+        failed = error is not None
+        slow = (
+            self.slow_call_duration is not None
+            and duration >= self.slow_call_duration
+        )
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._open(now)
+                else:
+                    self._close()
+                return
+            if self.state == OPEN:
+                return
+            self._add(now, failed=failed, slow=slow)
+            if self._tripped():
+                self._open(now)
+
+    def _may_try(self, now: float) -> bool:
+        if self.state == CLOSED:
+            return True
+        if now - self._opened_at < self.open_duration:
+            return False
+        # Half-open: one trial call at a time; a trial that never reported
+        # back frees the slot after another ``open_duration``.
+        return (
+            self._trial_started is None
+            or now - self._trial_started >= self.open_duration
+        )
+
+    def _add(self, now: float, *, failed: bool, slow: bool) -> None:
+        second = int(now)
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append([second, 0, 0, 0])
+        bucket = self._buckets[-1]
+        bucket[1] += 1
+        bucket[2] += failed
+        bucket[3] += slow
+        horizon = now - self.window
+        while self._buckets and self._buckets[0][0] < horizon:
+            self._buckets.popleft()
+
+    def _tripped(self) -> bool:
+        calls = failures = slow = 0
+        for (
+            _second,
+            bucket_calls,
+            bucket_failures,
+            bucket_slow,
+        ) in self._buckets:
+            calls += bucket_calls
+            failures += bucket_failures
+            slow += bucket_slow
+        if calls < self.min_calls:
+            return False
+        return (
+            failures / calls >= self.error_rate
+            or slow / calls >= self.slow_call_rate
+        )
+
+    def _open(self, now: float) -> None:
+        if self.state != OPEN:
+            logger.warning('Circuit for payment backend %r opened', self.name)
+        self.state = OPEN
+        self._opened_at = now
+        self._trial_started = None
+        self._buckets.clear()
+
+    def _close(self) -> None:
+        logger.info('Circuit for payment backend %r closed', self.name)
+        self.state = CLOSED
+        self._trial_started = None
+        self._buckets.clear()
+
+
+class _NoBreaker:
+    """Stand-in used when breakers are disabled or a processor has no slug."""
+
+    state = CLOSED
+
+    def available(self) -> bool:
+        return True
+
+    def acquire(self) -> None:
+        pass
+
+    def record(
+        self, duration: float, error: BaseException | None = None
+    ) -> None:
+        pass
+
+
+_NO_BREAKER = _NoBreaker()
+_config: dict[str, Any] | None = None
+_breakers: dict[str, CircuitBreaker] = {}
+_lock = threading.Lock()
+
+
+def get_breaker(processor: Any) -> CircuitBreaker | _NoBreaker:
+    """Return the breaker guarding calls to ``processor``'s backend."""
+    slug = getattr(processor, 'slug', None)
+    if not isinstance(slug, str) or not slug:
+        return _NO_BREAKER
+    return breaker_for(slug)
+
+
+def breaker_for(slug: str) -> CircuitBreaker | _NoBreaker:
+    """Return the breaker of backend ``slug``."""
+    breaker = _breakers.get(slug)
+    if breaker is not None:
+        return breaker
+    config = _get_config()
+    if not config['ENABLED']:
+        return _NO_BREAKER
+    with _lock:
+        breaker = _breakers.get(slug)
+        if breaker is None:
+            breaker = _breakers[slug] = CircuitBreaker(
+                slug,
+                window=config['WINDOW'],
+                min_calls=config['MIN_CALLS'],
+                error_rate=config['ERROR_RATE'],
+                slow_call_duration=config['SLOW_CALL_DURATION'],
+                slow_call_rate=config['SLOW_CALL_RATE'],
+                open_duration=config['OPEN_DURATION'],
+            )
+    return breaker
+
+
+def is_available(slug: str) -> bool:
+    """Return False while backend ``slug``'s breaker rejects calls."""
+    breaker = _breakers.get(slug)
+    return breaker is None or breaker.available()
+
+
+def reset() -> None:
+    """Forget every breaker and the cached configuration."""
+    global _config  # noqa: PLW0603
+    with _lock:
+        _breakers.clear()
+        _config = None
+
+
+def _get_config() -> dict[str, Any]:
+    global _config  # noqa: PLW0603
+    if _config is not None:
+        return _config
+    from django.conf import settings
+
+    config = {
+        **DEFAULTS,
+        **getattr(settings, 'GETPAID', {}).get('CIRCUIT_BREAKER', {}),
+    }
+    for name in ('ERROR_RATE', 'SLOW_CALL_RATE'):
+        value = config[name]
+        if (
+            isinstance(value, bool)
+            or not isinstance(value, int | float)
+            or not 0 < value <= 1
+        ):
+            raise ImproperlyConfigured(
+                f'GETPAID["CIRCUIT_BREAKER"]["{name}"] must be a number '
+                'greater than 0 and at most 1.'
+            )
+    for name in ('WINDOW', 'MIN_CALLS', 'OPEN_DURATION'):
+        value = config[name]
+        if (
+            isinstance(value, bool)
+            or not isinstance(value, int | float)
+            or value <= 0
+        ):
+            raise ImproperlyConfigured(
+                f'GETPAID["CIRCUIT_BREAKER"]["{name}"] must be a positive '
+                'number.'
+            )
+    _config = config
+    return config
+
+
+def _reset_on_settings_change(*, setting, **kwargs) -> None:
+    if setting == 'GETPAID':
+        reset()
+
+
+setting_changed.connect(_reset_on_settings_change)
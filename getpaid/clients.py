@@ -0,0 +1,122 @@
+"""Process-wide registry of processor API clients.
+
+Processors with a ``client_class`` build a new client, and with it a new
+connection pool, for every processor instance. Several instances are
+created per request, so TLS handshakes are repeated on every call.
+Processors that set ``share_client = True`` get their client from
+:func:`get_shared_client` instead, which hands out one client per backend,
+client class and client parameters:
+
+- clients are built on first use and reused for the life of the process;
+- clients inherited over ``fork()`` are dropped (never closed, their
+  sockets belong to the parent) and rebuilt in the child;
+- :func:`close_clients` closes them (``aclose()`` on the async runner,
+  otherwise ``close()``) and runs before the async runner shuts down.
+
+Async clients (e.g. ``httpx.AsyncClient``) are bound to the event loop
+they are first used on. With ``ASYNC_RUNNER_LOOPS > 1`` use the
+``backend`` runner strategy so every backend stays on one loop, or leave
+``share_client`` off.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections.abc import Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    """Clients keyed by ``(backend, client class, params hash)``."""
+
+    def __init__(self) -> None:
+        self._clients: dict[tuple[str, str, str], Any] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def get(self, key: tuple[str, str, str], factory: Callable[[], Any]) -> Any:
+        """Return the client stored under ``key``, building it if needed."""
+        self._forget_if_forked()
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = factory()
+        return client
+
+    def close(self) -> None:
+        """Close and forget every client."""
+        self._forget_if_forked()
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for key, client in clients.items():
+            try:
+                _close_client(client, key[0])
+            except Exception:
+                logger.exception('Closing the %s client failed', key[0])
+
+    def forget(self) -> None:
+        """Drop every client without closing it (e.g. after ``fork()``)."""
+        with self._lock:
+            self._clients = {}
+            self._pid = os.getpid()
+
+    def _forget_if_forked(self) -> None:
+        if self._pid != os.getpid():
+            self.forget()
+
+
+clients = ClientRegistry()
+
+
+def get_shared_client(processor: Any) -> Any:
+    """Return the shared client for ``processor``'s backend and parameters."""
+    client_class = processor.get_client_class()
+    key = (
+        str(processor.slug or ''),
+        f'{client_class.__module__}.{client_class.__qualname__}',
+        _params_hash(processor.get_client_params()),
+    )
+    return clients.get(key, processor.get_client)
+
+
+def close_clients() -> None:
+    """Close every shared client."""
+    clients.close()
+
+
+def _params_hash(params: dict) -> str:
+    # Parameters usually hold credentials: only their digest is kept.
+    # Objects without a stable JSON form fall back to repr(), which for
+    # most objects includes the id and so disables sharing for them.
+    encoded = json.dumps(params, sort_keys=True, default=repr)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+#: Seconds an async client may take to close.
+CLOSE_TIMEOUT = 5.0
+
+
+def _close_client(client: Any, backend: str) -> None:
+    from getpaid.async_detection import is_async_callable
+
+    aclose = getattr(client, 'aclose', None)
+    if aclose is not None and is_async_callable(aclose):
+        from getpaid.async_runner import run_awaitable
+
+        # The backend's runner key selects the loop the client was used on.
+        run_awaitable(aclose(), key=backend or None, timeout=CLOSE_TIMEOUT)
+        return
+    close = getattr(client, 'close', None)
+    if callable(close):
+        close()
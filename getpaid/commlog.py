@@ -0,0 +1,443 @@
+"""Gateway communication log.
+
+Records every processor call made through
+:class:`~getpaid.bridge.ProcessorBridge` (outbound) and every provider
+callback read by :func:`~getpaid.adapters.adapt_callback_request`
+(inbound): method, latency, payload size, and a redacted, truncated body
+and response.
+
+Bodies pass through the ``REDACTOR`` hook before they are stored. It gets
+the payload as parsed data (the keyword arguments of a processor call, the
+value it returned, or a decoded JSON or form callback body) and returns
+what may be logged. The default, :func:`redact`, masks values under keys
+that look like card data, credentials or signatures. Formatting is bounded
+by ``MAX_BODY_SIZE``, so a large payload is never rendered in full.
+
+Logging must not slow the payment path, so records are plain dicts
+appended to a bounded in-memory ring buffer. A daemon thread writes them
+to :class:`~getpaid.models.CommunicationLogEntry` with ``bulk_create`` every
+``FLUSH_INTERVAL`` seconds, or sooner once ``BATCH_SIZE`` records are
+waiting. When the buffer is full the oldest records are dropped.
+
+Configuration (all keys optional)::
+
+    GETPAID = {
+        'COMMUNICATION_LOG': {
+            'ENABLED': True,
+            'SAMPLE_RATE': 1.0,
+            'MAX_BODY_SIZE': 1024,
+            'BUFFER_SIZE': 10000,
+            'BATCH_SIZE': 500,
+            'FLUSH_INTERVAL': 2.0,
+            'RETENTION_DAYS': 30,
+            'REDACTOR': 'getpaid.commlog.redact',
+        },
+    }
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import random
+import re
+import reprlib
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Mapping
+from datetime import timedelta
+from typing import Any
+from urllib.parse import parse_qsl
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 1.0,
+    'MAX_BODY_SIZE': 1024,
+    'BUFFER_SIZE': 10000,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 2.0,
+    'RETENTION_DAYS': 30,
+    'REDACTOR': 'getpaid.commlog.redact',
+}
+
+#: Replacement for redacted values.
+REDACTED = '[redacted]'
+
+# Key fragments (lower-case, without ``_`` and ``-``) whose values are
+# masked by :func:`redact`.
+_SENSITIVE_FRAGMENTS = (
+    'card',
+    'cvv',
+    'cvc',
+    'password',
+    'passwd',
+    'secret',
+    'signature',
+    'token',
+    'authorization',
+    'apikey',
+    'iban',
+)
+_SENSITIVE_KEYS = frozenset({'pan', 'sig', 'sign', 'hash', 'key'})
+_SENSITIVE_TEXT = re.compile(
+    r'(?i)\b((?:card\w*|cvv|cvc|pan|password|passwd|secret\w*|signature'
+    r'|\w*token|authorization|api_?key|iban)["\']?\s*[:=]\s*["\']?)'
+    r'[^"\'&,;\s<}]+'
+)
+
+
+def redact(data: Any) -> Any:
+    """Default ``REDACTOR``: mask values stored under sensitive keys.
+
+    Mappings and sequences are walked recursively. Plain text (an
+    unparsed callback body) has ``key=value`` and ``"key": "value"``
+    pairs with sensitive keys masked.
+    """
+    if isinstance(data, Mapping):
+        return {
+            key: REDACTED if _is_sensitive(key) else redact(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, (list, tuple)):
+        return [redact(item) for item in data]
+    if isinstance(data, str):
+        return _SENSITIVE_TEXT.sub(rf'\1{REDACTED}', data)
+    return data
+
+
+def _is_sensitive(key: Any) -> bool:
+    if not isinstance(key, str):
+        return False
+    name = key.lower().replace('_', '').replace('-', '')
+    return name in _SENSITIVE_KEYS or any(
+        fragment in name for fragment in _SENSITIVE_FRAGMENTS
+    )
+
+
+class CommunicationLogger:
+    """Ring buffer of log records with a background flusher thread."""
+
+    def __init__(
+        self,
+        *,
+        sample_rate: float = 1.0,
+        max_body_size: int = 1024,
+        buffer_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        redactor: Callable[[Any], Any] = redact,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.max_body_size = max_body_size
+        self.redactor = redactor
+        self._repr = reprlib.Repr()
+        self._repr.maxlevel = 4
+        self._repr.maxstring = self._repr.maxother = max(max_body_size, 8)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        #: Records lost because the buffer was full.
+        self.dropped = 0
+        self._buffer: deque[dict[str, Any]] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+
+    def sampled(self) -> bool:
+        """Decide whether the next call is logged."""
+        if self.sample_rate >= 1:
+            return True
+        # Sampling only; no security decision depends on it.
+        return random.random() < self.sample_rate  # noqa: S311
+
+    def submit(self, record: dict[str, Any]) -> None:
+        """Queue a record for the flusher; never touches the database."""
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(record)
+            pending = len(self._buffer)
+        self._ensure_flusher()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write every buffered record; return how many were written."""
+        from getpaid.models import CommunicationLogEntry
+
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [
+                        self._buffer.popleft()
+                        for _ in range(min(self.batch_size, len(self._buffer)))
+                    ]
+                if not batch:
+                    return written
+                CommunicationLogEntry.objects.bulk_create([
+                    CommunicationLogEntry(**record) for record in batch
+                ])
+                written += len(batch)
+
+    def stop(self) -> None:
+        """Stop the flusher thread after a final flush."""
+        self._stopped.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.flush_interval + 5)
+
+    def truncate(self, body: str) -> str:
+        return body[: self.max_body_size]
+
+    def render(self, payload: Any) -> str:
+        """Redact ``payload`` and render it for the log.
+
+        Long strings and containers are cut while rendering, so the cost
+        and the result are bounded by ``max_body_size`` rather than by the
+        size of the payload.
+        """
+        if payload is None or self.max_body_size == 0:
+            return ''
+        payload = self.redactor(payload)
+        if isinstance(payload, str):
+            return payload
+        return self._repr.repr(payload)
+
+    def _ensure_flusher(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None:
+                return
+            # First record, or first record in a forked child: the parent's
+            # thread does not exist here.
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name='getpaid-commlog', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._flush_in_thread()
+        self._flush_in_thread()
+
+    def _flush_in_thread(self) -> None:
+        close_old_connections()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Flushing the communication log failed')
+
+
+_logger: CommunicationLogger | None = None
+_logger_loaded = False
+_logger_lock = threading.Lock()
+
+
+def get_communication_logger() -> CommunicationLogger | None:
+    """Return the process-wide logger, or ``None`` when logging is off."""
+    global _logger, _logger_loaded  # noqa: PLW0603
+    if not _logger_loaded:
+        with _logger_lock:
+            if not _logger_loaded:
+                _logger = _build_logger()
+                _logger_loaded = True
+    return _logger
+
+
+def log_outbound(
+    processor: Any,
+    method: Any,
+    args: tuple,
+    kwargs: dict,
+    started: float,
+    error: BaseException | None = None,
+    *,
+    response: Any = None,
+) -> None:
+    """Record a finished processor call started at ``started``
+    (``time.monotonic()``).
+
+    The body is the call's payload (its keyword arguments, plus ``args``
+    when positional arguments were passed) and the response is the value
+    the method returned; both go through the ``REDACTOR`` hook.
+    """
+    comm_logger = get_communication_logger()
+    if comm_logger is None or not comm_logger.sampled():
+        return
+    duration = time.monotonic() - started
+    payload = {**kwargs, 'args': args} if args else kwargs
+    body = comm_logger.render(payload or None)
+    payment = getattr(processor, 'payment', None)
+    comm_logger.submit({
+        'direction': 'outbound',
+        'backend': str(getattr(processor, 'slug', '') or ''),
+        'payment_id': str(getattr(payment, 'pk', '') or ''),
+        'method': getattr(method, '__name__', repr(method))[:200],
+        'duration_ms': round(duration * 1000),
+        'payload_size': len(body),
+        'body': comm_logger.truncate(body),
+        'response': comm_logger.truncate(comm_logger.render(response)),
+        'error': _describe(error),
+        'created_on': timezone.now(),
+    })
+
+
+def log_inbound(request: Any, raw_body: bytes) -> None:
+    """Record a provider callback, once per request."""
+    comm_logger = get_communication_logger()
+    if comm_logger is None or getattr(request, '_getpaid_logged', False):
+        return
+    request._getpaid_logged = True
+    if not comm_logger.sampled():
+        return
+    url_kwargs = getattr(getattr(request, 'resolver_match', None), 'kwargs', {})
+    comm_logger.submit({
+        'direction': 'inbound',
+        'backend': str(url_kwargs.get('backend', '')),
+        'payment_id': str(url_kwargs.get('pk', '')),
+        'method': f'{request.method} {request.path}'[:200],
+        'duration_ms': None,
+        'payload_size': len(raw_body),
+        'body': comm_logger.truncate(
+            comm_logger.render(_parse_body(request, raw_body))
+        ),
+        'error': '',
+        'created_on': timezone.now(),
+    })
+
+
+def _parse_body(request: Any, raw_body: bytes) -> Any:
+    """Decode a callback body into data the redactor can walk."""
+    if not raw_body:
+        return None
+    text = raw_body.decode(errors='replace')
+    content_type = getattr(request, 'content_type', '') or ''
+    if 'json' in content_type:
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+    if content_type == 'application/x-www-form-urlencoded':
+        return dict(parse_qsl(text, keep_blank_values=True))
+    if content_type == 'multipart/form-data':
+        # Field values cannot be told apart in the raw text, so a body
+        # that does not parse is not logged at all.
+        try:
+            return request.POST.dict()
+        except Exception:
+            return None
+    return text
+
+
+def prune(days: int | None = None) -> int:
+    """Delete entries older than ``days`` (default ``RETENTION_DAYS``)."""
+    from getpaid.models import CommunicationLogEntry
+
+    if days is None:
+        days = _get_config()['RETENTION_DAYS']
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = CommunicationLogEntry.objects.filter(
+        created_on__lt=cutoff
+    ).delete()
+    return deleted
+
+
+def _describe(error: BaseException | None) -> str:
+    if error is None:
+        return ''
+    return f'{type(error).__name__}: {error}'[:255]
+
+
+def _get_config() -> dict[str, Any]:
+    from django.conf import settings
+
+    config = {
+        **DEFAULTS,
+        **getattr(settings, 'GETPAID', {}).get('COMMUNICATION_LOG', {}),
+    }
+    rate = config['SAMPLE_RATE']
+    if not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+        raise ImproperlyConfigured(
+            'GETPAID["COMMUNICATION_LOG"]["SAMPLE_RATE"] must be a number '
+            'between 0 and 1.'
+        )
+    for name in ('MAX_BODY_SIZE', 'RETENTION_DAYS'):
+        value = config[name]
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            raise ImproperlyConfigured(
+                f'GETPAID["COMMUNICATION_LOG"]["{name}"] must be a '
+                'non-negative integer.'
+            )
+    for name in ('BUFFER_SIZE', 'BATCH_SIZE'):
+        value = config[name]
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ImproperlyConfigured(
+                f'GETPAID["COMMUNICATION_LOG"]["{name}"] must be a positive '
+                'integer.'
+            )
+    redactor = config['REDACTOR']
+    if isinstance(redactor, str):
+        try:
+            redactor = import_string(redactor)
+        except ImportError as exc:
+            raise ImproperlyConfigured(
+                'GETPAID["COMMUNICATION_LOG"]["REDACTOR"] must be a callable '
+                'or an importable dotted path to one.'
+            ) from exc
+    if not callable(redactor):
+        raise ImproperlyConfigured(
+            'GETPAID["COMMUNICATION_LOG"]["REDACTOR"] must be a callable '
+            'or an importable dotted path to one.'
+        )
+    config['REDACTOR'] = redactor
+    return config
+
+
+def _build_logger() -> CommunicationLogger | None:
+    config = _get_config()
+    if not config['ENABLED']:
+        return None
+    comm_logger = CommunicationLogger(
+        sample_rate=config['SAMPLE_RATE'],
+        max_body_size=config['MAX_BODY_SIZE'],
+        buffer_size=config['BUFFER_SIZE'],
+        batch_size=config['BATCH_SIZE'],
+        flush_interval=float(config['FLUSH_INTERVAL']),
+        redactor=config['REDACTOR'],
+    )
+    atexit.register(comm_logger.stop)
+    return comm_logger
+
+
+def _reset_logger(*, setting, **kwargs) -> None:
+    global _logger, _logger_loaded  # noqa: PLW0603
+    if setting != 'GETPAID':
+        return
+    with _logger_lock:
+        if _logger is not None:
+            _logger.stop()
+        _logger = None
+        _logger_loaded = False
+
+
+setting_changed.connect(_reset_logger)
@@ -0,0 +1,66 @@
+"""Deadlines for processor calls.
+
+The bridge runs every processor call under a deadline taken from the
+backend's ``timeout`` setting (``GETPAID_BACKEND_SETTINGS``) or
+``GETPAID['PROCESSOR_TIMEOUT']``. The deadline lives in a context variable,
+so it is visible to processor code on the async runner thread too.
+Processors should size their HTTP timeouts from :func:`remaining`::
+
+    async def charge(self, amount=None, **kwargs):
+        timeout = getpaid.deadline.remaining() or 30
+        response = await self.client.post(url, json=data, timeout=timeout)
+
+Application code can put a whole request under a deadline with
+:func:`limit`; nested limits can only make the deadline earlier.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from getpaid.exceptions import CommunicationError
+
+_deadline: ContextVar[float | None] = ContextVar(
+    'getpaid_deadline', default=None
+)
+
+
+def remaining() -> float | None:
+    """Seconds left until the current deadline, or ``None`` without one.
+
+    Never negative: an expired deadline reports ``0.0``.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+@contextmanager
+def limit(seconds: float | None) -> Generator[float | None]:
+    """Run the block with a deadline at most ``seconds`` from now.
+
+    An earlier deadline already in effect is kept. ``None`` leaves the
+    current deadline unchanged. Yields the seconds remaining.
+    """
+    if seconds is not None:
+        candidate = time.monotonic() + seconds
+        current = _deadline.get()
+        if current is None or candidate < current:
+            token = _deadline.set(candidate)
+            try:
+                yield remaining()
+            finally:
+                _deadline.reset(token)
+            return
+    yield remaining()
+
+
+def check(what: str = 'Processor call') -> None:
+    """Raise ``CommunicationError`` if the current deadline has passed."""
+    deadline = _deadline.get()
+    if deadline is not None and deadline <= time.monotonic():
+        raise CommunicationError(f'{what} skipped: deadline exceeded.')
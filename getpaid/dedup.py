@@ -0,0 +1,166 @@
+"""Callback deduplication keyed by provider event id.
+
+Gateways redeliver webhooks, heavily so during incidents. Without a
+dedup store every redelivery is verified, handled and pushed through the
+FSM under a row lock before ``InvalidTransitionError`` marks it as
+"Already processed". With ``GETPAID['CALLBACK_DEDUP']`` configured, the
+callback views look up the event id returned by the processor's
+``get_callback_event_id(data, headers)`` classmethod first and
+acknowledge events already seen without touching the payment row.
+
+Events are marked as seen only after they were verified and applied (on
+transaction commit), so forged callbacks reusing a known id can at most
+be acknowledged, never applied.
+
+Configuration::
+
+    GETPAID = {
+        'CALLBACK_DEDUP': {
+            'BACKEND': 'getpaid.dedup.CacheDedupStore',
+            'TTL': 3 * 24 * 3600,
+            'OPTIONS': {'cache_alias': 'default'},
+        },
+    }
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import timedelta
+from typing import Any
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from getpaid.adapters import adapt_callback_request
+
+DEFAULT_TTL = 3 * 24 * 3600
+
+
+class BaseDedupStore:
+    """Remember callback event keys for ``ttl`` seconds."""
+
+    def __init__(self, ttl: int = DEFAULT_TTL) -> None:
+        self.ttl = ttl
+
+    def seen(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def mark(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class CacheDedupStore(BaseDedupStore):
+    """Keep seen events in a Django cache (shared across processes with
+    Redis or Memcached; ``LocMemCache`` only deduplicates per process)."""
+
+    key_prefix = 'getpaid:callback-event:'
+
+    def __init__(
+        self, ttl: int = DEFAULT_TTL, cache_alias: str = 'default'
+    ) -> None:
+        super().__init__(ttl)
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def seen(self, key: str) -> bool:
+        return self.cache.get(self.key_prefix + key) is not None
+
+    def mark(self, key: str) -> None:
+        self.cache.set(self.key_prefix + key, 1, timeout=self.ttl)
+
+
+class DatabaseDedupStore(BaseDedupStore):
+    """Keep seen events in the ``CallbackEvent`` table.
+
+    Expired rows are ignored on lookup and overwritten on the next mark;
+    :meth:`prune` deletes them in bulk.
+    """
+
+    def seen(self, key: str) -> bool:
+        from getpaid.models import CallbackEvent
+
+        return CallbackEvent.objects.filter(
+            key=key, expires_on__gt=timezone.now()
+        ).exists()
+
+    def mark(self, key: str) -> None:
+        from getpaid.models import CallbackEvent
+
+        CallbackEvent.objects.update_or_create(
+            key=key,
+            defaults={
+                'expires_on': timezone.now() + timedelta(seconds=self.ttl)
+            },
+        )
+
+    def prune(self) -> int:
+        """Delete expired events; return how many were removed."""
+        from getpaid.models import CallbackEvent
+
+        deleted, _ = CallbackEvent.objects.filter(
+            expires_on__lte=timezone.now()
+        ).delete()
+        return deleted
+
+
+_store: BaseDedupStore | None = None
+_store_loaded = False
+_store_lock = threading.Lock()
+
+
+def get_dedup_store() -> BaseDedupStore | None:
+    """Return the configured store, or ``None`` when dedup is disabled."""
+    global _store, _store_loaded  # noqa: PLW0603
+    if not _store_loaded:
+        with _store_lock:
+            if not _store_loaded:
+                _store = _build_store()
+                _store_loaded = True
+    return _store
+
+
+def callback_event_key(processor_class: Any, request) -> str | None:
+    """Return the dedup key of a callback, or ``None`` if it has no id."""
+    hook = getattr(processor_class, 'get_callback_event_id', None)
+    if hook is None:
+        return None
+    data, headers, _raw_body = adapt_callback_request(request)
+    event_id = hook(data, headers)
+    if not event_id:
+        return None
+    return f'{processor_class.slug}:{event_id}'
+
+
+def _build_store() -> BaseDedupStore | None:
+    from django.conf import settings
+
+    config = getattr(settings, 'GETPAID', {}).get('CALLBACK_DEDUP')
+    if not config:
+        return None
+    try:
+        store_class = import_string(config['BACKEND'])
+    except (KeyError, ImportError) as exc:
+        raise ImproperlyConfigured(
+            'GETPAID["CALLBACK_DEDUP"]["BACKEND"] must be an importable '
+            'dedup store class path.'
+        ) from exc
+    ttl = config.get('TTL', DEFAULT_TTL)
+    return store_class(ttl=ttl, **config.get('OPTIONS', {}))
+
+
+def _reset_store(*, setting, **kwargs) -> None:
+    global _store, _store_loaded  # noqa: PLW0603
+    if setting == 'GETPAID':
+        with _store_lock:
+            _store = None
+            _store_loaded = False
+
+
+setting_changed.connect(_reset_store)
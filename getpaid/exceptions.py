@@ -1,4 +1,4 @@
-"""Exception hierarchy -- re-exports from getpaid-core."""
+"""Exception hierarchy -- getpaid-core re-exports plus Django-side errors."""
 
 from getpaid_core.exceptions import (
     ChargeFailure,
@@ -11,13 +11,29 @@ from getpaid_core.exceptions import (
     RefundFailure,
 )
 
+
+class ConcurrentUpdateError(GetPaidException):
+    """A versioned payment save lost the race to another writer."""
+
+
+class CircuitOpenError(CommunicationError):
+    """The backend's circuit breaker is open; the call was not made."""
+
+
+class OperationInProgressError(GetPaidException):
+    """Another two-phase operation on the payment has not finished yet."""
+
+
 __all__ = [
     'ChargeFailure',
+    'CircuitOpenError',
     'CommunicationError',
+    'ConcurrentUpdateError',
     'CredentialsError',
     'GetPaidException',
     'InvalidCallbackError',
     'InvalidTransitionError',
     'LockFailure',
+    'OperationInProgressError',
     'RefundFailure',
 ]
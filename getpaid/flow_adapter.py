@@ -10,14 +10,16 @@ orchestration reference; this adapter owns the sync/async boundary.
 
 from __future__ import annotations
 
+import threading
 from decimal import Decimal
 from typing import Any
 
+from django.core.signals import setting_changed
 from getpaid_core.enums import PaymentEvent, PaymentStatus
 from getpaid_core.exceptions import InvalidTransitionError
-from getpaid_core.fsm import apply_payment_update
 from getpaid_core.types import PaymentUpdate
 
+from getpaid import metrics, operations, tracing
 from getpaid.bridge import bridge
 from getpaid.registry import registry as django_registry
 from getpaid.repository import DjangoPaymentRepository
@@ -64,12 +66,27 @@ def _resolve_backend_config(
     return {}
 
 
-def _get_processor(payment, model_class):
-    """Resolve processor instance using Django registry and config."""
+# backend key -> (registry generation, processor class, merged config)
+_backend_cache: dict[str, tuple[int, type, dict]] = {}
+_backend_cache_lock = threading.Lock()
+
+
+def _resolve_backend(backend_key: str) -> tuple[type, dict]:
+    """Return the processor class and merged config for a backend key.
+
+    Resolution walks the registry aliases and ``GETPAID_BACKEND_SETTINGS``
+    (and may import a module for unregistered keys), so the result is
+    memoized per key. Entries are tied to the registry generation and the
+    whole cache is dropped when ``GETPAID_BACKEND_SETTINGS`` changes.
+    """
+    generation = django_registry.generation
+    cached = _backend_cache.get(backend_key)
+    if cached is not None and cached[0] == generation:
+        return cached[1], cached[2]
+
     from importlib import import_module
 
-    backend_key = str(payment.backend)
-    if payment.backend in django_registry:
+    if backend_key in django_registry:
         processor_class = django_registry[backend_key]
         config = _resolve_backend_config(
             processor_class,
@@ -84,12 +101,52 @@ def _get_processor(payment, model_class):
             backend_key,
             aliases={backend_key},
         )
+    with _backend_cache_lock:
+        _backend_cache[backend_key] = (generation, processor_class, config)
+    return processor_class, config
+
+
+def clear_backend_cache() -> None:
+    """Forget every resolved backend (class and merged config)."""
+    with _backend_cache_lock:
+        _backend_cache.clear()
+
+
+def _clear_backend_cache_on_settings_change(*, setting, **kwargs) -> None:
+    if setting == 'GETPAID_BACKEND_SETTINGS':
+        clear_backend_cache()
+
+
+setting_changed.connect(_clear_backend_cache_on_settings_change)
+
+
+def _get_processor(payment, model_class):
+    """Resolve processor instance using Django registry and config."""
+    processor_class, config = _resolve_backend(str(payment.backend))
     return processor_class(payment, config=config)
 
 
-def _save(payment, model_class) -> None:
-    """Persist via sync repository (main thread)."""
-    DjangoPaymentRepository(model_class)._save(payment)
+#: Adapter operation -> processor method implementing it.
+_PROCESSOR_METHODS = {
+    'prepare': 'prepare_transaction',
+    'fetch_status': 'fetch_payment_status',
+    'charge': 'charge',
+    'release_lock': 'release_lock',
+    'start_refund': 'start_refund',
+    'cancel_refund': 'cancel_refund',
+}
+
+#: Statuses an operation may start from; operations not listed are
+#: validated by the FSM alone.
+_ALLOWED_STATUSES = {
+    'charge': {PaymentStatus.PRE_AUTH, PaymentStatus.IN_CHARGE},
+    'release_lock': {PaymentStatus.PRE_AUTH},
+    'start_refund': {
+        PaymentStatus.PAID,
+        PaymentStatus.PARTIAL,
+        PaymentStatus.REFUND_STARTED,
+    },
+}
 
 
 class DjangoPaymentFlowAdapter:
@@ -97,7 +154,8 @@ class DjangoPaymentFlowAdapter:
 
     Each method mirrors the core flow's orchestration sequence but
     runs processor calls via the AsyncRunner bridge and ORM on the
-    main thread.
+    main thread. One processor instance is built lazily and reused for
+    every call made through the adapter.
 
     Usage::
 
@@ -108,113 +166,138 @@ class DjangoPaymentFlowAdapter:
     def __init__(self, payment, model_class) -> None:
         self.payment = payment
         self.model_class = model_class
+        self._processor = None
+
+    @property
+    def processor(self):
+        """Processor instance for the payment, built on first use."""
+        if self._processor is None:
+            self._processor = _get_processor(self.payment, self.model_class)
+        return self._processor
 
     def prepare(self, **kwargs: Any) -> Any:
         """Prepare transaction."""
-        processor = _get_processor(self.payment, self.model_class)
-        result = bridge.call(processor, processor.prepare_transaction, **kwargs)
-        apply_payment_update(
-            self.payment,
-            PaymentUpdate(
-                payment_event=PaymentEvent.PREPARED,
-                external_id=result.external_id,
-                provider_data=result.provider_data,
-            ),
-        )
-        _save(self.payment, self.model_class)
-        return result
+        return self.run('prepare', **kwargs)
 
     def fetch_status(self):
         """PULL flow: fetch status from gateway."""
-        processor = _get_processor(self.payment, self.model_class)
-        update = bridge.call(processor, processor.fetch_payment_status)
-        if update is not None:
-            apply_payment_update(self.payment, update)
-            _save(self.payment, self.model_class)
-        return update
+        return self.run('fetch_status')
 
     def charge(self, amount: Decimal | None = None, **kwargs: Any):
         """Charge a pre-authorized payment."""
-        if self.payment.status not in {
-            PaymentStatus.PRE_AUTH,
-            PaymentStatus.IN_CHARGE,
-        }:
-            raise InvalidTransitionError(
-                f'Cannot charge payment in {self.payment.status!r} status. '
-                'Payment must be PRE_AUTH or IN_CHARGE.'
-            )
-        processor = _get_processor(self.payment, self.model_class)
-        result = bridge.call(processor, processor.charge, amount=amount, **kwargs)
-        if result.success:
-            if result.async_call:
-                update = PaymentUpdate(
-                    payment_event=PaymentEvent.CHARGE_REQUESTED,
-                    provider_data=result.provider_data,
-                )
-            else:
-                update = PaymentUpdate(
-                    payment_event=PaymentEvent.PAYMENT_CAPTURED,
-                    paid_amount=self.payment.amount_paid + result.amount_charged,
-                    provider_data=result.provider_data,
-                )
-            apply_payment_update(self.payment, update)
-            _save(self.payment, self.model_class)
-        return result
+        return self.run('charge', amount=amount, **kwargs)
 
     def release_lock(self, **kwargs: Any) -> Decimal:
         """Release a pre-authorized lock."""
-        if self.payment.status != PaymentStatus.PRE_AUTH:
-            raise InvalidTransitionError(
-                f'Cannot release lock for payment in {self.payment.status!r} '
-                'status. Payment must be PRE_AUTH.'
-            )
-        processor = _get_processor(self.payment, self.model_class)
-        amount = bridge.call(processor, processor.release_lock, **kwargs)
-        apply_payment_update(
-            self.payment,
-            PaymentUpdate(payment_event=PaymentEvent.LOCK_RELEASED),
-        )
-        _save(self.payment, self.model_class)
-        return amount
+        return self.run('release_lock', **kwargs)
 
     def start_refund(
         self, amount: Decimal | None = None, **kwargs: Any
     ):
         """Start a refund."""
-        if self.payment.status not in {
-            PaymentStatus.PAID,
-            PaymentStatus.PARTIAL,
-            PaymentStatus.REFUND_STARTED,
-        }:
+        return self.run('start_refund', amount=amount, **kwargs)
+
+    def cancel_refund(self, **kwargs: Any) -> bool:
+        """Cancel an in-progress refund."""
+        return self.run('cancel_refund', **kwargs)
+
+    # ---- Operation phases ----
+    #
+    # Every operation is validate -> processor call -> PaymentUpdate ->
+    # FSM -> persist. The phases are exposed separately so batch callers
+    # (admin bulk actions, reconciliation) can fan processor calls out
+    # concurrently and persist the results together.
+
+    def run(self, operation: str, **kwargs: Any) -> Any:
+        """Run one operation end to end and return the processor result.
+
+        With ``GETPAID['TWO_PHASE_OPERATIONS']`` gateway operations are
+        handed to :func:`getpaid.operations.run_two_phase`.
+        """
+        with (
+            tracing.span(
+                f'getpaid.operation.{operation}',
+                operation=operation,
+                backend=self.payment.backend,
+                payment_id=self.payment.pk,
+            ),
+            metrics.track_operation(operation, self.payment),
+        ):
+            if (
+                operation in operations.TWO_PHASE_OPERATIONS
+                and operations.two_phase_enabled()
+            ):
+                return operations.run_two_phase(self, operation, kwargs)
+            self.check(operation)
+            result = bridge.call(
+                self.processor, self.processor_method(operation), **kwargs
+            )
+            DjangoPaymentRepository(self.model_class)._apply_update(
+                self.payment,
+                lambda: self.update_for(operation, result),
+                source=operation,
+            )
+        return result
+
+    def check(self, operation: str) -> None:
+        """Raise ``InvalidTransitionError`` if the operation is not allowed."""
+        allowed = _ALLOWED_STATUSES.get(operation)
+        if allowed is None or self.payment.status in allowed:
+            return
+        if operation == 'release_lock':
+            raise InvalidTransitionError(
+                f'Cannot release lock for payment in {self.payment.status!r} '
+                'status. Payment must be PRE_AUTH.'
+            )
+        if operation == 'start_refund':
             raise InvalidTransitionError(
                 f'Cannot start refund for payment in {self.payment.status!r} '
                 'status. Payment must be PAID, PARTIAL, or REFUND_STARTED.'
             )
-        processor = _get_processor(self.payment, self.model_class)
-        result = bridge.call(
-            processor, processor.start_refund, amount=amount, **kwargs
+        raise InvalidTransitionError(
+            f'Cannot charge payment in {self.payment.status!r} status. '
+            'Payment must be PRE_AUTH or IN_CHARGE.'
         )
-        apply_payment_update(
-            self.payment,
-            PaymentUpdate(
+
+    def processor_method(self, operation: str):
+        """Return the bound processor method implementing an operation."""
+        return getattr(self.processor, _PROCESSOR_METHODS[operation])
+
+    def update_for(self, operation: str, result: Any) -> PaymentUpdate | None:
+        """Translate a processor result into the update to apply, if any."""
+        if operation == 'prepare':
+            return PaymentUpdate(
+                payment_event=PaymentEvent.PREPARED,
+                external_id=result.external_id,
+                provider_data=result.provider_data,
+            )
+        if operation == 'fetch_status':
+            return result
+        if operation == 'charge':
+            if not result.success:
+                return None
+            if result.async_call:
+                return PaymentUpdate(
+                    payment_event=PaymentEvent.CHARGE_REQUESTED,
+                    provider_data=result.provider_data,
+                )
+            return PaymentUpdate(
+                payment_event=PaymentEvent.PAYMENT_CAPTURED,
+                paid_amount=self.payment.amount_paid + result.amount_charged,
+                provider_data=result.provider_data,
+            )
+        if operation == 'release_lock':
+            return PaymentUpdate(payment_event=PaymentEvent.LOCK_RELEASED)
+        if operation == 'start_refund':
+            return PaymentUpdate(
                 payment_event=PaymentEvent.REFUND_REQUESTED,
                 provider_data=result.provider_data,
-            ),
-        )
-        _save(self.payment, self.model_class)
-        return result
-
-    def cancel_refund(self, **kwargs: Any) -> bool:
-        """Cancel an in-progress refund."""
-        processor = _get_processor(self.payment, self.model_class)
-        success = bridge.call(processor, processor.cancel_refund, **kwargs)
-        if success:
-            apply_payment_update(
-                self.payment,
-                PaymentUpdate(payment_event=PaymentEvent.REFUND_CANCELLED),
             )
-            _save(self.payment, self.model_class)
-        return success
+        if operation == 'cancel_refund':
+            if not result:
+                return None
+            return PaymentUpdate(payment_event=PaymentEvent.REFUND_CANCELLED)
+        raise ValueError(f'Unknown payment operation {operation!r}.')
 
 
 def prepare_transaction(payment, request=None, view=None, **kwargs):
@@ -228,13 +311,12 @@ def prepare_transaction(payment, request=None, view=None, **kwargs):
     from django.template.response import TemplateResponse
     from getpaid_core.enums import BackendMethod
 
-    result = DjangoPaymentFlowAdapter(payment, type(payment)).prepare(
-        request=request, view=view, **kwargs
-    )
+    adapter = DjangoPaymentFlowAdapter(payment, type(payment))
+    result = adapter.prepare(request=request, view=view, **kwargs)
     if isinstance(result, HttpResponseRedirect):
         return result
+    processor = adapter.processor
     if result.method is BackendMethod.POST:
-        processor = _get_processor(payment, type(payment))
         if not hasattr(processor, 'get_form') or not hasattr(
             processor, 'get_template_names'
         ):
@@ -250,7 +332,5 @@ def prepare_transaction(payment, request=None, view=None, **kwargs):
                 'paywall_url': result.redirect_url or '#',
             },
         )
-    redirect_url = result.redirect_url or _get_processor(
-        payment, type(payment)
-    ).get_our_baseurl(request)
+    redirect_url = result.redirect_url or processor.get_our_baseurl(request)
     return HttpResponseRedirect(redirect_url)
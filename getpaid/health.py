@@ -0,0 +1,230 @@
+"""Readiness checks for the payment subsystem.
+
+:func:`check_readiness` probes what payment requests depend on:
+
+- ``database``: a ``SELECT 1`` on the database payments are read from;
+- ``async_runner``: a no-op coroutine round-trip on every runner loop,
+  which must finish within ``GETPAID['READINESS_LATENCY_BUDGET']``;
+- ``backend:<slug>``: the probe of every processor defining a
+  ``check_readiness(config)`` classmethod (sync or async). It should raise
+  when the gateway is unusable.
+
+A failing database or runner check makes the service not ready. A failing
+backend probe only degrades it, because a gateway outage hits every pod
+alike and taking them all out of rotation would not help.
+
+Checks run concurrently on a small thread pool and must all finish within
+``GETPAID['READINESS_TIMEOUT']`` seconds; a check still running after that
+fails with ``TimeoutError``. Reports only name the exception class of a
+failure, the details are logged.
+
+Results are cached per process for ``GETPAID['READINESS_CACHE_TTL']``
+seconds, so frequent probes do not add load of their own. Probes arriving
+while the report is being refreshed get the previous report.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_TTL = 5.0
+DEFAULT_LATENCY_BUDGET = 1.0
+DEFAULT_TIMEOUT = 5.0
+MAX_WORKERS = 4
+
+OK = 'ok'
+DEGRADED = 'degraded'
+FAIL = 'fail'
+
+_cached: tuple[float, dict[str, Any]] | None = None
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def check_readiness() -> dict[str, Any]:
+    """Return the (possibly cached) readiness report.
+
+    The report holds the overall ``status`` (``ok``, ``degraded`` or
+    ``fail``) and a ``checks`` mapping of check name to its ``status``,
+    ``latency_ms`` and, on failure, ``error``.
+    """
+    global _cached  # noqa: PLW0603
+    ttl = _get_setting('READINESS_CACHE_TTL', DEFAULT_CACHE_TTL)
+    cached = _cached
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    # Only the first probe waits for a refresh; once there is a report,
+    # probes arriving during a refresh get the previous one.
+    if not _lock.acquire(blocking=cached is None):
+        return cached[1]
+    try:
+        cached = _cached
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        report = _run_checks()
+        _cached = (time.monotonic() + ttl, report)
+    finally:
+        _lock.release()
+    return report
+
+
+def _run_checks() -> dict[str, Any]:
+    budget = _get_setting('READINESS_LATENCY_BUDGET', DEFAULT_LATENCY_BUDGET)
+    timeout = _get_setting('READINESS_TIMEOUT', DEFAULT_TIMEOUT)
+    probes = {
+        'database': (_check_database,),
+        'async_runner': (_check_async_runner, budget),
+    }
+    for slug, processor_class in _probed_backends().items():
+        probes[f'backend:{slug}'] = (
+            _check_backend,
+            slug,
+            processor_class,
+            budget,
+        )
+    started = time.monotonic()
+    executor = _get_executor()
+    futures = {
+        name: executor.submit(_timed, *probe) for name, probe in probes.items()
+    }
+    wait(futures.values(), timeout=timeout)
+    elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+    checks = {}
+    for name, future in futures.items():
+        if not future.done():
+            future.cancel()
+            logger.warning(
+                'Readiness check %s did not finish within %ss', name, timeout
+            )
+            checks[name] = {
+                'status': FAIL,
+                'error': TimeoutError.__name__,
+                'latency_ms': elapsed_ms,
+            }
+        else:
+            checks[name] = future.result()
+            if checks[name]['status'] == FAIL:
+                logger.warning(
+                    'Readiness check %s failed',
+                    name,
+                    exc_info=checks[name].pop('exc'),
+                )
+    core = (checks['database'], checks['async_runner'])
+    status = OK if all(c['status'] == OK for c in core) else FAIL
+    if status == OK and any(c['status'] != OK for c in checks.values()):
+        status = DEGRADED
+    return {'status': status, 'checks': checks}
+
+
+def _timed(check, *args) -> dict[str, Any]:
+    from django.db import close_old_connections
+
+    # Pool threads keep their own connections between probes.
+    close_old_connections()
+    started = time.monotonic()
+    try:
+        check(*args)
+    except Exception as exc:
+        result = {'status': FAIL, 'error': type(exc).__name__, 'exc': exc}
+    else:
+        result = {'status': OK}
+    result['latency_ms'] = round((time.monotonic() - started) * 1000, 1)
+    return result
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor  # noqa: PLW0603
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=MAX_WORKERS,
+                    thread_name_prefix='getpaid-readiness',
+                )
+    return _executor
+
+
+def _check_database() -> None:
+    import swapper
+    from django.db import connections, router
+
+    Payment = swapper.load_model('getpaid', 'Payment')
+    with connections[router.db_for_read(Payment)].cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def _check_async_runner(budget: float) -> None:
+    from getpaid.async_runner import active_runners
+
+    for runner in active_runners():
+        started = time.monotonic()
+        try:
+            runner.run(asyncio.sleep(0), timeout=budget)
+        except TimeoutError as exc:
+            raise TimeoutError(
+                f'{runner.name} did not answer within {budget}s'
+            ) from exc
+        elapsed = time.monotonic() - started
+        if elapsed > budget:
+            raise TimeoutError(
+                f'{runner.name} answered in {elapsed:.3f}s, over the '
+                f'{budget}s budget'
+            )
+
+
+def _check_backend(slug: str, processor_class, budget: float) -> None:
+    from getpaid.async_runner import get_runner
+    from getpaid.flow_adapter import _resolve_backend
+
+    _processor_class, config = _resolve_backend(slug)
+    result = processor_class.check_readiness(config)
+    if inspect.isawaitable(result):
+        get_runner().run(result, key=slug, timeout=budget)
+
+
+def _probed_backends() -> dict[str, type]:
+    from getpaid.registry import registry
+
+    backends = {}
+    for key in registry:
+        processor_class = registry[key]
+        if hasattr(processor_class, 'check_readiness'):
+            backends[processor_class.slug] = processor_class
+    return backends
+
+
+def _get_setting(name: str, default: float) -> float:
+    from django.conf import settings
+
+    value = getattr(settings, 'GETPAID', {}).get(name, default)
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        raise ImproperlyConfigured(f'GETPAID["{name}"] must be a number.')
+    if value < 0:
+        raise ImproperlyConfigured(f'GETPAID["{name}"] must not be negative.')
+    return float(value)
+
+
+def reset_cache() -> None:
+    """Forget the cached report so the next probe runs every check."""
+    global _cached  # noqa: PLW0603
+    _cached = None
+
+
+def _reset_on_settings_change(*, setting, **kwargs) -> None:
+    if setting == 'GETPAID':
+        reset_cache()
+
+
+setting_changed.connect(_reset_on_settings_change)
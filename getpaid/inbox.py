@@ -0,0 +1,222 @@
+"""Callback inbox: acknowledge provider callbacks fast, apply them later.
+
+With ``GETPAID['CALLBACK_MODE'] = 'ingest'`` the callback views only run
+the security checks and ``verify_callback``, store the raw callback in
+:class:`~getpaid.models.CallbackInbox` and answer 200. Providers no longer
+wait for gateway calls or row locks, so slow periods stop turning into
+retry storms.
+
+``manage.py getpaid_drain_callbacks`` applies stored callbacks. Entries of
+one payment are applied strictly in the order they were received; entries
+of different payments can be drained by several workers in parallel.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import time
+from datetime import timedelta
+
+import swapper
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+from getpaid_core.exceptions import InvalidTransitionError
+
+from getpaid.abstracts import _apply_paywall_callback
+from getpaid.adapters import call_processor_verify_callback
+from getpaid.bridge import bridge
+from getpaid.models import CallbackInbox, CallbackInboxStatus
+
+logger = logging.getLogger(__name__)
+
+CALLBACK_MODES = ('sync', 'ingest')
+
+DEFAULT_MAX_ATTEMPTS = 5
+
+#: Request metadata kept besides ``HTTP_*`` headers.
+_META_KEYS = (
+    'CONTENT_TYPE',
+    'REMOTE_ADDR',
+    'QUERY_STRING',
+    'SERVER_NAME',
+    'SERVER_PORT',
+)
+
+
+def callback_mode() -> str:
+    """Return ``GETPAID['CALLBACK_MODE']`` (``'sync'`` by default)."""
+    from django.conf import settings
+
+    mode = getattr(settings, 'GETPAID', {}).get('CALLBACK_MODE', 'sync')
+    if mode not in CALLBACK_MODES:
+        raise ImproperlyConfigured(
+            f'GETPAID["CALLBACK_MODE"] must be one of {CALLBACK_MODES!r}, '
+            f'got {mode!r}.'
+        )
+    return mode
+
+
+def ingest_callback(
+    request: HttpRequest, payment, processor, correlation=None
+) -> CallbackInbox:
+    """Verify a callback and store it for :func:`process_next_callback`.
+
+    The caller must already have run ``enforce_callback_security``.
+    Verification failures propagate (the view answers 403) and nothing is
+    stored.
+    """
+    call_processor_verify_callback(processor, request)
+    meta = {
+        key: value
+        for key, value in request.META.items()
+        if (key.startswith('HTTP_') or key in _META_KEYS)
+        and isinstance(value, str)
+    }
+    meta['PATH_INFO'] = request.path_info
+    meta['wsgi.url_scheme'] = request.scheme
+    return CallbackInbox.objects.create(
+        payment_id=str(payment.pk),
+        backend=getattr(processor, 'slug', '') or str(payment.backend),
+        body=request.body,
+        meta=meta,
+        correlation=correlation or {},
+    )
+
+
+def build_request(entry: CallbackInbox) -> HttpRequest:
+    """Rebuild the original POST request from an inbox entry."""
+    body = bytes(entry.body)
+    environ = {
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        **entry.meta,
+        'REQUEST_METHOD': 'POST',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+    }
+    return WSGIRequest(environ)
+
+
+def process_next_callback(max_attempts: int | None = None):
+    """Apply the oldest ready inbox entry.
+
+    An entry is ready when it is pending, its retry delay has passed and no
+    older entry of the same payment is still pending. Returns the processed
+    entry, or ``None`` when nothing is ready.
+    """
+    if max_attempts is None:
+        max_attempts = _get_max_attempts()
+    older_pending = CallbackInbox.objects.filter(
+        payment_id=OuterRef('payment_id'),
+        status=CallbackInboxStatus.PENDING,
+        pk__lt=OuterRef('pk'),
+    )
+    with transaction.atomic():
+        entry = (
+            CallbackInbox.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                status=CallbackInboxStatus.PENDING,
+                available_on__lte=timezone.now(),
+            )
+            .exclude(Exists(older_pending))
+            .order_by('pk')
+            .first()
+        )
+        if entry is None:
+            return None
+        entry.attempts += 1
+        try:
+            with transaction.atomic():
+                response = _apply_entry(entry)
+        except InvalidTransitionError:
+            # Duplicate or late callback: the event was already applied.
+            _finish(entry, CallbackInboxStatus.APPLIED, 'Already processed')
+        except Exception as exc:
+            logger.exception(
+                'Applying callback %s for payment %s failed',
+                entry.pk,
+                entry.payment_id,
+            )
+            _retry_or_fail(entry, str(exc) or type(exc).__name__, max_attempts)
+        else:
+            if response.status_code >= 400:
+                _finish(
+                    entry,
+                    CallbackInboxStatus.FAILED,
+                    response.content.decode(errors='replace'),
+                )
+            else:
+                _finish(entry, CallbackInboxStatus.APPLIED, '')
+        entry.save()
+    return entry
+
+
+def drain_inbox(
+    *,
+    once: bool = False,
+    poll_interval: float = 1.0,
+    limit: int | None = None,
+) -> int:
+    """Apply inbox entries until interrupted; return how many were handled.
+
+    With ``once`` the loop returns as soon as no entry is ready.
+    """
+    handled = 0
+    while limit is None or handled < limit:
+        if process_next_callback() is not None:
+            handled += 1
+            continue
+        if once:
+            break
+        time.sleep(poll_interval)
+    return handled
+
+
+def _apply_entry(entry: CallbackInbox) -> HttpResponse:
+    Payment = swapper.load_model('getpaid', 'Payment')
+    payment = (
+        Payment.objects
+        .select_for_update()
+        .select_related('order')
+        .get(pk=entry.payment_id)
+    )
+    processor = payment._get_processor()
+    request = build_request(entry)
+    # The callback was verified on ingest; verifying again could reject
+    # signatures with a short validity window.
+    if bridge.is_semantic_callback(processor):
+        return _apply_paywall_callback(payment, request, processor)
+    return processor.handle_paywall_callback(request)
+
+
+def _finish(entry: CallbackInbox, status: str, error: str) -> None:
+    entry.status = status
+    entry.last_error = error
+    entry.processed_on = timezone.now()
+
+
+def _retry_or_fail(entry: CallbackInbox, error: str, max_attempts: int) -> None:
+    if entry.attempts >= max_attempts:
+        _finish(entry, CallbackInboxStatus.FAILED, error)
+        return
+    entry.last_error = error
+    entry.available_on = timezone.now() + timedelta(seconds=2**entry.attempts)
+
+
+def _get_max_attempts() -> int:
+    from django.conf import settings
+
+    value = getattr(settings, 'GETPAID', {}).get(
+        'CALLBACK_INBOX_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS
+    )
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ImproperlyConfigured(
+            'GETPAID["CALLBACK_INBOX_MAX_ATTEMPTS"] must be a positive integer.'
+        )
+    return value
@@ -0,0 +1,200 @@
+"""Compiled IP network sets for callback source checks.
+
+Provider allowlists (``callback_ip_allowlist``) and
+``GETPAID['CALLBACK_TRUSTED_PROXIES']`` can hold hundreds of CIDRs.
+Instead of building ``ip_network`` objects and scanning them on every
+callback, they are compiled once into an :class:`IPNetworkIndex`: the
+networks of each IP version merged into sorted, disjoint integer ranges,
+searched with ``bisect``.
+
+Compiled indexes are cached per configured list object and dropped when
+``GETPAID`` or ``GETPAID_BACKEND_SETTINGS`` change. Allowlists can also
+be read from a file (``callback_ip_allowlist_file``), which is re-read
+when it changes on disk.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from bisect import bisect_right
+from collections.abc import Iterable
+from ipaddress import IPv4Address, IPv6Address, ip_address, ip_network
+from pathlib import Path
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FILE_REFRESH = 60.0
+
+#: Compiled lists kept before the cache is reset.
+_MAX_CACHED = 256
+
+
+class IPNetworkIndex:
+    """Set of IPv4/IPv6 networks with O(log n) membership tests.
+
+    ``address in index`` accepts address strings and ``ipaddress``
+    objects. As with ``ip_network``, an address only matches networks of
+    its own IP version.
+    """
+
+    __slots__ = ('_ends', '_starts')
+
+    def __init__(self, entries: Iterable[str] = ()) -> None:
+        spans: dict[int, list[tuple[int, int]]] = {4: [], 6: []}
+        for entry in entries:
+            network = ip_network(str(entry).strip(), strict=False)
+            spans[network.version].append((
+                int(network.network_address),
+                int(network.broadcast_address),
+            ))
+        self._starts: dict[int, list[int]] = {}
+        self._ends: dict[int, list[int]] = {}
+        for version, ranges in spans.items():
+            starts: list[int] = []
+            ends: list[int] = []
+            for start, end in sorted(ranges):
+                if ends and start <= ends[-1] + 1:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            self._starts[version] = starts
+            self._ends[version] = ends
+
+    def __contains__(self, address: Any) -> bool:
+        if not isinstance(address, (IPv4Address, IPv6Address)):
+            address = ip_address(address)
+        value = int(address)
+        position = bisect_right(self._starts[address.version], value) - 1
+        return position >= 0 and value <= self._ends[address.version][position]
+
+    def __len__(self) -> int:
+        """Number of disjoint address ranges."""
+        return len(self._starts[4]) + len(self._starts[6])
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+
+class NetworkFile:
+    """Networks listed in a file, one IP or CIDR per line.
+
+    Blank lines and ``#`` comments are ignored. The file's modification
+    time is checked at most every ``refresh`` seconds and the file is
+    re-read when it changed. If a refresh fails, the previous networks
+    stay in use.
+    """
+
+    def __init__(self, path: str, refresh: float = DEFAULT_FILE_REFRESH):
+        self.path = Path(path)
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._mtime: float | None = None
+        self._checked = 0.0
+        self._index = self._load()
+
+    @property
+    def index(self) -> IPNetworkIndex:
+        if time.monotonic() - self._checked >= self.refresh:
+            with self._lock:
+                if time.monotonic() - self._checked >= self.refresh:
+                    self._maybe_reload()
+        return self._index
+
+    def _maybe_reload(self) -> None:
+        try:
+            if self.path.stat().st_mtime != self._mtime:
+                self._index = self._load()
+        except (OSError, ValueError):
+            logger.exception(
+                'Could not refresh IP allowlist file %s; keeping the '
+                'previous networks',
+                self.path,
+            )
+        self._checked = time.monotonic()
+
+    def _load(self) -> IPNetworkIndex:
+        mtime = self.path.stat().st_mtime
+        with self.path.open(encoding='utf-8') as source:
+            entries = [line.split('#', 1)[0].strip() for line in source]
+        index = IPNetworkIndex(entry for entry in entries if entry)
+        self._mtime = mtime
+        self._checked = time.monotonic()
+        return index
+
+
+# id(configured list) -> (configured list, compiled index)
+_compiled: dict[int, tuple[Any, IPNetworkIndex]] = {}
+_files: dict[str, NetworkFile] = {}
+_lock = threading.Lock()
+
+
+def compile_networks(entries: Any) -> IPNetworkIndex:
+    """Return the compiled index of ``entries`` (a string or an iterable
+    of IPs/CIDRs), compiling it on first use.
+
+    The cache is keyed by the configured object itself, so lists read
+    from settings are compiled once; lists changed in place are not
+    noticed until the settings change.
+    """
+    cached = _compiled.get(id(entries))
+    if cached is not None and cached[0] is entries:
+        return cached[1]
+    index = IPNetworkIndex([entries] if isinstance(entries, str) else entries)
+    with _lock:
+        if len(_compiled) >= _MAX_CACHED:
+            _compiled.clear()
+        _compiled[id(entries)] = (entries, index)
+    return index
+
+
+def network_file(path: str) -> IPNetworkIndex:
+    """Return the networks currently listed in the file at ``path``."""
+    loaded = _files.get(path)
+    if loaded is None:
+        with _lock:
+            loaded = _files.get(path)
+            if loaded is None:
+                try:
+                    loaded = NetworkFile(path, _file_refresh())
+                except (OSError, ValueError) as exc:
+                    raise ImproperlyConfigured(
+                        f'Cannot load IP allowlist file {path!r}: {exc}'
+                    ) from exc
+                _files[path] = loaded
+    return loaded.index
+
+
+def clear() -> None:
+    """Forget every compiled list and loaded file."""
+    with _lock:
+        _compiled.clear()
+        _files.clear()
+
+
+def _file_refresh() -> float:
+    from django.conf import settings
+
+    value = getattr(settings, 'GETPAID', {}).get(
+        'CALLBACK_IP_ALLOWLIST_REFRESH', DEFAULT_FILE_REFRESH
+    )
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ImproperlyConfigured(
+            'GETPAID["CALLBACK_IP_ALLOWLIST_REFRESH"] must be a number of '
+            'seconds.'
+        )
+    return float(value)
+
+
+def _clear_on_settings_change(*, setting, **kwargs) -> None:
+    if setting in {'GETPAID', 'GETPAID_BACKEND_SETTINGS'}:
+        clear()
+
+
+setting_changed.connect(_clear_on_settings_change)
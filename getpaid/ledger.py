@@ -0,0 +1,196 @@
+"""Append-only ledger of the payment updates applied to each payment.
+
+``apply_payment_update`` mutates the payment row in place. Every update
+applied through the flow adapter, the callback views, the bulk engine or
+reconciliation is therefore also recorded as a
+:class:`~getpaid.models.PaymentLedgerEntry`, with the status before and
+after, the resulting amounts and the ``provider_data`` keys it changed.
+
+Entries are buffered per transaction and written with one ``bulk_create``
+when it commits; updates rolled back (with their savepoint or transaction)
+leave no entry.
+Updates that changed nothing are not recorded. Disable the ledger with
+``GETPAID['PAYMENT_LEDGER'] = False``.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any
+
+from django.db import router, transaction
+from django.utils import timezone
+
+_MISSING = object()
+
+_local = threading.local()
+
+
+@dataclass(frozen=True, slots=True)
+class PaymentState:
+    """The ledger-relevant fields of a payment before an update."""
+
+    status: str
+    amount_paid: Any
+    amount_locked: Any
+    amount_refunded: Any
+    provider_data: dict
+
+
+def ledger_enabled() -> bool:
+    """Return False if ``GETPAID['PAYMENT_LEDGER']`` disables the ledger."""
+    from django.conf import settings
+
+    config = getattr(settings, 'GETPAID', {})
+    return bool(config.get('PAYMENT_LEDGER', True))
+
+
+def capture(payment) -> PaymentState | None:
+    """Capture the state :func:`record` compares the updated payment to.
+
+    Returns ``None`` when the ledger is disabled.
+    """
+    if not ledger_enabled():
+        return None
+    return PaymentState(
+        status=str(payment.status),
+        amount_paid=payment.amount_paid,
+        amount_locked=payment.amount_locked,
+        amount_refunded=payment.amount_refunded,
+        provider_data=copy.deepcopy(payment.provider_data or {}),
+    )
+
+
+def record(payment, update, before: PaymentState | None, *, source='') -> None:
+    """Queue a ledger entry for ``update`` having been applied to ``payment``.
+
+    :param payment: The payment after the update was applied and saved.
+    :param update: The applied ``PaymentUpdate``.
+    :param before: What :func:`capture` returned before applying it.
+    :param source: Where the update came from, e.g. ``'callback'`` or the
+        adapter operation name.
+    """
+    if before is None:
+        return
+    from getpaid.models import PaymentLedgerEntry
+
+    delta = _provider_data_delta(
+        before.provider_data, payment.provider_data or {}
+    )
+    status_after = str(payment.status)
+    if (
+        status_after == before.status
+        and payment.amount_paid == before.amount_paid
+        and payment.amount_locked == before.amount_locked
+        and payment.amount_refunded == before.amount_refunded
+        and not delta
+    ):
+        return
+    now = timezone.now()
+    # With USE_TZ = False ``now`` is naive and already local time.
+    today = now.date() if timezone.is_naive(now) else timezone.localdate(now)
+    entry = PaymentLedgerEntry(
+        period=today.replace(day=1),
+        payment_id=str(payment.pk),
+        source=source,
+        payment_event=_event_value(update.payment_event),
+        fraud_event=_event_value(update.fraud_event),
+        status_before=before.status,
+        status_after=status_after,
+        amount_paid=payment.amount_paid,
+        amount_locked=payment.amount_locked,
+        amount_refunded=payment.amount_refunded,
+        provider_data_delta=delta,
+        created_on=now,
+    )
+    using = router.db_for_write(PaymentLedgerEntry)
+    batch = _current_batch(using)
+    if batch is None:
+        PaymentLedgerEntry.objects.using(using).bulk_create([entry])
+    else:
+        batch.add(entry)
+
+
+class _Batch:
+    """Entries of one transaction, written once the last one commits.
+
+    Every entry is registered with ``on_commit`` on its own, so Django
+    discards the entries of a rolled-back savepoint or transaction
+    together with their callbacks. ``pending`` only holds weak references
+    to the registered callbacks: discarded ones drop out of it, and the
+    last callback to run writes every committed entry with one
+    ``bulk_create``.
+    """
+
+    def __init__(self, using: str) -> None:
+        self.using = using
+        self.pending: weakref.WeakSet[_EntryCommit] = weakref.WeakSet()
+        self.committed: list = []
+
+    @property
+    def active(self) -> bool:
+        """False once the transaction committed or rolled back."""
+        return bool(self.pending)
+
+    def add(self, entry) -> None:
+        callback = _EntryCommit(self, entry)
+        self.pending.add(callback)
+        transaction.on_commit(callback, using=self.using)
+
+    def flush(self) -> None:
+        from getpaid.models import PaymentLedgerEntry
+
+        entries, self.committed = self.committed, []
+        if entries:
+            PaymentLedgerEntry.objects.using(self.using).bulk_create(entries)
+
+
+class _EntryCommit:
+    """``on_commit`` callback of one buffered entry."""
+
+    __slots__ = ('__weakref__', 'batch', 'entry')
+
+    def __init__(self, batch: _Batch, entry) -> None:
+        self.batch = batch
+        self.entry = entry
+
+    def __call__(self) -> None:
+        batch = self.batch
+        batch.pending.discard(self)
+        batch.committed.append(self.entry)
+        if not batch.pending:
+            batch.flush()
+
+
+def _current_batch(using: str) -> _Batch | None:
+    """Return the batch of the current transaction, or ``None`` outside a
+    transaction."""
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        return None
+    batches = getattr(_local, 'batches', None)
+    if batches is None:
+        batches = _local.batches = {}
+    batch = batches.get(using)
+    if batch is None or not batch.active:
+        batch = batches[using] = _Batch(using)
+    return batch
+
+
+def _provider_data_delta(before: dict, after: dict) -> dict:
+    delta = {
+        key: value
+        for key, value in after.items()
+        if before.get(key, _MISSING) != value
+    }
+    delta.update((key, None) for key in before if key not in after)
+    return delta
+
+
+def _event_value(event) -> str:
+    if event is None:
+        return ''
+    return str(getattr(event, 'value', event))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from getpaid.inbox import drain_inbox
+
+
+class Command(BaseCommand):
+    help = 'Apply provider callbacks stored in the callback inbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when no stored callback is ready instead of polling.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls for new callbacks.',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Exit after applying this many callbacks.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            handled = drain_inbox(
+                once=options['once'],
+                poll_interval=options['poll_interval'],
+                limit=options['limit'],
+            )
+        except KeyboardInterrupt:
+            self.stdout.write('Worker stopped.')
+            return
+        self.stdout.write(f'Applied {handled} callback(s).')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from getpaid.dedup import DatabaseDedupStore, get_dedup_store
+
+
+class Command(BaseCommand):
+    help = 'Delete expired callback events from the database dedup store.'
+
+    def handle(self, *args, **options):
+        store = get_dedup_store()
+        if not isinstance(store, DatabaseDedupStore):
+            raise CommandError(
+                'GETPAID["CALLBACK_DEDUP"] does not use DatabaseDedupStore.'
+            )
+        deleted = store.prune()
+        self.stdout.write(f'Deleted {deleted} expired callback event(s).')
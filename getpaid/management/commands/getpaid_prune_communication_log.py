@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from getpaid.commlog import prune
+
+
+class Command(BaseCommand):
+    help = 'Delete communication log entries past their retention period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help=(
+                'Keep entries this many days old or newer. Defaults to '
+                'GETPAID["COMMUNICATION_LOG"]["RETENTION_DAYS"].'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune(options['days'])
+        self.stdout.write(f'Deleted {deleted} communication log entries.')
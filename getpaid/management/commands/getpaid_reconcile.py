@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from getpaid.reconcile import RECONCILE_STATUSES, reconcile_payments
+
+
+def _rate_limit(value):
+    slug, _sep, rate = value.partition('=')
+    try:
+        rate = float(rate)
+    except ValueError:
+        rate = 0
+    if not slug or rate <= 0:
+        raise CommandError(
+            f'Invalid --rate-limit {value!r}; expected BACKEND=CALLS_PER_SEC.'
+        )
+    return slug, rate
+
+
+class Command(BaseCommand):
+    help = 'Fetch gateway status for payments stuck in intermediate states.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--status',
+            action='append',
+            dest='statuses',
+            help=(
+                'Payment status to reconcile; repeatable '
+                f'(default: {", ".join(RECONCILE_STATUSES)}).'
+            ),
+        )
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=15,
+            help='Only payments created at least this many minutes ago.',
+        )
+        parser.add_argument(
+            '--backend',
+            action='append',
+            dest='backends',
+            help='Restrict to a backend; repeatable.',
+        )
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--concurrency', type=int, default=None)
+        parser.add_argument(
+            '--rate-limit',
+            action='append',
+            default=[],
+            metavar='BACKEND=CALLS_PER_SEC',
+            help='Maximum gateway calls per second for a backend.',
+        )
+        parser.add_argument(
+            '--limit', type=int, default=None, help='Stop after N payments.'
+        )
+
+    def handle(self, *args, **options):
+        report = reconcile_payments(
+            statuses=options['statuses'] or RECONCILE_STATUSES,
+            older_than=timedelta(minutes=options['older_than']),
+            backends=options['backends'],
+            batch_size=options['batch_size'],
+            concurrency=options['concurrency'],
+            rate_limits=dict(map(_rate_limit, options['rate_limit'])),
+            limit=options['limit'],
+        )
+        self.stdout.write(
+            f'Scanned {report.scanned} payment(s) in {report.batches} '
+            f'batch(es), {report.elapsed:.2f}s '
+            f'({report.payments_per_second:.1f} payments/s, '
+            f'{report.fetch_seconds:.2f}s waiting for gateways).'
+        )
+        self.stdout.write(
+            f'Updated {report.updated}, unchanged {report.unchanged}, '
+            f'skipped {report.skipped}, unsupported {report.unsupported}, '
+            f'failed {len(report.failed)}.'
+        )
+        for pk, error in report.failed.items():
+            self.stderr.write(f'{pk}: {error}')
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from getpaid.operations import recover_operations
+
+
+class Command(BaseCommand):
+    help = (
+        'Resolve two-phase payment operations left pending by an '
+        'interrupted worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=10,
+            help='Only intents created at least this many minutes ago.',
+        )
+
+    def handle(self, *args, **options):
+        report = recover_operations(
+            older_than=timedelta(minutes=options['older_than'])
+        )
+        self.stdout.write(f'Reconciled {len(report.reconciled)} operation(s).')
+        for intent_id, error in report.unresolved.items():
+            self.stderr.write(f'Operation {intent_id}: {error}')
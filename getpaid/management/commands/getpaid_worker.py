@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from getpaid.bulk import run_worker
+
+
+class Command(BaseCommand):
+    help = 'Process queued bulk payment jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when no queued work is left instead of polling.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls for new jobs.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=None,
+            help='Payments per chunk (default: BULK_ACTION_CHUNK_SIZE).',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            run_worker(
+                once=options['once'],
+                poll_interval=options['poll_interval'],
+                chunk_size=options['chunk_size'],
+            )
+        except KeyboardInterrupt:
+            self.stdout.write('Worker stopped.')
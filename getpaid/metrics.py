@@ -0,0 +1,321 @@
+"""Prometheus-style metrics for payment operations and callbacks.
+
+Counts and times :class:`~getpaid.flow_adapter.DjangoPaymentFlowAdapter`
+operations and the callback views per backend and outcome, counts status
+transitions and gauges the async runner. :func:`render` produces the
+Prometheus text exposition format served by the ``metrics/`` view.
+
+Collection is off unless ``GETPAID['METRICS_ENABLED']`` is true. Metrics
+live in process memory: with several worker processes each one reports
+its own values.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from typing import Any
+
+#: Histogram buckets in seconds, tuned for gateway round-trips.
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def metrics_enabled() -> bool:
+    """Return True if ``GETPAID['METRICS_ENABLED']`` is on."""
+    from django.conf import settings
+
+    config = getattr(settings, 'GETPAID', {})
+    return bool(config.get('METRICS_ENABLED', False))
+
+
+class _Metric:
+    type = ''
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...]
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key: tuple[str, ...], **extra: str) -> str:
+        pairs = [*zip(self.labelnames, key, strict=True), *extra.items()]
+        if not pairs:
+            return ''
+        body = ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+        return f'{{{body}}}'
+
+    def header(self) -> list[str]:
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f'{self.name}_total{self._format_labels(key)} {_number(value)}'
+            for key, value in values
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(
+        self, *args: Any, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def count(self, **labels: Any) -> int:
+        counts = self._values.get(self._key(labels))
+        return int(sum(counts[:-1])) if counts else 0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(
+                (key, list(counts)) for key, counts in self._values.items()
+            )
+        lines = []
+        for key, counts in values:
+            cumulative = 0
+            for bound, count in zip(
+                (*self.buckets, float('inf')), counts[:-1], strict=True
+            ):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _number(bound)
+                lines.append(
+                    f'{self.name}_bucket{self._format_labels(key, le=le)} '
+                    f'{cumulative}'
+                )
+            labels = self._format_labels(key)
+            lines.extend((
+                f'{self.name}_sum{labels} {_number(counts[-1])}',
+                f'{self.name}_count{labels} {cumulative}',
+            ))
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(_Metric):
+    """Gauge whose values are read from ``collect()`` at render time."""
+
+    type = 'gauge'
+
+    def __init__(
+        self,
+        *args: Any,
+        collect: Callable[[], dict[tuple[str, ...], float]],
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.collect = collect
+
+    def samples(self) -> list[str]:
+        return [
+            f'{self.name}{self._format_labels(key)} {_number(value)}'
+            for key, value in sorted(self.collect().items())
+        ]
+
+    def clear(self) -> None:
+        pass
+
+
+def _runner_gauge(attribute: str) -> Callable[[], dict[tuple[str, ...], float]]:
+    def collect() -> dict[tuple[str, ...], float]:
+        from getpaid.async_runner import runner_stats
+
+        return {
+            (name,): stats[attribute] for name, stats in runner_stats().items()
+        }
+
+    return collect
+
+
+operations = Counter(
+    'getpaid_operations',
+    'Payment operations run through the flow adapter.',
+    ('operation', 'backend', 'outcome'),
+)
+operation_duration = Histogram(
+    'getpaid_operation_duration_seconds',
+    'Duration of payment operations, including gateway calls.',
+    ('operation', 'backend'),
+)
+transitions = Counter(
+    'getpaid_status_transitions',
+    'Payment status transitions applied.',
+    ('backend', 'from_status', 'to_status'),
+)
+callbacks = Counter(
+    'getpaid_callbacks',
+    'Provider callbacks handled by the callback views.',
+    ('backend', 'outcome'),
+)
+callback_duration = Histogram(
+    'getpaid_callback_duration_seconds',
+    'Duration of callback requests.',
+    ('backend',),
+)
+runner_queue_depth = Gauge(
+    'getpaid_async_runner_queue_depth',
+    'Awaitables submitted to a runner loop and not started yet.',
+    ('loop',),
+    collect=_runner_gauge('queued'),
+)
+runner_inflight = Gauge(
+    'getpaid_async_runner_inflight',
+    'Awaitables running on a runner loop.',
+    ('loop',),
+    collect=_runner_gauge('running'),
+)
+
+REGISTRY: list[_Metric] = [
+    operations,
+    operation_duration,
+    transitions,
+    callbacks,
+    callback_duration,
+    runner_queue_depth,
+    runner_inflight,
+]
+
+
+@contextmanager
+def track_operation(operation: str, payment: Any) -> Generator[None]:
+    """Count and time one adapter operation on ``payment``."""
+    if not metrics_enabled():
+        yield
+        return
+    from getpaid_core.exceptions import InvalidTransitionError
+
+    backend = str(payment.backend)
+    outcome = 'error'
+    started = time.monotonic()
+    try:
+        yield
+        outcome = 'success'
+    except InvalidTransitionError:
+        outcome = 'invalid_transition'
+        raise
+    finally:
+        operation_duration.observe(
+            time.monotonic() - started, operation=operation, backend=backend
+        )
+        operations.inc(operation=operation, backend=backend, outcome=outcome)
+
+
+def record_transition(payment: Any, from_status: str) -> None:
+    """Count a status change of ``payment`` away from ``from_status``."""
+    if str(payment.status) == str(from_status) or not metrics_enabled():
+        return
+    transitions.inc(
+        backend=str(payment.backend),
+        from_status=from_status,
+        to_status=payment.status,
+    )
+
+
+def record_callback(backend: str, status_code: int, duration: float) -> None:
+    """Count and time a callback request that answered ``status_code``."""
+    if not metrics_enabled():
+        return
+    callbacks.inc(backend=backend, outcome=callback_outcome(status_code))
+    callback_duration.observe(duration, backend=backend)
+
+
+def callback_outcome(status_code: int) -> str:
+    if status_code < 400:
+        return 'accepted'
+    return {
+        400: 'malformed',
+        403: 'rejected',
+        404: 'not_found',
+        409: 'conflict',
+    }.get(status_code, 'error')
+
+
+def render() -> str:
+    """Return every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.header())
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+def reset() -> None:
+    """Forget every collected value (for tests)."""
+    for metric in REGISTRY:
+        metric.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
@@ -0,0 +1,151 @@
+# Generated by Django 6.0.9 on 2026-10-18 01:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('getpaid', '0009_alter_payment_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkJob',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'operation',
+                    models.CharField(max_length=32, verbose_name='operation'),
+                ),
+                (
+                    'payment_model',
+                    models.CharField(
+                        max_length=100, verbose_name='payment model'
+                    ),
+                ),
+                (
+                    'source_status',
+                    models.CharField(
+                        blank=True,
+                        default='',
+                        max_length=50,
+                        verbose_name='source status',
+                    ),
+                ),
+                (
+                    'payment_ids',
+                    models.JSONField(default=list, verbose_name='payment ids'),
+                ),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[
+                            ('pending', 'pending'),
+                            ('running', 'running'),
+                            ('done', 'done'),
+                        ],
+                        db_index=True,
+                        default='pending',
+                        max_length=20,
+                        verbose_name='status',
+                    ),
+                ),
+                (
+                    'total',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='total'
+                    ),
+                ),
+                (
+                    'cursor',
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text='Number of payment ids already claimed by workers.',
+                        verbose_name='cursor',
+                    ),
+                ),
+                (
+                    'claims',
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text='Claim token -> chunk being processed and its lease.',
+                        verbose_name='claims',
+                    ),
+                ),
+                (
+                    'lease_expires_on',
+                    models.DateTimeField(
+                        blank=True,
+                        help_text='Earliest expiry of the leases in claims.',
+                        null=True,
+                        verbose_name='lease expires on',
+                    ),
+                ),
+                (
+                    'processed',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='processed'
+                    ),
+                ),
+                (
+                    'succeeded',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='succeeded'
+                    ),
+                ),
+                (
+                    'failed',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='failed'
+                    ),
+                ),
+                (
+                    'skipped',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='skipped'
+                    ),
+                ),
+                (
+                    'failures',
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text='Payment id -> error message.',
+                        verbose_name='failures',
+                    ),
+                ),
+                (
+                    'created_on',
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name='created on'
+                    ),
+                ),
+                (
+                    'started_on',
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name='started on'
+                    ),
+                ),
+                (
+                    'finished_on',
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name='finished on'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Bulk payment job',
+                'verbose_name_plural': 'Bulk payment jobs',
+                'ordering': ['-created_on'],
+            },
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 6.0.9 on 2026-10-18 01:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('getpaid', '0010_bulkjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallbackInbox',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'payment_id',
+                    models.CharField(max_length=64, verbose_name='payment id'),
+                ),
+                (
+                    'backend',
+                    models.CharField(max_length=100, verbose_name='backend'),
+                ),
+                ('body', models.BinaryField(verbose_name='body')),
+                (
+                    'meta',
+                    models.JSONField(
+                        default=dict,
+                        help_text='Headers, content type, client address and path.',
+                        verbose_name='request metadata',
+                    ),
+                ),
+                (
+                    'correlation',
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name='correlation'
+                    ),
+                ),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[
+                            ('pending', 'pending'),
+                            ('applied', 'applied'),
+                            ('failed', 'failed'),
+                        ],
+                        default='pending',
+                        max_length=20,
+                        verbose_name='status',
+                    ),
+                ),
+                (
+                    'attempts',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='attempts'
+                    ),
+                ),
+                (
+                    'last_error',
+                    models.TextField(blank=True, verbose_name='last error'),
+                ),
+                (
+                    'received_on',
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name='received on'
+                    ),
+                ),
+                (
+                    'available_on',
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text='Earliest time the next attempt may run.',
+                        verbose_name='available on',
+                    ),
+                ),
+                (
+                    'processed_on',
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name='processed on'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Callback inbox entry',
+                'verbose_name_plural': 'Callback inbox',
+                'ordering': ['received_on', 'pk'],
+                'indexes': [
+                    models.Index(
+                        fields=['status', 'payment_id', 'received_on'],
+                        name='getpaid_inbox_pending_idx',
+                    )
+                ],
+            },
+        ),
+    ]
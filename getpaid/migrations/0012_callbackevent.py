@@ -0,0 +1,42 @@
+# Generated by Django 6.0.9 on 2026-10-18 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('getpaid', '0011_callbackinbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallbackEvent',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'key',
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name='key'
+                    ),
+                ),
+                (
+                    'expires_on',
+                    models.DateTimeField(
+                        db_index=True, verbose_name='expires on'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Callback event',
+                'verbose_name_plural': 'Callback events',
+            },
+        ),
+    ]
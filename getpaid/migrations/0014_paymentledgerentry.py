@@ -0,0 +1,108 @@
+# Generated by Django 6.0.9 on 2026-10-18 02:11
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('getpaid', '0013_payment_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('period', models.DateField(verbose_name='period')),
+                (
+                    'payment_id',
+                    models.CharField(max_length=64, verbose_name='payment id'),
+                ),
+                (
+                    'source',
+                    models.CharField(
+                        blank=True, max_length=32, verbose_name='source'
+                    ),
+                ),
+                (
+                    'payment_event',
+                    models.CharField(
+                        blank=True, max_length=32, verbose_name='payment event'
+                    ),
+                ),
+                (
+                    'fraud_event',
+                    models.CharField(
+                        blank=True, max_length=16, verbose_name='fraud event'
+                    ),
+                ),
+                (
+                    'status_before',
+                    models.CharField(
+                        max_length=50, verbose_name='status before'
+                    ),
+                ),
+                (
+                    'status_after',
+                    models.CharField(
+                        max_length=50, verbose_name='status after'
+                    ),
+                ),
+                (
+                    'amount_paid',
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=20,
+                        verbose_name='amount paid',
+                    ),
+                ),
+                (
+                    'amount_locked',
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=20,
+                        verbose_name='amount locked',
+                    ),
+                ),
+                (
+                    'amount_refunded',
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=20,
+                        verbose_name='amount refunded',
+                    ),
+                ),
+                (
+                    'provider_data_delta',
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text='Changed provider_data keys; removed keys map to null.',
+                        verbose_name='provider data delta',
+                    ),
+                ),
+                (
+                    'created_on',
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name='created on',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Payment ledger entry',
+                'verbose_name_plural': 'Payment ledger',
+                'ordering': ['created_on', 'id'],
+                'indexes': [
+                    models.Index(
+                        fields=['payment_id', 'created_on'],
+                        name='getpaid_ledger_payment_idx',
+                    ),
+                    models.Index(
+                        fields=['period'], name='getpaid_ledger_period_idx'
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 6.0.9 on 2026-10-18 02:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('getpaid', '0014_paymentledgerentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommunicationLogEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    'direction',
+                    models.CharField(
+                        choices=[
+                            ('outbound', 'outbound'),
+                            ('inbound', 'inbound'),
+                        ],
+                        max_length=10,
+                        verbose_name='direction',
+                    ),
+                ),
+                (
+                    'backend',
+                    models.CharField(
+                        blank=True, max_length=100, verbose_name='backend'
+                    ),
+                ),
+                (
+                    'payment_id',
+                    models.CharField(
+                        blank=True, max_length=64, verbose_name='payment id'
+                    ),
+                ),
+                (
+                    'method',
+                    models.CharField(
+                        help_text='Processor method, or HTTP method and path of a callback.',
+                        max_length=200,
+                        verbose_name='method',
+                    ),
+                ),
+                (
+                    'duration_ms',
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name='duration (ms)'
+                    ),
+                ),
+                (
+                    'payload_size',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='payload size'
+                    ),
+                ),
+                (
+                    'body',
+                    models.TextField(
+                        blank=True,
+                        help_text='Redacted, truncated payload.',
+                        verbose_name='body',
+                    ),
+                ),
+                (
+                    'response',
+                    models.TextField(
+                        blank=True,
+                        help_text='Redacted, truncated value returned by the gateway call.',
+                        verbose_name='response',
+                    ),
+                ),
+                (
+                    'error',
+                    models.CharField(
+                        blank=True, max_length=255, verbose_name='error'
+                    ),
+                ),
+                (
+                    'created_on',
+                    models.DateTimeField(
+                        db_index=True,
+                        default=django.utils.timezone.now,
+                        verbose_name='created on',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Communication log entry',
+                'verbose_name_plural': 'Communication log',
+                'ordering': ['-created_on', '-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 6.0.9 on 2026-10-18 02:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('getpaid', '0015_communicationlogentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentOperation',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    'payment_id',
+                    models.CharField(max_length=64, verbose_name='payment id'),
+                ),
+                (
+                    'backend',
+                    models.CharField(max_length=100, verbose_name='backend'),
+                ),
+                (
+                    'operation',
+                    models.CharField(max_length=32, verbose_name='operation'),
+                ),
+                (
+                    'amount',
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=20,
+                        null=True,
+                        verbose_name='amount',
+                    ),
+                ),
+                (
+                    'status_before',
+                    models.CharField(
+                        max_length=50, verbose_name='status before'
+                    ),
+                ),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[
+                            ('pending', 'pending'),
+                            ('applied', 'applied'),
+                            ('failed', 'failed'),
+                            ('abandoned', 'abandoned'),
+                        ],
+                        default='pending',
+                        max_length=20,
+                        verbose_name='status',
+                    ),
+                ),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                (
+                    'created_on',
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name='created on',
+                    ),
+                ),
+                (
+                    'finished_on',
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name='finished on'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Payment operation',
+                'verbose_name_plural': 'Payment operations',
+                'ordering': ['created_on', 'id'],
+                'indexes': [
+                    models.Index(
+                        fields=['status', 'created_on'],
+                        name='getpaid_operation_status_idx',
+                    )
+                ],
+                'constraints': [
+                    models.UniqueConstraint(
+                        condition=models.Q(('status', 'pending')),
+                        fields=('payment_id',),
+                        name='getpaid_one_pending_operation',
+                    )
+                ],
+            },
+        ),
+    ]
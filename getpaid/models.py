@@ -1,4 +1,7 @@
 import swapper
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
 from .abstracts import AbstractOrder, AbstractPayment  # noqa
 
@@ -6,3 +9,316 @@ from .abstracts import AbstractOrder, AbstractPayment  # noqa
 class Payment(AbstractPayment):
     class Meta(AbstractPayment.Meta):
         swappable = swapper.swappable_setting('getpaid', 'Payment')
+
+
+class BulkJobStatus(models.TextChoices):
+    PENDING = 'pending', _('pending')
+    RUNNING = 'running', _('running')
+    DONE = 'done', _('done')
+
+
+class BulkJob(models.Model):
+    """A bulk payment operation queued for ``manage.py getpaid_worker``.
+
+    ``payment_ids`` is consumed in chunks: each worker claims the next
+    ``[cursor, cursor + chunk_size)`` slice and adds its outcome to the
+    counters, so several workers can process one job at once. Claimed
+    chunks are leased in ``claims``; a chunk whose lease expired (e.g.
+    its worker died) is claimed again by the next worker.
+    """
+
+    operation = models.CharField(_('operation'), max_length=32)
+    payment_model = models.CharField(_('payment model'), max_length=100)
+    source_status = models.CharField(
+        _('source status'), max_length=50, blank=True, default=''
+    )
+    payment_ids = models.JSONField(_('payment ids'), default=list)
+    status = models.CharField(
+        _('status'),
+        max_length=20,
+        choices=BulkJobStatus.choices,
+        default=BulkJobStatus.PENDING,
+        db_index=True,
+    )
+    total = models.PositiveIntegerField(_('total'), default=0)
+    cursor = models.PositiveIntegerField(
+        _('cursor'),
+        default=0,
+        help_text=_('Number of payment ids already claimed by workers.'),
+    )
+    claims = models.JSONField(
+        _('claims'),
+        default=dict,
+        blank=True,
+        help_text=_('Claim token -> chunk being processed and its lease.'),
+    )
+    lease_expires_on = models.DateTimeField(
+        _('lease expires on'),
+        null=True,
+        blank=True,
+        help_text=_('Earliest expiry of the leases in claims.'),
+    )
+    processed = models.PositiveIntegerField(_('processed'), default=0)
+    succeeded = models.PositiveIntegerField(_('succeeded'), default=0)
+    failed = models.PositiveIntegerField(_('failed'), default=0)
+    skipped = models.PositiveIntegerField(_('skipped'), default=0)
+    failures = models.JSONField(
+        _('failures'),
+        default=dict,
+        blank=True,
+        help_text=_('Payment id -> error message.'),
+    )
+    created_on = models.DateTimeField(_('created on'), auto_now_add=True)
+    started_on = models.DateTimeField(_('started on'), null=True, blank=True)
+    finished_on = models.DateTimeField(_('finished on'), null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_on']
+        verbose_name = _('Bulk payment job')
+        verbose_name_plural = _('Bulk payment jobs')
+
+    def __str__(self):
+        return f'Bulk {self.operation} #{self.pk}'
+
+    @property
+    def progress(self) -> int:
+        """Percentage of payments processed."""
+        if not self.total:
+            return 100
+        return self.processed * 100 // self.total
+
+
+class CallbackInboxStatus(models.TextChoices):
+    PENDING = 'pending', _('pending')
+    APPLIED = 'applied', _('applied')
+    FAILED = 'failed', _('failed')
+
+
+class CallbackInbox(models.Model):
+    """A verified provider callback waiting to be applied.
+
+    Written by the callback views when ``GETPAID['CALLBACK_MODE']`` is
+    ``'ingest'`` and drained by ``manage.py getpaid_drain_callbacks``.
+    The stored body and request metadata are enough to rebuild the
+    original request for the processor.
+    """
+
+    payment_id = models.CharField(_('payment id'), max_length=64)
+    backend = models.CharField(_('backend'), max_length=100)
+    body = models.BinaryField(_('body'))
+    meta = models.JSONField(
+        _('request metadata'),
+        default=dict,
+        help_text=_('Headers, content type, client address and path.'),
+    )
+    correlation = models.JSONField(_('correlation'), default=dict, blank=True)
+    status = models.CharField(
+        _('status'),
+        max_length=20,
+        choices=CallbackInboxStatus.choices,
+        default=CallbackInboxStatus.PENDING,
+    )
+    attempts = models.PositiveIntegerField(_('attempts'), default=0)
+    last_error = models.TextField(_('last error'), blank=True)
+    received_on = models.DateTimeField(_('received on'), auto_now_add=True)
+    available_on = models.DateTimeField(
+        _('available on'),
+        default=timezone.now,
+        help_text=_('Earliest time the next attempt may run.'),
+    )
+    processed_on = models.DateTimeField(
+        _('processed on'), null=True, blank=True
+    )
+
+    class Meta:
+        ordering = ['received_on', 'pk']
+        verbose_name = _('Callback inbox entry')
+        verbose_name_plural = _('Callback inbox')
+        indexes = [
+            models.Index(
+                fields=['status', 'payment_id', 'received_on'],
+                name='getpaid_inbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Callback #{self.pk} for payment {self.payment_id}'
+
+
+class CallbackEvent(models.Model):
+    """Provider callback event already applied, for ``DatabaseDedupStore``."""
+
+    key = models.CharField(_('key'), max_length=255, unique=True)
+    expires_on = models.DateTimeField(_('expires on'), db_index=True)
+
+    class Meta:
+        verbose_name = _('Callback event')
+        verbose_name_plural = _('Callback events')
+
+    def __str__(self):
+        return self.key
+
+
+class PaymentLedgerEntry(models.Model):
+    """One payment update applied to a payment, written by
+    :mod:`getpaid.ledger`.
+
+    Rows are append-only. ``period`` (the first day of the month the entry
+    was written in) is the partitioning key: old months can be archived or
+    dropped by period, or the table can be range-partitioned on it.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    period = models.DateField(_('period'))
+    payment_id = models.CharField(_('payment id'), max_length=64)
+    source = models.CharField(_('source'), max_length=32, blank=True)
+    payment_event = models.CharField(
+        _('payment event'), max_length=32, blank=True
+    )
+    fraud_event = models.CharField(_('fraud event'), max_length=16, blank=True)
+    status_before = models.CharField(_('status before'), max_length=50)
+    status_after = models.CharField(_('status after'), max_length=50)
+    amount_paid = models.DecimalField(
+        _('amount paid'), decimal_places=2, max_digits=20
+    )
+    amount_locked = models.DecimalField(
+        _('amount locked'), decimal_places=2, max_digits=20
+    )
+    amount_refunded = models.DecimalField(
+        _('amount refunded'), decimal_places=2, max_digits=20
+    )
+    provider_data_delta = models.JSONField(
+        _('provider data delta'),
+        default=dict,
+        blank=True,
+        help_text=_('Changed provider_data keys; removed keys map to null.'),
+    )
+    created_on = models.DateTimeField(_('created on'), default=timezone.now)
+
+    class Meta:
+        ordering = ['created_on', 'id']
+        verbose_name = _('Payment ledger entry')
+        verbose_name_plural = _('Payment ledger')
+        indexes = [
+            models.Index(
+                fields=['payment_id', 'created_on'],
+                name='getpaid_ledger_payment_idx',
+            ),
+            models.Index(fields=['period'], name='getpaid_ledger_period_idx'),
+        ]
+
+    def __str__(self):
+        return (
+            f'Payment {self.payment_id}: '
+            f'{self.status_before} -> {self.status_after}'
+        )
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Payment ledger entries are append-only.')
+        super().save(*args, **kwargs)
+
+
+class CommunicationDirection(models.TextChoices):
+    OUTBOUND = 'outbound', _('outbound')
+    INBOUND = 'inbound', _('inbound')
+
+
+class CommunicationLogEntry(models.Model):
+    """One sampled gateway call or provider callback.
+
+    Written in batches by :mod:`getpaid.commlog` and pruned by
+    ``manage.py getpaid_prune_communication_log``.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    direction = models.CharField(
+        _('direction'), max_length=10, choices=CommunicationDirection.choices
+    )
+    backend = models.CharField(_('backend'), max_length=100, blank=True)
+    payment_id = models.CharField(_('payment id'), max_length=64, blank=True)
+    method = models.CharField(
+        _('method'),
+        max_length=200,
+        help_text=_('Processor method, or HTTP method and path of a callback.'),
+    )
+    duration_ms = models.PositiveIntegerField(
+        _('duration (ms)'), null=True, blank=True
+    )
+    payload_size = models.PositiveIntegerField(_('payload size'), default=0)
+    body = models.TextField(
+        _('body'), blank=True, help_text=_('Redacted, truncated payload.')
+    )
+    response = models.TextField(
+        _('response'),
+        blank=True,
+        help_text=_('Redacted, truncated value returned by the gateway call.'),
+    )
+    error = models.CharField(_('error'), max_length=255, blank=True)
+    created_on = models.DateTimeField(
+        _('created on'), default=timezone.now, db_index=True
+    )
+
+    class Meta:
+        ordering = ['-created_on', '-id']
+        verbose_name = _('Communication log entry')
+        verbose_name_plural = _('Communication log')
+
+    def __str__(self):
+        return f'{self.direction} {self.backend} {self.method}'
+
+
+class PaymentOperationStatus(models.TextChoices):
+    PENDING = 'pending', _('pending')
+    APPLIED = 'applied', _('applied')
+    FAILED = 'failed', _('failed')
+    ABANDONED = 'abandoned', _('abandoned')
+
+
+class PaymentOperation(models.Model):
+    """Intent of a gateway operation run in two-phase mode.
+
+    Written by :mod:`getpaid.operations` before the processor is called
+    and completed once the resulting update is applied. Intents left
+    pending by a crashed worker are resolved by
+    ``manage.py getpaid_recover_operations``.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    payment_id = models.CharField(_('payment id'), max_length=64)
+    backend = models.CharField(_('backend'), max_length=100)
+    operation = models.CharField(_('operation'), max_length=32)
+    amount = models.DecimalField(
+        _('amount'), decimal_places=2, max_digits=20, null=True, blank=True
+    )
+    status_before = models.CharField(_('status before'), max_length=50)
+    status = models.CharField(
+        _('status'),
+        max_length=20,
+        choices=PaymentOperationStatus.choices,
+        default=PaymentOperationStatus.PENDING,
+    )
+    error = models.TextField(_('error'), blank=True)
+    created_on = models.DateTimeField(_('created on'), default=timezone.now)
+    finished_on = models.DateTimeField(_('finished on'), null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_on', 'id']
+        verbose_name = _('Payment operation')
+        verbose_name_plural = _('Payment operations')
+        indexes = [
+            models.Index(
+                fields=['status', 'created_on'],
+                name='getpaid_operation_status_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['payment_id'],
+                condition=models.Q(status='pending'),
+                name='getpaid_one_pending_operation',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.operation} #{self.pk} for payment {self.payment_id}'
@@ -0,0 +1,182 @@
+"""Two-phase payment operations: gateway I/O outside database transactions.
+
+By default ``charge``, ``release_lock``, ``start_refund``,
+``cancel_refund`` and ``fetch_and_update_status`` run inside one
+transaction, so a connection, a transaction and (for status fetches) a
+row lock are held for the whole gateway round-trip. With
+``GETPAID['TWO_PHASE_OPERATIONS'] = True`` the adapter instead:
+
+1. records a :class:`~getpaid.models.PaymentOperation` intent and commits
+   it (only one intent per payment may be pending at a time),
+2. calls the processor with no transaction open,
+3. locks and reloads the payment in a short transaction, applies the
+   resulting update and marks the intent applied.
+
+A failed gateway call or update marks the intent failed. Intents left
+pending by a worker that died between the phases are resolved by
+``manage.py getpaid_recover_operations``, which fetches the gateway
+status where the backend supports it.
+
+Inside an outer transaction (e.g. ``ATOMIC_REQUESTS``) the phases still
+run in order but cannot commit separately.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import swapper
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from getpaid_core.exceptions import InvalidTransitionError
+
+from getpaid.bridge import bridge
+from getpaid.exceptions import OperationInProgressError
+from getpaid.repository import (
+    DjangoPaymentRepository,
+    optimistic_locking_enabled,
+)
+
+logger = logging.getLogger(__name__)
+
+#: Adapter operations that run in two phases when enabled.
+TWO_PHASE_OPERATIONS = frozenset({
+    'fetch_status',
+    'charge',
+    'release_lock',
+    'start_refund',
+    'cancel_refund',
+})
+
+DEFAULT_RECOVERY_AGE = timedelta(minutes=10)
+
+
+def two_phase_enabled() -> bool:
+    """Return True if ``GETPAID['TWO_PHASE_OPERATIONS']`` is on."""
+    from django.conf import settings
+
+    config = getattr(settings, 'GETPAID', {})
+    return bool(config.get('TWO_PHASE_OPERATIONS', False))
+
+
+def run_two_phase(adapter, operation: str, kwargs: dict):
+    """Run ``operation`` through ``adapter`` in two phases; return the
+    processor result."""
+    intent = _begin(adapter, operation, kwargs.get('amount'))
+    try:
+        result = bridge.call(
+            adapter.processor, adapter.processor_method(operation), **kwargs
+        )
+    except Exception as exc:
+        _finish(intent, 'failed', str(exc) or type(exc).__name__)
+        raise
+    try:
+        with transaction.atomic():
+            _reload_for_update(adapter.payment)
+            adapter.check(operation)
+            DjangoPaymentRepository(adapter.model_class)._apply_update(
+                adapter.payment,
+                lambda: adapter.update_for(operation, result),
+                source=operation,
+            )
+            _finish(intent, 'applied', '')
+    except Exception as exc:
+        # The gateway already acted; keep the reason for manual review.
+        logger.exception(
+            'Applying %s result for payment %s failed',
+            operation,
+            adapter.payment.pk,
+        )
+        _finish(intent, 'failed', str(exc) or type(exc).__name__)
+        raise
+    return result
+
+
+@dataclass
+class RecoveryReport:
+    """Outcome of :func:`recover_operations`, keyed by intent id."""
+
+    reconciled: list[int] = field(default_factory=list)
+    unresolved: dict[int, str] = field(default_factory=dict)
+
+
+def recover_operations(
+    older_than: timedelta = DEFAULT_RECOVERY_AGE,
+) -> RecoveryReport:
+    """Resolve intents pending for longer than ``older_than``.
+
+    Each stale intent is marked abandoned and the payment's status is
+    fetched from the gateway so the outcome of the interrupted call is
+    applied. Intents whose payment cannot be fetched are reported as
+    unresolved and keep the reason in ``error``.
+    """
+    from getpaid.models import PaymentOperation, PaymentOperationStatus
+
+    Payment = swapper.load_model('getpaid', 'Payment')
+    report = RecoveryReport()
+    stale = PaymentOperation.objects.filter(
+        status=PaymentOperationStatus.PENDING,
+        created_on__lte=timezone.now() - older_than,
+    )
+    for intent in stale:
+        _finish(intent, PaymentOperationStatus.ABANDONED, '')
+        try:
+            payment = Payment.objects.get(pk=intent.payment_id)
+            payment.fetch_and_update_status()
+        except InvalidTransitionError:
+            # The fetched status is already applied.
+            pass
+        except NotImplementedError:
+            error = 'Status fetch not supported; reconcile manually.'
+            _record_error(intent, error)
+            report.unresolved[intent.pk] = error
+            continue
+        except Exception as exc:
+            error = str(exc) or type(exc).__name__
+            _record_error(intent, error)
+            report.unresolved[intent.pk] = error
+            continue
+        report.reconciled.append(intent.pk)
+    return report
+
+
+def _begin(adapter, operation, amount):
+    from getpaid.models import PaymentOperation
+
+    payment = adapter.payment
+    adapter.check(operation)
+    try:
+        with transaction.atomic():
+            return PaymentOperation.objects.create(
+                payment_id=str(payment.pk),
+                backend=str(payment.backend),
+                operation=operation,
+                amount=amount,
+                status_before=str(payment.status),
+            )
+    except IntegrityError as exc:
+        raise OperationInProgressError(
+            f'Payment {payment.pk} has another operation in progress.'
+        ) from exc
+
+
+def _reload_for_update(payment) -> None:
+    manager = type(payment)._default_manager
+    if optimistic_locking_enabled():
+        payment.refresh_from_db()
+    else:
+        payment.refresh_from_db(from_queryset=manager.select_for_update())
+
+
+def _finish(intent, status: str, error: str) -> None:
+    intent.status = status
+    intent.error = error
+    intent.finished_on = timezone.now()
+    intent.save(update_fields=['status', 'error', 'finished_on'])
+
+
+def _record_error(intent, error: str) -> None:
+    intent.error = error
+    intent.save(update_fields=['error'])
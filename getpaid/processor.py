@@ -16,6 +16,8 @@ from django.http import HttpRequest
 from django.views import View
 from getpaid_core.processor import BaseProcessor as CoreBaseProcessor
 
+from getpaid.clients import get_shared_client
+
 
 class BaseProcessor(CoreBaseProcessor):
     """Django adapter for core BaseProcessor.
@@ -30,6 +32,12 @@ class BaseProcessor(CoreBaseProcessor):
     post_template_name: str | None = None
     client_class: type | str | None = None
     client: object | None = None
+    #: Reuse one client per backend and client parameters across processor
+    #: instances (see :mod:`getpaid.clients`). Off by default: a shared
+    #: client must be safe to use from several threads and, for async
+    #: clients, stay on one event loop, which only the backend can vouch
+    #: for.
+    share_client: bool = False
     ok_statuses: list[int] = [200]
 
     def __init__(self, payment, config=None) -> None:
@@ -45,7 +53,11 @@ class BaseProcessor(CoreBaseProcessor):
             self.slug = self.path  # ty: ignore[invalid-attribute-access]
         self.optional_config = getattr(django_settings, 'GETPAID', {})
         if self.client_class is not None:
-            self.client = self.get_client()
+            self.client = (
+                get_shared_client(self)
+                if self.share_client
+                else self.get_client()
+            )
 
     def get_setting(self, name: str, default: Any | None = None) -> Any:
         """Read setting from backend config, falling back to GETPAID global."""
@@ -120,6 +132,19 @@ class BaseProcessor(CoreBaseProcessor):
             return cls.sandbox_url
         return cls.production_url
 
+    @classmethod
+    def get_callback_event_id(
+        cls, data: Mapping[str, Any], headers: Mapping[str, str]
+    ) -> str | None:
+        """Return the provider's unique id of a callback event, if any.
+
+        Override in backends whose gateway redelivers webhooks with a stable
+        event id (e.g. Stripe's ``id``). When it returns a value and
+        ``GETPAID['CALLBACK_DEDUP']`` is configured, repeated deliveries are
+        acknowledged before the payment row is locked.
+        """
+        return None
+
     @staticmethod
     def get_our_baseurl(request: HttpRequest | None = None, **kwargs) -> str:
         """Get base URL for our site.
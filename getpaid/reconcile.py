@@ -0,0 +1,256 @@
+"""Bulk PULL-mode status reconciliation.
+
+Payments whose webhook never arrived stay in an intermediate status
+forever. :func:`reconcile_payments` walks them in batches:
+
+1. candidate primary keys are streamed with ``iterator(chunk_size=...)``;
+2. ``fetch_payment_status`` runs concurrently for the whole batch on the
+   async runner, throttled per backend, without holding any row lock;
+3. the returned updates are applied to the batch under
+   ``select_for_update(skip_locked=True)`` and saved with one
+   ``bulk_update``. Payments whose status changed meanwhile (e.g. the
+   webhook finally arrived) or that are locked elsewhere are skipped.
+
+``manage.py getpaid_reconcile`` is the command-line front end.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+
+import swapper
+from django.db import transaction
+from django.utils import timezone
+from getpaid_core.fsm import apply_payment_update
+
+from getpaid import ledger
+from getpaid.bridge import bridge
+from getpaid.bulk import DEFAULT_CHUNK_SIZE, DEFAULT_CONCURRENCY, _get_setting
+from getpaid.flow_adapter import DjangoPaymentFlowAdapter
+from getpaid.repository import DjangoPaymentRepository
+from getpaid.types import PaymentStatus
+
+#: Statuses a payment can get stuck in when its webhook is lost.
+RECONCILE_STATUSES = (
+    PaymentStatus.PREPARED,
+    PaymentStatus.IN_CHARGE,
+    PaymentStatus.REFUND_STARTED,
+)
+
+
+@dataclass
+class ReconcileReport:
+    """Outcome and throughput of a :func:`reconcile_payments` run."""
+
+    scanned: int = 0
+    #: Payments an update was applied to.
+    updated: int = 0
+    #: Payments the gateway reported no change for.
+    unchanged: int = 0
+    #: Payments locked elsewhere or whose status changed during the run.
+    skipped: int = 0
+    #: Payments whose backend does not implement ``fetch_payment_status``.
+    unsupported: int = 0
+    #: Primary key -> exception raised for that payment.
+    failed: dict[Any, BaseException] = field(default_factory=dict)
+    batches: int = 0
+    #: Wall-clock seconds spent waiting for gateways.
+    fetch_seconds: float = 0.0
+    #: Wall-clock seconds for the whole run.
+    elapsed: float = 0.0
+
+    @property
+    def payments_per_second(self) -> float:
+        return self.scanned / self.elapsed if self.elapsed else 0.0
+
+
+class RateLimiter:
+    """Space calls at least ``1 / rate`` seconds apart.
+
+    Slots are reserved under a thread lock, so one limiter can be shared by
+    coroutines on the runner loop and by sync processors called inline.
+    """
+
+    def __init__(self, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError('Rate limit must be positive.')
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+            return slot - now
+
+    async def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def wait(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def reconcile_payments(
+    queryset=None,
+    *,
+    statuses: Iterable[str] = RECONCILE_STATUSES,
+    older_than: timedelta | None = timedelta(minutes=15),
+    backends: Iterable[str] | None = None,
+    batch_size: int | None = None,
+    concurrency: int | None = None,
+    rate_limits: Mapping[str, float] | None = None,
+    limit: int | None = None,
+) -> ReconcileReport:
+    """Fetch and apply gateway status for stale payments.
+
+    :param queryset: Payments to consider; defaults to every payment.
+    :param statuses: Only payments in these statuses are reconciled.
+    :param older_than: Skip payments created more recently than this.
+    :param backends: Restrict to these backend keys.
+    :param batch_size: Payments fetched and locked together. Defaults to
+        ``GETPAID['BULK_ACTION_CHUNK_SIZE']``.
+    :param concurrency: Gateway calls in flight at once. Defaults to
+        ``GETPAID['BULK_ACTION_CONCURRENCY']``.
+    :param rate_limits: Backend slug -> maximum calls per second. Backends
+        not listed use their ``reconcile_rate_limit`` setting, if any.
+    :param limit: Stop after this many payments.
+    :return: A :class:`ReconcileReport`.
+    """
+    started = time.monotonic()
+    if batch_size is None:
+        batch_size = _get_setting('BULK_ACTION_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    if concurrency is None:
+        concurrency = _get_setting(
+            'BULK_ACTION_CONCURRENCY', DEFAULT_CONCURRENCY
+        )
+    if queryset is None:
+        model_class = swapper.load_model('getpaid', 'Payment')
+        queryset = model_class._default_manager.all()
+    statuses = list(statuses)
+    queryset = queryset.filter(status__in=statuses)
+    if older_than is not None:
+        queryset = queryset.filter(created_on__lte=timezone.now() - older_than)
+    if backends is not None:
+        queryset = queryset.filter(backend__in=list(backends))
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    if limit is not None:
+        pks = pks[:limit]
+
+    report = ReconcileReport()
+    limiters = _Limiters(rate_limits or {})
+    batch = []
+    for pk in pks.iterator(chunk_size=batch_size):
+        batch.append(pk)
+        if len(batch) == batch_size:
+            _reconcile_batch(
+                queryset.model, batch, statuses, concurrency, limiters, report
+            )
+            batch = []
+    if batch:
+        _reconcile_batch(
+            queryset.model, batch, statuses, concurrency, limiters, report
+        )
+    report.elapsed = time.monotonic() - started
+    return report
+
+
+class _Limiters:
+    def __init__(self, rate_limits: Mapping[str, float]) -> None:
+        self._rate_limits = dict(rate_limits)
+        self._limiters: dict[str, RateLimiter | None] = {}
+
+    def get(self, processor) -> RateLimiter | None:
+        slug = getattr(processor, 'slug', '')
+        if slug not in self._limiters:
+            rate = self._rate_limits.get(slug)
+            if rate is None:
+                rate = processor.get_setting('reconcile_rate_limit')
+            self._limiters[slug] = RateLimiter(float(rate)) if rate else None
+        return self._limiters[slug]
+
+
+def _reconcile_batch(model_class, pks, statuses, concurrency, limiters, report):
+    report.batches += 1
+    report.scanned += len(pks)
+    payments = list(
+        model_class._default_manager.select_related('order').filter(
+            pk__in=pks, status__in=statuses
+        )
+    )
+    report.skipped += len(pks) - len(payments)
+
+    adapters = []
+    calls = []
+    for payment in payments:
+        adapter = DjangoPaymentFlowAdapter(payment, model_class)
+        try:
+            method = adapter.processor_method('fetch_status')
+            # Resolved (and cached) here so a bad setting fails this
+            # payment only.
+            limiters.get(adapter.processor)
+        except Exception as exc:
+            report.failed[payment.pk] = exc
+            continue
+        adapters.append(adapter)
+        calls.append((adapter.processor, method, {}))
+
+    fetch_started = time.monotonic()
+    # Throttling happens before each call's deadline and circuit breaker.
+    results = bridge.call_many(
+        calls, concurrency=concurrency, limiter_for=limiters.get
+    )
+    report.fetch_seconds += time.monotonic() - fetch_started
+
+    updates = {}
+    for adapter, result in zip(adapters, results, strict=True):
+        payment = adapter.payment
+        if isinstance(result, NotImplementedError):
+            report.unsupported += 1
+        elif isinstance(result, BaseException):
+            report.failed[payment.pk] = result
+        elif result is None:
+            report.unchanged += 1
+        else:
+            updates[payment.pk] = (payment.status, result)
+    if not updates:
+        return
+
+    with transaction.atomic():
+        locked = list(
+            model_class._default_manager
+            .select_for_update(skip_locked=True)
+            .select_related('order')
+            .filter(pk__in=list(updates))
+        )
+        report.skipped += len(updates) - len(locked)
+        changed = []
+        applied = []
+        for payment in locked:
+            expected_status, update = updates[payment.pk]
+            if payment.status != expected_status:
+                report.skipped += 1
+                continue
+            before = ledger.capture(payment)
+            try:
+                apply_payment_update(payment, update)
+            except Exception as exc:
+                report.failed[payment.pk] = exc
+                continue
+            changed.append(payment)
+            applied.append((payment, update, before))
+        DjangoPaymentRepository(model_class)._bulk_save(changed)
+        for payment, update, before in applied:
+            ledger.record(payment, update, before, source='reconcile')
+        report.updated += len(changed)
@@ -1,12 +1,17 @@
 """Django-specific plugin registry wrapping getpaid-core."""
 
+import hashlib
 import importlib
+import threading
+from dataclasses import dataclass, field
 
 from django.urls import include, path
 from getpaid_core.processor import BaseProcessor
 from getpaid_core.registry import PluginRegistry as CorePluginRegistry
 from getpaid_core.registry import registry as core_registry
 
+from getpaid import circuit
+
 
 def _importable(name):
     try:
@@ -16,44 +21,112 @@ def _importable(name):
         return False
 
 
+@dataclass(frozen=True)
+class _RegistryIndex:
+    """Precomputed lookups for one registry generation."""
+
+    generation: int
+    # slug or alias -> processor class
+    by_key: dict[str, type[BaseProcessor]] = field(default_factory=dict)
+    # alias (module path) -> slug
+    alias_to_slug: dict[str, str] = field(default_factory=dict)
+    # slug -> every key resolving to it, slug included
+    aliases: dict[str, frozenset[str]] = field(default_factory=dict)
+    # upper-case currency code -> backends accepting it, in registration
+    # order
+    by_currency: dict[str, tuple[type[BaseProcessor], ...]] = field(
+        default_factory=dict
+    )
+    # upper-case currency code -> (slug, display name) choices
+    choices_by_currency: dict[str, tuple[tuple[str, str], ...]] = field(
+        default_factory=dict
+    )
+    # upper-case currency code -> digest of its backends (see
+    # _backends_digest)
+    digest_by_currency: dict[str, str] = field(default_factory=dict)
+
+
+def _class_aliases(processor_class) -> list[str]:
+    class_module = processor_class.__module__
+    aliases = [class_module, f'{class_module}.{processor_class.__name__}']
+    if class_module.endswith('.processor'):
+        aliases.append(class_module.rsplit('.', 1)[0])
+    return aliases
+
+
 class DjangoPluginRegistry:
     """Django adapter for getpaid-core's PluginRegistry.
 
     Adds Django-specific features: URL generation, module-based
     registration (backward compat), and CHOICES-format helpers.
+
+    Lookups are served from a precomputed index (slug/alias -> class,
+    alias -> slug, slug -> aliases, currency -> backends). The index is
+    rebuilt only when :attr:`generation` changes, i.e. after
+    ``register``/``unregister`` here or :meth:`invalidate`, so hot-path
+    lookups are plain dict hits. A slug registered directly on the core
+    registry is added to the index the first time ``in`` or
+    ``get_by_slug`` finds it there, so every lookup agrees from then on;
+    call :meth:`invalidate` to pick such backends up before that.
     """
 
     def __init__(self, core_registry: CorePluginRegistry) -> None:
         self._core = core_registry
         # Map from module path -> slug for backward compat
         self._module_map: dict[str, str] = {}
+        # Classes registered through this wrapper, by slug
+        self._registered: dict[str, type[BaseProcessor]] = {}
+        # Classes found on the core registry after the index was built
+        self._adopted: dict[str, type[BaseProcessor]] = {}
+        self._generation = 0
+        self._index: _RegistryIndex | None = None
+        self._index_lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped whenever the set of registered backends changes.
+
+        Caches derived from the registry compare it to detect staleness.
+        """
+        return self._generation
+
+    def invalidate(self) -> None:
+        """Rebuild the index on next use.
+
+        Needed only after registering or unregistering backends directly
+        on the core registry.
+        """
+        with self._index_lock:
+            self._generation += 1
 
     def __contains__(self, item):
-        return item in self._module_map or self._has_slug(item)
+        if item in self._get_index().by_key:
+            return True
+        try:
+            self._adopt(item)
+        except KeyError:
+            return False
+        return True
 
     def __getitem__(self, item):
         return self.get_by_slug(item)
 
     def get_by_slug(self, item):
-        self._sync_aliases_from_core()
-        slug = self._module_map.get(item) or item
-        return self._core.get_by_slug(slug)
+        processor_class = self._get_index().by_key.get(item)
+        if processor_class is None:
+            # Let core raise its BackendNotFoundError.
+            return self._adopt(item)
+        return processor_class
 
     def resolve_backend(self, item: str) -> str:
         return self.get_by_slug(item).slug
 
     def get_aliases(self, item: str) -> set[str]:
         processor = self.get_by_slug(item)
-        aliases = {processor.slug}
-        aliases.update(
-            alias
-            for alias, slug in self._module_map.items()
-            if slug == processor.slug
-        )
-        return aliases
+        return set(self._get_index().aliases[processor.slug])
 
     def __iter__(self):
-        return iter(self._all_keys())
+        return iter(self._get_index().by_key)
 
     def register(self, module_or_proc):
         """Register a backend by class or module (backward compat).
@@ -66,33 +139,85 @@ class DjangoPluginRegistry:
             module_or_proc, BaseProcessor
         ):
             self._core.register(module_or_proc)
-            self._remember_aliases(module_or_proc)
+            self._registered[module_or_proc.slug] = module_or_proc
+            self.invalidate()
             return
 
         # Module-based registration (v2 backward compat)
         processor = module_or_proc.processor.PaymentProcessor
         self._core.register(processor)
-        self._remember_aliases(processor)
+        self._registered[processor.slug] = processor
         self._module_map[module_or_proc.__name__] = processor.slug
+        self.invalidate()
 
     def unregister(self, slug_or_module_path: str):
         """Remove a backend by slug or module path."""
-        slug = self._module_map.pop(slug_or_module_path, slug_or_module_path)
+        slug = self._get_index().alias_to_slug.get(
+            slug_or_module_path, slug_or_module_path
+        )
         self._core.unregister(slug)
+        self._registered.pop(slug, None)
+        self._adopted.pop(slug, None)
+        for alias in [k for k, v in self._module_map.items() if v == slug]:
+            del self._module_map[alias]
+        self.invalidate()
 
     def get_choices(self, currency):
-        """Get CHOICES for plugins supporting given currency."""
-        return self._core.get_choices(currency.upper())
+        """Get CHOICES for plugins supporting given currency.
+
+        Built from the choices precomputed in the registry index. Backends
+        whose circuit breaker is open are left out.
+        """
+        index = self._get_index()
+        key = _currency_key(index, currency)
+        backends = index.by_currency.get(key, ())
+        if all(circuit.is_available(backend.slug) for backend in backends):
+            return list(index.choices_by_currency.get(key, ()))
+        return [
+            (backend.slug, backend.display_name)
+            for backend in backends
+            if circuit.is_available(backend.slug)
+        ]
 
     def get_backends(self, currency):
-        """Get backend classes supporting given currency."""
-        return self._core.get_for_currency(currency.upper())
+        """Get backend classes supporting given currency.
+
+        Backends whose circuit breaker is open are left out.
+        """
+        index = self._get_index()
+        return [
+            backend
+            for backend in index.by_currency.get(
+                _currency_key(index, currency), ()
+            )
+            if circuit.is_available(backend.slug)
+        ]
+
+    def get_backends_cache_key(self, currency) -> str:
+        """Return a key identifying the backend choices for ``currency``.
+
+        It holds a digest of the backends accepting ``currency`` and the
+        slugs of those whose circuit breaker is open, so it can key cached
+        fragments of a payment chooser. Unlike :attr:`generation`, the
+        digest is the same in every process offering the same backends,
+        so processes sharing a cache never serve each other's choices.
+        """
+        index = self._get_index()
+        key = _currency_key(index, currency)
+        backends = index.by_currency.get(key, ())
+        digest = index.digest_by_currency.get(key, _NO_BACKENDS_DIGEST)
+        unavailable = ','.join(
+            backend.slug
+            for backend in backends
+            if not circuit.is_available(backend.slug)
+        )
+        return f'{key}:{digest}:{unavailable}'
 
     @property
     def urls(self):
         """Provide URL structure for registered plugins with urls modules."""
         result = []
-        for module_path, slug in self._module_map.items():
+        for module_path, slug in self._get_index().alias_to_slug.items():
             urls_module = f'{module_path}.urls'
             if _importable(urls_module):
                 proc_class = self._core.get_by_slug(slug)
@@ -112,34 +237,100 @@ class DjangoPluginRegistry:
         currencies = self._core.get_all_currencies()
         return [(c.upper(), c.upper()) for c in currencies]
 
-    def _has_slug(self, item):
-        try:
-            self.get_by_slug(item)
-            return True
-        except KeyError:
-            return False
+    def _adopt(self, item) -> type[BaseProcessor]:
+        """Return ``item`` from the core registry and add it to the index.
+
+        Used when ``item`` misses the index: it was registered directly on
+        the core registry after the index was built.
+        """
+        processor_class = self._core.get_by_slug(item)
+        with self._index_lock:
+            self._adopted[processor_class.slug] = processor_class
+            self._generation += 1
+        return processor_class
 
-    def _all_keys(self):
-        """Return all keys (both module paths and slugs)."""
-        self._sync_aliases_from_core()
-        keys = set(self._module_map.keys())
-        keys.update(self._core._backends.keys())
-        return keys
-
-    def _remember_aliases(self, processor_class):
-        class_module = processor_class.__module__
-        self._module_map[class_module] = processor_class.slug
-        self._module_map[f'{class_module}.{processor_class.__name__}'] = (
-            processor_class.slug
+    def _get_index(self) -> _RegistryIndex:
+        index = self._index
+        generation = self._generation
+        if index is not None and index.generation == generation:
+            return index
+        with self._index_lock:
+            index = self._index
+            generation = self._generation
+            if index is None or index.generation != generation:
+                index = self._build_index(generation)
+                self._index = index
+        return index
+
+    def _build_index(self, generation: int) -> _RegistryIndex:
+        index = _RegistryIndex(generation=generation)
+        # Only the public core API is used: it runs entry-point discovery
+        # and lists the backends of each currency in registration order.
+        by_currency: dict[str, list[type[BaseProcessor]]] = {}
+        for currency in sorted(self._core.get_all_currencies()):
+            classes = by_currency.setdefault(currency.upper(), [])
+            for processor_class in self._core.get_for_currency(currency):
+                if processor_class not in classes:
+                    classes.append(processor_class)
+        backends = list(self._registered.values())
+        for slug in list(self._adopted):
+            try:
+                processor_class = self._core.get_by_slug(slug)
+            except KeyError:
+                # Unregistered on the core registry since.
+                del self._adopted[slug]
+                continue
+            if processor_class not in backends:
+                backends.append(processor_class)
+        for classes in by_currency.values():
+            backends.extend(
+                processor_class
+                for processor_class in classes
+                if processor_class not in backends
+            )
+        for processor_class in backends:
+            index.by_key[processor_class.slug] = processor_class
+        for processor_class in backends:
+            for alias in _class_aliases(processor_class):
+                index.alias_to_slug.setdefault(alias, processor_class.slug)
+        for alias, slug in self._module_map.items():
+            if slug in index.by_key:
+                index.alias_to_slug[alias] = slug
+        aliases: dict[str, set[str]] = {slug: {slug} for slug in index.by_key}
+        for alias, slug in index.alias_to_slug.items():
+            aliases[slug].add(alias)
+            index.by_key.setdefault(alias, index.by_key[slug])
+        index.aliases.update(
+            (slug, frozenset(keys)) for slug, keys in aliases.items()
         )
-        if class_module.endswith('.processor'):
-            backend_module = class_module.rsplit('.', 1)[0]
-            self._module_map[backend_module] = processor_class.slug
-
-    def _sync_aliases_from_core(self):
-        self._core._ensure_discovered()
-        for processor_class in self._core._backends.values():
-            self._remember_aliases(processor_class)
+        for currency, classes in by_currency.items():
+            index.by_currency[currency] = tuple(classes)
+            index.choices_by_currency[currency] = tuple(
+                (backend.slug, backend.display_name) for backend in classes
+            )
+            index.digest_by_currency[currency] = _backends_digest(classes)
+        return index
+
+
+def _backends_digest(classes) -> str:
+    # Slugs and class paths are the same in every process running the same
+    # code and settings, unlike the process-local generation counter.
+    identity = '\n'.join(
+        f'{backend.slug}={backend.__module__}.{backend.__qualname__}'
+        for backend in classes
+    )
+    return hashlib.sha256(identity.encode()).hexdigest()[:16]
+
+
+_NO_BACKENDS_DIGEST = _backends_digest(())
+
+
+def _currency_key(index: _RegistryIndex, currency) -> str:
+    # Currency codes are normally upper case already; skip the
+    # normalization when the code is found as given.
+    if currency in index.by_currency:
+        return currency
+    return str(currency).upper()
 
 
 # Module-level singleton wrapping core's singleton
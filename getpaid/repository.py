@@ -1,6 +1,98 @@
+import functools
 from decimal import Decimal
 
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.signals import post_save, pre_save
 from django.utils import timezone
+from getpaid_core.fsm import apply_payment_update
+
+from getpaid import ledger, metrics, tracing
+from getpaid.exceptions import ConcurrentUpdateError
+
+DEFAULT_OPTIMISTIC_LOCKING_RETRIES = 3
+
+#: Fields the payment FSM and the timestamp stamping may change.
+BULK_SAVE_FIELDS = (
+    'status',
+    'amount_paid',
+    'amount_locked',
+    'amount_refunded',
+    'external_id',
+    'fraud_status',
+    'fraud_message',
+    'provider_data',
+    'last_payment_on',
+    'refunded_on',
+)
+
+
+def optimistic_locking_enabled() -> bool:
+    """Return True if ``GETPAID['OPTIMISTIC_LOCKING']`` is on.
+
+    Payment transitions then skip ``select_for_update()`` and are saved
+    with a conditional ``UPDATE ... WHERE version = N`` instead.
+    """
+    from django.conf import settings
+
+    config = getattr(settings, 'GETPAID', {})
+    return bool(config.get('OPTIMISTIC_LOCKING', False))
+
+
+def _optimistic_locking_retries() -> int:
+    from django.conf import settings
+
+    value = getattr(settings, 'GETPAID', {}).get(
+        'OPTIMISTIC_LOCKING_RETRIES', DEFAULT_OPTIMISTIC_LOCKING_RETRIES
+    )
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ImproperlyConfigured(
+            'GETPAID["OPTIMISTIC_LOCKING_RETRIES"] must be a non-negative '
+            'integer.'
+        )
+    return value
+
+
+def _stamp_timestamps(payment, current_time) -> None:
+    if (
+        getattr(payment, 'amount_paid', 0)
+        and getattr(payment, 'last_payment_on', None) is None
+    ):
+        payment.last_payment_on = current_time
+    if (
+        getattr(payment, 'amount_refunded', 0)
+        and getattr(payment, 'refunded_on', None) is None
+    ):
+        payment.refunded_on = current_time
+
+
+def _changed_fields(payment) -> list[str]:
+    """Fields to write for ``payment``: its dirty fields if it tracks
+    them, otherwise :data:`BULK_SAVE_FIELDS`."""
+    dirty = payment.get_dirty_fields()
+    if dirty is None:
+        return list(BULK_SAVE_FIELDS)
+    return [name for name in dirty if name != 'version']
+
+
+@functools.cache
+def _auto_now_fields(model_class) -> tuple:
+    """``auto_now`` fields of ``model_class``. Their ``pre_save`` sets a new
+    value on every save, so every narrowed write must include them."""
+    return tuple(
+        field
+        for field in model_class._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+    )
+
+
+def _stamp_auto_now(payment) -> list[str]:
+    """Run ``pre_save`` of ``payment``'s ``auto_now`` fields, as
+    ``Model.save()`` would, for writes that bypass it; return their
+    names."""
+    fields = _auto_now_fields(type(payment))
+    for field in fields:
+        field.pre_save(payment, add=False)
+    return [field.name for field in fields]
 
 
 class DjangoPaymentRepository:
@@ -18,27 +110,7 @@ class DjangoPaymentRepository:
         return self._normalize_payment(payment)
 
     async def save(self, payment):
-        current_time = timezone.now()
-        if (
-            getattr(payment, 'amount_paid', 0)
-            and getattr(
-                payment,
-                'last_payment_on',
-                None,
-            )
-            is None
-        ):
-            payment.last_payment_on = current_time
-        if (
-            getattr(payment, 'amount_refunded', 0)
-            and getattr(
-                payment,
-                'refunded_on',
-                None,
-            )
-            is None
-        ):
-            payment.refunded_on = current_time
+        _stamp_timestamps(payment, timezone.now())
         await payment.asave()
         return self._normalize_payment(payment)
 
@@ -70,29 +142,172 @@ class DjangoPaymentRepository:
         return self._normalize_payment(payment)
 
     def _save(self, payment):
+        _stamp_timestamps(payment, timezone.now())
+        with tracing.span('getpaid.repository.save', payment_id=payment.pk):
+            if optimistic_locking_enabled() and not payment._state.adding:
+                self._save_if_unchanged(payment)
+            else:
+                self._save_changed(payment)
+        return self._normalize_payment(payment)
+
+    def _save_changed(self, payment) -> None:
+        """Save only ``payment``'s changed fields; skip the save entirely
+        when nothing changed.
+
+        Payments that do not track changes are saved in full. ``auto_now``
+        fields are always written along with the changed ones.
+        """
+        dirty = None if payment._state.adding else payment.get_dirty_fields()
+        if dirty is None:
+            payment.save()
+            return
+        names = [name for name in dirty if name != 'version']
+        if not names:
+            return
+        auto_now = [field.name for field in _auto_now_fields(type(payment))]
+        payment.save(update_fields={*names, *auto_now})
+
+    def _save_if_unchanged(self, payment) -> None:
+        """Write the changed fields only if the row's version still
+        matches the one ``payment`` was read with.
+
+        Nothing is written when no field changed. Raises
+        ``ConcurrentUpdateError`` when another writer saved the row in the
+        meantime. Signals are sent as for ``Model.save()``.
+        """
+        manager = self.model_class._default_manager
+        using = manager.db
+        if not payment.external_id:
+            payment.external_id = None
+        names = _changed_fields(payment)
+        if not names:
+            return
+        names.extend(_stamp_auto_now(payment))
+        update_fields = frozenset((*names, 'version'))
+        pre_save.send(
+            sender=self.model_class,
+            instance=payment,
+            raw=False,
+            using=using,
+            update_fields=update_fields,
+        )
+        expected = payment.version
+        opts = self.model_class._meta
+        updated = manager.filter(pk=payment.pk, version=expected).update(
+            version=expected + 1,
+            **{
+                name: getattr(payment, opts.get_field(name).attname)
+                for name in names
+            },
+        )
+        if not updated:
+            raise ConcurrentUpdateError(
+                f'Payment {payment.pk} was modified concurrently '
+                f'(expected version {expected}).'
+            )
+        payment.version = expected + 1
+        payment._take_snapshot()
+        post_save.send(
+            sender=self.model_class,
+            instance=payment,
+            created=False,
+            raw=False,
+            using=using,
+            update_fields=update_fields,
+        )
+
+    def _apply_update(self, payment, build_update, *, source=''):
+        """Apply ``build_update()`` through the FSM and save ``payment``.
+
+        The applied update is recorded in the payment ledger under
+        ``source``.
+
+        With optimistic locking a version conflict reloads the payment and
+        applies a freshly built update again, up to
+        ``GETPAID['OPTIMISTIC_LOCKING_RETRIES']`` times. The FSM re-validates
+        every attempt against the reloaded state, so an update another
+        writer already applied raises ``InvalidTransitionError``.
+        ``build_update`` may return ``None`` to skip persisting.
+        """
+        retries = (
+            _optimistic_locking_retries() if optimistic_locking_enabled() else 0
+        )
+        for attempt in range(retries + 1):
+            update = build_update()
+            if update is None:
+                return payment
+            before = ledger.capture(payment)
+            status_before = str(payment.status)
+            with tracing.span(
+                'getpaid.fsm.apply',
+                payment_id=payment.pk,
+                event=update.payment_event,
+                status_before=status_before,
+            ) as current:
+                apply_payment_update(payment, update)
+                tracing.set_attributes(current, status_after=payment.status)
+            try:
+                self._save(payment)
+            except ConcurrentUpdateError:
+                if attempt == retries:
+                    raise
+                payment.refresh_from_db()
+                continue
+            ledger.record(payment, update, before, source=source)
+            metrics.record_transition(payment, status_before)
+            return payment
+        return payment
+
+    def _bulk_save(self, payments):
+        """Persist several payments with one ``bulk_update`` query.
+
+        Only fields changed on at least one payment (plus ``version``) are
+        written, and payments without changes are left out. ``Model.save()``
+        is not called, so ``pre_save``/``post_save`` are sent here
+        explicitly to keep receivers (e.g. order fulfilment) working.
+        """
         current_time = timezone.now()
-        if (
-            getattr(payment, 'amount_paid', 0)
-            and getattr(
-                payment,
-                'last_payment_on',
-                None,
+        changed = []
+        fields = set()
+        for payment in payments:
+            _stamp_timestamps(payment, current_time)
+            if not payment.external_id:
+                payment.external_id = None
+            names = _changed_fields(payment)
+            if names:
+                changed.append(payment)
+                fields.update(names)
+                fields.update(_stamp_auto_now(payment))
+        if not changed:
+            return [self._normalize_payment(payment) for payment in payments]
+        manager = self.model_class._default_manager
+        using = manager.db
+        fields = [*sorted(fields), 'version']
+        update_fields = frozenset(fields)
+        for payment in changed:
+            # Rows are locked by the caller; bumping the version makes
+            # concurrent optimistic writers retry against the new state.
+            payment.version += 1
+            pre_save.send(
+                sender=self.model_class,
+                instance=payment,
+                raw=False,
+                using=using,
+                update_fields=update_fields,
             )
-            is None
-        ):
-            payment.last_payment_on = current_time
-        if (
-            getattr(payment, 'amount_refunded', 0)
-            and getattr(
-                payment,
-                'refunded_on',
-                None,
+        with tracing.span('getpaid.repository.bulk_save', count=len(changed)):
+            manager.bulk_update(changed, fields)
+        for payment in changed:
+            payment._take_snapshot()
+            post_save.send(
+                sender=self.model_class,
+                instance=payment,
+                created=False,
+                raw=False,
+                using=using,
+                update_fields=update_fields,
             )
-            is None
-        ):
-            payment.refunded_on = current_time
-        payment.save()
-        return self._normalize_payment(payment)
+        return [self._normalize_payment(payment) for payment in payments]
 
     def _update_status(self, payment_id, status, **fields):
         payment = self.model_class.objects.select_related('order').get(
@@ -1,4 +1,5 @@
 from django import template
+from django.utils.translation import get_language
 
 from getpaid.registry import registry
 
@@ -12,3 +13,16 @@ def get_backends(currency):
     This way you can use all fields to render backend chooser.
     """
     return registry.get_backends(currency)
+
+
+@register.simple_tag
+def get_backends_cache_key(currency):
+    """
+    Get a key for caching a rendered backend chooser with ``{% cache %}``.
+    It varies with the currency, the active language, the backends
+    accepting the currency and open circuit breakers, e.g.::
+
+        {% get_backends_cache_key currency as chooser_key %}
+        {% cache 600 payment_chooser chooser_key %}...{% endcache %}
+    """
+    return f'{registry.get_backends_cache_key(currency)}:{get_language()}'
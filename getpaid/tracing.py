@@ -0,0 +1,76 @@
+"""Optional OpenTelemetry spans for payment operations.
+
+When ``opentelemetry-api`` is installed, django-getpaid opens spans for:
+
+- adapter operations (``getpaid.operation.<name>``);
+- processor calls made through the bridge (``getpaid.processor.<method>``);
+- FSM applications (``getpaid.fsm.apply``);
+- repository saves (``getpaid.repository.save``).
+
+Without it every helper here is a no-op. Spans are emitted through the
+globally configured tracer provider; configure an SDK and exporter as for
+any other instrumented library.
+
+Processor coroutines run on the async runner's loop thread. Each one runs
+in a copy of the submitting thread's ``contextvars`` context (see
+:meth:`getpaid.async_runner.AsyncRunner.run`). The active span therefore
+carries over, and spans created by instrumented HTTP clients inside
+processors nest under the processor call span.
+"""
+
+from __future__ import annotations
+
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+_tracer = None
+
+
+def get_tracer():
+    """Return the django-getpaid tracer, or ``None`` without OpenTelemetry."""
+    global _tracer  # noqa: PLW0603
+    if _tracer is None and trace is not None:
+        from getpaid import __version__
+
+        _tracer = trace.get_tracer('getpaid', __version__)
+    return _tracer
+
+
+def span(name: str, **attributes: Any) -> AbstractContextManager:
+    """Return a context manager running its block in a new current span.
+
+    The context manager yields the span, or ``None`` when tracing is
+    unavailable. Attributes are set under the ``getpaid.`` prefix;
+    ``None`` values are left out.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        return nullcontext()
+    return tracer.start_as_current_span(
+        name, attributes=_attributes(attributes)
+    )
+
+
+def set_attributes(current, **attributes: Any) -> None:
+    """Set attributes on a span yielded by :func:`span` (if any)."""
+    if current is not None:
+        current.set_attributes(_attributes(attributes))
+
+
+def method_name(method: Any) -> str:
+    return getattr(method, '__name__', None) or type(method).__name__
+
+
+def _attributes(attributes: dict[str, Any]) -> dict[str, Any]:
+    return {
+        f'getpaid.{key}': value
+        if isinstance(value, str | bool | int | float)
+        else str(value)
+        for key, value in attributes.items()
+        if value is not None
+    }
@@ -31,5 +31,7 @@ urlpatterns = [
         name='backend-callback',
     ),
     path('health/', views.health, name='health-check'),
+    path('health/ready/', views.readiness, name='health-ready'),
+    path('metrics/', views.metrics_view, name='metrics'),
     path('', include(registry.urls)),
 ]
@@ -1,9 +1,12 @@
 """Payment views for django-getpaid v3."""
 
+import functools
 import json
 import logging
+import time
 
 import swapper
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django import http
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied, ValidationError
@@ -18,13 +21,18 @@ from getpaid_core.exceptions import (
     InvalidTransitionError,
 )
 
-from .abstracts import _handle_paywall_callback
+from . import metrics
+from .abstracts import _apply_paywall_callback
 from .adapters import adapt_callback_request, call_processor_verify_callback
 from .bridge import bridge
 from .callback_security import enforce_callback_security
-from .exceptions import GetPaidException
+from .dedup import callback_event_key, get_dedup_store
+from .exceptions import ConcurrentUpdateError, GetPaidException
 from .forms import PaymentMethodForm
+from .health import check_readiness
+from .inbox import callback_mode, ingest_callback
 from .registry import registry
+from .repository import DjangoPaymentRepository, optimistic_locking_enabled
 
 logger = logging.getLogger(__name__)
 
@@ -139,6 +147,61 @@ class FailureView(FallbackView):
 failure = FailureView.as_view()
 
 
+def _instrument_callback(view):
+    """Record callback metrics around a callback view function.
+
+    The backend label is the URL ``backend`` or, for per-payment routes,
+    the backend of the payment once the view resolved it. Anything that is
+    not a registered backend is labelled ``'unknown'``: the URL segment is
+    caller-controlled and would otherwise grow the label set without
+    bound.
+    """
+
+    def observe(request, kwargs, started, status_code):
+        backend = getattr(request, '_getpaid_backend', None) or kwargs.get(
+            'backend'
+        )
+        if not backend or backend not in registry:
+            backend = 'unknown'
+        metrics.record_callback(
+            backend, status_code, time.monotonic() - started
+        )
+
+    if iscoroutinefunction(view):
+
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            started = time.monotonic()
+            try:
+                response = await view(request, *args, **kwargs)
+            except Http404:
+                observe(request, kwargs, started, 404)
+                raise
+            except Exception:
+                observe(request, kwargs, started, 500)
+                raise
+            observe(request, kwargs, started, response.status_code)
+            return response
+
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        started = time.monotonic()
+        try:
+            response = view(request, *args, **kwargs)
+        except Http404:
+            observe(request, kwargs, started, 404)
+            raise
+        except Exception:
+            observe(request, kwargs, started, 500)
+            raise
+        observe(request, kwargs, started, response.status_code)
+        return response
+
+    return wrapper
+
+
 class CallbackDetailView(View):
     """Handle paywall callback via PUSH flow.
 
@@ -153,12 +216,27 @@ class CallbackDetailView(View):
     app sits behind a reverse proxy, configure ``GETPAID['CALLBACK_SOURCE_IP_HEADER']``
     and ``GETPAID['CALLBACK_TRUSTED_PROXIES']`` so django-getpaid only trusts
     forwarded client IP data from proxies you control.
+
+    These checks run against an unlocked read of the payment, outside any
+    transaction; only verified callbacks lock the payment row.
     """
 
     def post(self, request: HttpRequest, pk, *args, **kwargs):
+        event_key = None
         try:
-            with transaction.atomic():
-                return self._handle_locked_callback(request, pk, **kwargs)
+            event_key = _callback_dedup_key(
+                _payment_processor_class(pk), request
+            )
+            if _already_seen(event_key):
+                return _acknowledge_seen(event_key)
+            if callback_mode() == 'ingest':
+                return _run_remembering(
+                    event_key, self._ingest_callback, request, pk
+                )
+            self._verify_callback(request, pk, **kwargs)
+            return _run_remembering(
+                event_key, self._handle_locked_callback, request, pk, **kwargs
+            )
         except json.JSONDecodeError:
             logger.warning(
                 'Malformed JSON in callback for payment %s', pk
@@ -167,49 +245,182 @@ class CallbackDetailView(View):
         except InvalidTransitionError:
             # Duplicate or late callback: the event was already applied.
             # Providers retry on non-2xx, so a duplicate must be acked.
+            _remember_duplicate(request, event_key)
             logger.info(
                 'Callback for payment %s already processed; acknowledging',
                 pk,
             )
             return HttpResponse(b'Already processed')
+        except ConcurrentUpdateError:
+            logger.warning('Concurrent update of payment %s; retry later', pk)
+            return _concurrent_update_response()
         except GetPaidException:
             logger.warning('Callback verification failed for payment %s', pk)
             return http.HttpResponseForbidden(b'Callback verification failed')
 
+    def _verify_callback(self, request: HttpRequest, pk, **kwargs) -> None:
+        """Check the callback source and signature before any lock."""
+        Payment = swapper.load_model('getpaid', 'Payment')
+        payment = get_object_or_404(Payment, pk=pk)
+        _verify_unlocked(request, payment, **kwargs)
+
     def _handle_locked_callback(
         self, request: HttpRequest, pk, **kwargs
     ) -> HttpResponse:
-        """Process the callback with the payment row locked for update."""
+        """Apply the verified callback with the payment row locked."""
+        return _lock_and_run_callback(request, pk, **kwargs)
+
+    def _ingest_callback(self, request: HttpRequest, pk) -> HttpResponse:
+        """Verify the callback and queue it in the inbox, without locking."""
         Payment = swapper.load_model('getpaid', 'Payment')
-        payment = get_object_or_404(
-            Payment.objects.select_for_update(), pk=pk
-        )
-        return _run_locked_callback(request, payment, **kwargs)
+        payment = get_object_or_404(Payment, pk=pk)
+        return _ingest(request, payment)
+
+
+callback = csrf_exempt(_instrument_callback(CallbackDetailView.as_view()))
+
+
+def _lock_and_run_callback(
+    request: HttpRequest, pk, **kwargs
+) -> HttpResponse:
+    """Row-lock the payment by pk and apply a verified callback to it."""
+    Payment = swapper.load_model('getpaid', 'Payment')
+    payment = get_object_or_404(_callback_queryset(Payment), pk=pk)
+    return _run_locked_callback(request, payment, **kwargs)
+
+
+def _callback_queryset(model_class, *, lock=True):
+    """Payments as read by the callback views.
+
+    Rows are locked for update unless ``lock`` is False or optimistic
+    locking is enabled, in which case the versioned save detects
+    concurrent writers instead.
+    """
+    if lock and not optimistic_locking_enabled():
+        return model_class.objects.select_for_update()
+    return model_class.objects
 
 
-callback = csrf_exempt(CallbackDetailView.as_view())
+def _verify_unlocked(request: HttpRequest, payment, **kwargs) -> None:
+    """Pre-lock stage: run the IP allowlist and ``verify_callback``.
+
+    ``payment`` is an unlocked read. Forged or garbage callbacks are
+    rejected here, before any transaction or row lock is taken.
+    """
+    processor = payment._get_processor()
+    request._getpaid_backend = str(payment.backend)
+    enforce_callback_security(processor, request)
+    if _uses_semantic_callback(processor):
+        data, headers, raw_body = adapt_callback_request(request)
+        bridge.call_verify_callback(
+            processor, data, headers, raw_body, request, **kwargs
+        )
+    else:
+        call_processor_verify_callback(processor, request)
+    request._getpaid_verified = True
 
 
 def _run_locked_callback(
     request: HttpRequest, payment, **kwargs
 ) -> HttpResponse:
-    """Verify + apply a callback against an already-locked payment row.
+    """Apply a callback verified by :func:`_verify_unlocked` against an
+    already-locked payment row.
 
     Shared by the per-payment ``CallbackDetailView`` and the paymentless
-    ``BackendCallbackView``: both resolve the payment (by URL pk / by event
-    body), then run this — verification gates every state change.
+    ``BackendCallbackView``: both resolve and verify the payment (by URL
+    pk / by event body) first, then run this.
     """
     processor = payment._get_processor()
-    enforce_callback_security(processor, request)
+    request._getpaid_backend = str(payment.backend)
     if _uses_semantic_callback(processor):
-        return _handle_paywall_callback(
-            payment, request, processor=processor, **kwargs,
+        return _apply_paywall_callback(
+            payment, request, processor, **kwargs,
         )
-    call_processor_verify_callback(processor, request)
+    if optimistic_locking_enabled():
+        # Legacy handlers persist the payment themselves, bypassing the
+        # versioned save, so they still need the row lock.
+        payment = (
+            type(payment)._default_manager.select_for_update().get(pk=payment.pk)
+        )
+        processor = payment._get_processor()
     return processor.handle_paywall_callback(request, **kwargs)
 
 
-def _resolve_locked_payment(correlation):
+def _payment_processor_class(pk):
+    """Return the processor class of payment ``pk`` without locking it.
+
+    Only queried when a dedup store is configured; ``None`` if the payment
+    or its backend does not exist (the locked lookup then 404s as usual).
+    """
+    if get_dedup_store() is None:
+        return None
+    Payment = swapper.load_model('getpaid', 'Payment')
+    backend = (
+        Payment.objects.filter(pk=pk).values_list('backend', flat=True).first()
+    )
+    if backend is None:
+        return None
+    try:
+        return registry.get_by_slug(backend)
+    except BackendNotFoundError:
+        return None
+
+
+def _callback_dedup_key(processor_class, request) -> str | None:
+    if processor_class is None or get_dedup_store() is None:
+        return None
+    return callback_event_key(processor_class, request)
+
+
+def _already_seen(event_key) -> bool:
+    return event_key is not None and get_dedup_store().seen(event_key)
+
+
+def _concurrent_update_response() -> HttpResponse:
+    # Retries were exhausted; a non-2xx answer makes the provider redeliver.
+    return HttpResponse(b'Concurrent update, retry later', status=409)
+
+
+def _acknowledge_seen(event_key) -> HttpResponse:
+    logger.info('Callback event %s already seen; acknowledging', event_key)
+    return HttpResponse(b'Already processed')
+
+
+def _run_remembering(event_key, handler, *args, **kwargs) -> HttpResponse:
+    """Run ``handler`` atomically and remember ``event_key`` on success."""
+    with transaction.atomic():
+        response = handler(*args, **kwargs)
+        _remember_event(event_key, response)
+    return response
+
+
+def _remember_duplicate(request: HttpRequest, event_key) -> None:
+    """Remember an event the FSM rejected as already applied, provided
+    its callback passed verification."""
+    if getattr(request, '_getpaid_verified', False):
+        _remember_event(event_key)
+
+
+def _remember_event(event_key, response=None) -> None:
+    """Mark a verified, applied callback event as seen once committed."""
+    if event_key is None:
+        return
+    if response is not None and response.status_code >= 400:
+        return
+    store = get_dedup_store()
+    transaction.on_commit(lambda: store.mark(event_key))
+
+
+def _ingest(request: HttpRequest, payment, correlation=None) -> HttpResponse:
+    """Run callback security checks and store the callback in the inbox."""
+    processor = payment._get_processor()
+    request._getpaid_backend = str(payment.backend)
+    enforce_callback_security(processor, request)
+    ingest_callback(request, payment, processor, correlation)
+    return HttpResponse(b'OK')
+
+
+def _resolve_locked_payment(correlation, *, lock=True):
     """Resolve and row-lock the Payment a paymentless webhook refers to.
 
     ``correlation`` is what the backend's ``extract_callback_correlation``
@@ -218,11 +429,14 @@ def _resolve_locked_payment(correlation):
     payment_id). Prefer the pk, then fall back to external_id. Returns
     ``None`` when nothing matches — the caller acks so the gateway stops
     retrying uncorrelatable or foreign traffic.
+
+    ``lock=False`` skips the row lock (inbox ingestion does not modify the
+    payment).
     """
     if not correlation:
         return None
     Payment = swapper.load_model('getpaid', 'Payment')
-    locked = Payment.objects.select_for_update()
+    locked = _callback_queryset(Payment, lock=lock)
     payment_id = correlation.get('payment_id')
     if payment_id:
         try:
@@ -267,22 +481,33 @@ class BackendCallbackView(View):
             raise Http404(
                 f'Backend {backend!r} does not support paymentless callbacks.'
             )
+        event_key = None
         try:
-            with transaction.atomic():
-                return self._handle_backend_callback(
-                    request, extractor, backend, **kwargs
-                )
+            event_key = _callback_dedup_key(processor_class, request)
+            if _already_seen(event_key):
+                return _acknowledge_seen(event_key)
+            return self._handle_backend_callback(
+                request, extractor, backend, event_key, **kwargs
+            )
         except json.JSONDecodeError:
             logger.warning(
                 'Malformed JSON in paymentless %s callback', backend
             )
             return http.HttpResponseBadRequest(b'Malformed JSON payload')
         except InvalidTransitionError:
+            _remember_duplicate(request, event_key)
             logger.info(
                 'Paymentless %s callback already processed; acknowledging',
                 backend,
             )
             return HttpResponse(b'Already processed')
+        except ConcurrentUpdateError:
+            logger.warning(
+                'Concurrent payment update in paymentless %s callback; '
+                'retry later',
+                backend,
+            )
+            return _concurrent_update_response()
         except GetPaidException:
             logger.warning(
                 'Paymentless %s callback verification failed', backend
@@ -290,11 +515,151 @@ class BackendCallbackView(View):
             return http.HttpResponseForbidden(b'Callback verification failed')
 
     def _handle_backend_callback(
+        self, request: HttpRequest, extractor, backend, event_key, **kwargs
+    ) -> HttpResponse:
+        data, headers, _raw_body = adapt_callback_request(request)
+        correlation = extractor(data, headers)
+        payment = _resolve_locked_payment(correlation, lock=False)
+        if payment is None:
+            logger.info(
+                'Paymentless %s callback: no payment matched correlation %r',
+                backend,
+                correlation,
+            )
+            # Not remembered: nothing verified this event, and a forged
+            # delivery must not suppress the genuine one.
+            return HttpResponse(b'No matching payment')
+        if callback_mode() == 'ingest':
+            return _run_remembering(
+                event_key, _ingest, request, payment, correlation
+            )
+        _verify_unlocked(request, payment, **kwargs)
+        return _run_remembering(
+            event_key, _lock_and_run_callback, request, payment.pk, **kwargs
+        )
+
+
+backend_callback = csrf_exempt(
+    _instrument_callback(BackendCallbackView.as_view())
+)
+
+
+class AsyncCallbackDetailView(View):
+    """Native async variant of :class:`CallbackDetailView` for ASGI.
+
+    Under ASGI the sync view occupies a worker thread and then hops onto the
+    async runner loop for every processor call. This view stays on the
+    server's event loop instead: the payment is read with the async ORM,
+    ``verify_callback`` / ``handle_callback`` are awaited directly, and only
+    the final row-locked apply runs as one short sync unit (Django has no
+    async transactions). Security checks and HTTP error semantics match the
+    sync view.
+
+    Processors that only implement the legacy Django-style
+    ``handle_paywall_callback(request)`` contract run through the sync view's
+    locked machinery unchanged.
+
+    Route it in place of the default callback URL::
+
+        path(
+            'payments/callback/<uuid:pk>/',
+            getpaid.views.async_callback,
+            name='callback',
+        )
+    """
+
+    async def post(self, request: HttpRequest, pk, *args, **kwargs):
+        try:
+            return await self._handle_callback(request, pk, **kwargs)
+        except json.JSONDecodeError:
+            logger.warning(
+                'Malformed JSON in callback for payment %s', pk
+            )
+            return http.HttpResponseBadRequest(b'Malformed JSON payload')
+        except InvalidTransitionError:
+            logger.info(
+                'Callback for payment %s already processed; acknowledging',
+                pk,
+            )
+            return HttpResponse(b'Already processed')
+        except ConcurrentUpdateError:
+            logger.warning('Concurrent update of payment %s; retry later', pk)
+            return _concurrent_update_response()
+        except GetPaidException:
+            logger.warning('Callback verification failed for payment %s', pk)
+            return http.HttpResponseForbidden(b'Callback verification failed')
+
+    async def _handle_callback(
+        self, request: HttpRequest, pk, **kwargs
+    ) -> HttpResponse:
+        Payment = swapper.load_model('getpaid', 'Payment')
+        try:
+            payment = await DjangoPaymentRepository(Payment).get_by_id(pk)
+        except Payment.DoesNotExist as exc:
+            raise Http404(f'No payment found for {pk!r}.') from exc
+        return await _arun_callback(request, payment, **kwargs)
+
+
+async_callback = csrf_exempt(
+    _instrument_callback(AsyncCallbackDetailView.as_view())
+)
+
+
+class AsyncBackendCallbackView(View):
+    """Native async variant of :class:`BackendCallbackView` for ASGI.
+
+    Resolves the payment from the event body with the async ORM and then
+    runs the same pipeline as :class:`AsyncCallbackDetailView`.
+    """
+
+    async def post(self, request: HttpRequest, backend, *args, **kwargs):
+        try:
+            processor_class = registry.get_by_slug(backend)
+        except BackendNotFoundError as exc:
+            raise Http404(
+                f'No payment backend registered for {backend!r}.'
+            ) from exc
+        extractor = getattr(
+            processor_class, 'extract_callback_correlation', None
+        )
+        if extractor is None:
+            raise Http404(
+                f'Backend {backend!r} does not support paymentless callbacks.'
+            )
+        try:
+            return await self._handle_backend_callback(
+                request, extractor, backend, **kwargs
+            )
+        except json.JSONDecodeError:
+            logger.warning(
+                'Malformed JSON in paymentless %s callback', backend
+            )
+            return http.HttpResponseBadRequest(b'Malformed JSON payload')
+        except InvalidTransitionError:
+            logger.info(
+                'Paymentless %s callback already processed; acknowledging',
+                backend,
+            )
+            return HttpResponse(b'Already processed')
+        except ConcurrentUpdateError:
+            logger.warning(
+                'Concurrent payment update in paymentless %s callback; '
+                'retry later',
+                backend,
+            )
+            return _concurrent_update_response()
+        except GetPaidException:
+            logger.warning(
+                'Paymentless %s callback verification failed', backend
+            )
+            return http.HttpResponseForbidden(b'Callback verification failed')
+
+    async def _handle_backend_callback(
         self, request: HttpRequest, extractor, backend, **kwargs
     ) -> HttpResponse:
         data, headers, _raw_body = adapt_callback_request(request)
         correlation = extractor(data, headers)
-        payment = _resolve_locked_payment(correlation)
+        payment = await _aresolve_payment(correlation)
         if payment is None:
             logger.info(
                 'Paymentless %s callback: no payment matched correlation %r',
@@ -302,10 +667,118 @@ class BackendCallbackView(View):
                 correlation,
             )
             return HttpResponse(b'No matching payment')
-        return _run_locked_callback(request, payment, **kwargs)
+        return await _arun_callback(request, payment, **kwargs)
+
+
+async_backend_callback = csrf_exempt(
+    _instrument_callback(AsyncBackendCallbackView.as_view())
+)
+
+
+async def _arun_callback(
+    request: HttpRequest, payment, **kwargs
+) -> HttpResponse:
+    """Async counterpart of :func:`_run_locked_callback`.
+
+    Verification and ``handle_callback`` are awaited on the current loop
+    against an unlocked read of the payment; the resulting semantic update
+    is then applied to the row-locked payment, where the FSM re-validates it
+    against the current state.
+    """
+    processor = payment._get_processor()
+    request._getpaid_backend = str(payment.backend)
+    event_key = _callback_dedup_key(type(processor), request)
+    if event_key is not None and await sync_to_async(_already_seen)(event_key):
+        return _acknowledge_seen(event_key)
+    try:
+        response = await _arun_callback_pipeline(
+            request, payment, processor, **kwargs
+        )
+    except InvalidTransitionError:
+        await sync_to_async(_remember_duplicate)(request, event_key)
+        raise
+    await sync_to_async(_remember_event)(event_key, response)
+    return response
+
+
+async def _arun_callback_pipeline(
+    request: HttpRequest, payment, processor, **kwargs
+) -> HttpResponse:
+    enforce_callback_security(processor, request)
+    if callback_mode() == 'ingest':
+        await sync_to_async(ingest_callback)(request, payment, processor)
+        return HttpResponse(b'OK')
+    if not _uses_semantic_callback(processor):
+        await sync_to_async(call_processor_verify_callback)(processor, request)
+        request._getpaid_verified = True
+        return await sync_to_async(_atomic_lock_and_run_callback)(
+            request, payment.pk, **kwargs
+        )
+    data, headers, raw_body = adapt_callback_request(request)
+    await bridge.acall_verify_callback(
+        processor, data, headers, raw_body, request, **kwargs
+    )
+    request._getpaid_verified = True
+    update = await bridge.acall(
+        processor,
+        processor.handle_callback,
+        data,
+        headers,
+        raw_body=raw_body,
+        **kwargs,
+    )
+    if isinstance(update, HttpResponse):
+        return update
+    if update is not None:
+        await sync_to_async(_apply_locked_update)(
+            type(payment), payment.pk, update
+        )
+    return HttpResponse(b'OK')
+
+
+def _atomic_lock_and_run_callback(
+    request: HttpRequest, pk, **kwargs
+) -> HttpResponse:
+    with transaction.atomic():
+        return _lock_and_run_callback(request, pk, **kwargs)
+
 
+def _apply_locked_update(model_class, pk, update):
+    """Apply a semantic update to the row-locked payment and persist it.
 
-backend_callback = csrf_exempt(BackendCallbackView.as_view())
+    With optimistic locking the row is read without a lock and the
+    versioned save retries on conflict.
+    """
+    with transaction.atomic():
+        payments = model_class._default_manager
+        if not optimistic_locking_enabled():
+            payments = payments.select_for_update()
+        payment = payments.select_related('order').get(pk=pk)
+        return DjangoPaymentRepository(model_class)._apply_update(
+            payment, lambda: update, source='callback'
+        )
+
+
+async def _aresolve_payment(correlation):
+    """Async, unlocked counterpart of :func:`_resolve_locked_payment`."""
+    if not correlation:
+        return None
+    Payment = swapper.load_model('getpaid', 'Payment')
+    payments = Payment.objects.select_related('order')
+    payment_id = correlation.get('payment_id')
+    if payment_id:
+        try:
+            payment = await payments.filter(pk=payment_id).afirst()
+        except (ValidationError, ValueError, TypeError):
+            payment = None
+        if payment is not None:
+            return payment
+    external_id = correlation.get('external_id')
+    if external_id:
+        payment = await payments.filter(external_id=external_id).afirst()
+        if payment is not None:
+            return payment
+    return None
 
 
 class HealthCheckView(View):
@@ -316,7 +789,8 @@ class HealthCheckView(View):
     and monitoring dashboards.
 
     Does not check downstream dependencies (databases, payment gateways)
-    — it only verifies that the payment views are reachable.
+    — it only verifies that the payment views are reachable. Use
+    :class:`ReadinessCheckView` for that.
     """
 
     def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
@@ -333,6 +807,51 @@ class HealthCheckView(View):
 health = HealthCheckView.as_view()
 
 
+class ReadinessCheckView(View):
+    """Readiness probe checking the database, async runner and backends.
+
+    Answers 503 when the database or an async runner loop is unusable and
+    200 otherwise; failing backend probes report ``degraded`` with 200.
+    The report is cached per process for a few seconds (see
+    :func:`getpaid.health.check_readiness`).
+    """
+
+    def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        report = check_readiness()
+        return http.JsonResponse(
+            {
+                'status': report['status'],
+                'service': 'getpaid',
+                'version': _get_version(),
+                'checks': report['checks'],
+            },
+            status=503 if report['status'] == 'fail' else 200,
+        )
+
+
+readiness = ReadinessCheckView.as_view()
+
+
+class MetricsView(View):
+    """Expose payment metrics in the Prometheus text format.
+
+    Answers 404 unless ``GETPAID['METRICS_ENABLED']`` is on. The endpoint
+    is not authenticated; restrict it at the proxy or keep it off public
+    URLs.
+    """
+
+    def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        if not metrics.metrics_enabled():
+            raise Http404('Metrics are disabled.')
+        return HttpResponse(
+            metrics.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+
+metrics_view = MetricsView.as_view()
+
+
 def _uses_semantic_callback(processor) -> bool:
     """Return True when the processor implements the core async callback contract."""
     return bridge.is_semantic_callback(processor)
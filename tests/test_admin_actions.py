@@ -10,6 +10,8 @@ from django.contrib import messages
 from django.test import RequestFactory
 
 from getpaid.admin import PaymentAdmin
+from getpaid.bulk import run_bulk_operation
+from getpaid.models import BulkJob
 from getpaid.types import PaymentStatus as ps
 
 pytestmark = pytest.mark.django_db
@@ -87,6 +89,24 @@ class TestChargePayment:
         mock_charge.assert_not_called()
         assert _messages_at(payment_admin, messages.ERROR) == []
 
+    def test_charges_through_batched_engine(
+        self, payment_admin, request_, payment_factory
+    ):
+        payment_factory(status=ps.PRE_AUTH)
+        payment_factory(status=ps.PRE_AUTH)
+
+        with patch(
+            'getpaid.admin.run_bulk_operation',
+            wraps=run_bulk_operation,
+        ) as engine:
+            payment_admin.charge_payment(request_, Payment.objects.all())
+
+        engine.assert_called_once()
+        assert _messages_at(payment_admin, messages.SUCCESS) == [
+            '2 payment(s) charged.'
+        ]
+        assert not Payment.objects.filter(status=ps.PRE_AUTH).exists()
+
     def test_uses_enum_not_hardcoded_string(self):
         import inspect
 
@@ -127,3 +147,21 @@ class TestStartRefund:
 
         assert _messages_at(payment_admin, messages.SUCCESS)
         assert not _messages_at(payment_admin, messages.ERROR)
+
+
+class TestBackgroundMode:
+    def test_queues_job_instead_of_running_inline(
+        self, payment_admin, request_, payment_factory, settings
+    ):
+        settings.GETPAID = {'ADMIN_BULK_ACTIONS_IN_BACKGROUND': True}
+        payment = payment_factory(status=ps.PRE_AUTH)
+
+        payment_admin.charge_payment(request_, Payment.objects.all())
+
+        job = BulkJob.objects.get()
+        assert job.operation == 'charge'
+        assert job.payment_ids == [str(payment.pk)]
+        payment.refresh_from_db()
+        assert payment.status == ps.PRE_AUTH
+        [message] = _messages_at(payment_admin, messages.INFO)
+        assert f'/getpaid/bulkjob/{job.pk}/' in message
@@ -0,0 +1,184 @@
+"""Functional tests for the native async callback views."""
+
+import json
+import uuid
+
+import pytest
+import swapper
+from django.http import Http404
+from django.test import AsyncRequestFactory
+
+from getpaid.backends.dummy.processor import (
+    PaymentProcessor as DummyPaymentProcessor,
+)
+from getpaid.registry import registry
+from getpaid.types import PaymentStatus as ps
+from getpaid.views import async_backend_callback, async_callback
+
+pytestmark = [
+    pytest.mark.django_db(transaction=True),
+    pytest.mark.asyncio,
+]
+
+Payment = swapper.load_model('getpaid', 'Payment')
+
+
+class _GlobalDummyProcessor(DummyPaymentProcessor):
+    slug = 'async_global_dummy'
+
+    @classmethod
+    def extract_callback_correlation(cls, data, headers):
+        if data.get('payment_id'):
+            return {'payment_id': str(data['payment_id'])}
+        return None
+
+
+@pytest.fixture(autouse=True)
+def _debug_mode(settings):
+    # The dummy backend is unsigned; unsigned callbacks are only allowed
+    # in DEBUG mode.
+    settings.DEBUG = True
+
+
+@pytest.fixture
+def prepared_payment(payment_factory):
+    return payment_factory(status=ps.PREPARED, external_id=str(uuid.uuid4()))
+
+
+def _request(body):
+    return AsyncRequestFactory().post(
+        '/payments/callback/',
+        data=json.dumps(body),
+        content_type='application/json',
+    )
+
+
+def _forbid_runner(*args, **kwargs):
+    raise AssertionError('Async views must not hop onto the async runner.')
+
+
+async def _refresh(payment):
+    return await Payment.objects.aget(pk=payment.pk)
+
+
+class TestAsyncCallbackDetailView:
+    async def test_paid_callback_updates_payment(
+        self, prepared_payment, monkeypatch
+    ):
+        monkeypatch.setattr('getpaid.bridge.run_awaitable', _forbid_runner)
+
+        response = await async_callback(
+            _request({'new_status': 'paid'}), pk=prepared_payment.pk
+        )
+
+        assert response.status_code == 200
+        payment = await _refresh(prepared_payment)
+        assert payment.status == ps.PAID
+        assert payment.amount_paid == payment.amount_required
+
+    async def test_locks_row_for_apply(self, prepared_payment, monkeypatch):
+        from django.db.models import QuerySet
+
+        locked_models = []
+        original = QuerySet.select_for_update
+
+        def spy(qs, *args, **kwargs):
+            locked_models.append(qs.model.__name__)
+            return original(qs, *args, **kwargs)
+
+        monkeypatch.setattr(QuerySet, 'select_for_update', spy)
+
+        response = await async_callback(
+            _request({'new_status': 'paid'}), pk=prepared_payment.pk
+        )
+
+        assert response.status_code == 200
+        assert Payment.__name__ in locked_models
+
+    async def test_duplicate_callback_is_acked(self, prepared_payment):
+        await async_callback(
+            _request({'new_status': 'paid'}), pk=prepared_payment.pk
+        )
+
+        late = await async_callback(
+            _request({'new_status': 'failed'}), pk=prepared_payment.pk
+        )
+
+        assert late.status_code == 200
+        assert b'already processed' in late.content.lower()
+        payment = await _refresh(prepared_payment)
+        assert payment.status == ps.PAID
+
+    async def test_malformed_json_returns_400(self, prepared_payment):
+        request = AsyncRequestFactory().post(
+            '/payments/callback/',
+            data='{not-json',
+            content_type='application/json',
+        )
+
+        response = await async_callback(request, pk=prepared_payment.pk)
+
+        assert response.status_code == 400
+
+    async def test_verification_failure_returns_403(
+        self, prepared_payment, monkeypatch
+    ):
+        from getpaid.exceptions import InvalidCallbackError
+
+        def failing_security(processor, request):
+            raise InvalidCallbackError('bad signature')
+
+        monkeypatch.setattr(
+            'getpaid.views.enforce_callback_security', failing_security
+        )
+
+        response = await async_callback(
+            _request({'new_status': 'paid'}), pk=prepared_payment.pk
+        )
+
+        assert response.status_code == 403
+        payment = await _refresh(prepared_payment)
+        assert payment.status == ps.PREPARED
+
+    async def test_unknown_payment_raises_404(self):
+        with pytest.raises(Http404):
+            await async_callback(
+                _request({'new_status': 'paid'}), pk=uuid.uuid4()
+            )
+
+
+class TestAsyncBackendCallbackView:
+    @pytest.fixture(autouse=True)
+    def _register_global_dummy(self):
+        if _GlobalDummyProcessor.slug not in registry:
+            registry.register(_GlobalDummyProcessor)
+        yield
+        registry.unregister(_GlobalDummyProcessor.slug)
+
+    @pytest.fixture
+    def global_payment(self, payment_factory):
+        return payment_factory(
+            status=ps.PREPARED, backend=_GlobalDummyProcessor.slug
+        )
+
+    async def test_resolves_payment_and_drives_fsm(self, global_payment):
+        response = await async_backend_callback(
+            _request({
+                'payment_id': str(global_payment.pk),
+                'new_status': 'paid',
+            }),
+            backend=_GlobalDummyProcessor.slug,
+        )
+
+        assert response.status_code == 200
+        payment = await _refresh(global_payment)
+        assert payment.status == ps.PAID
+
+    async def test_uncorrelated_callback_is_acked(self):
+        response = await async_backend_callback(
+            _request({'new_status': 'paid'}),
+            backend=_GlobalDummyProcessor.slug,
+        )
+
+        assert response.status_code == 200
+        assert response.content == b'No matching payment'
@@ -0,0 +1,165 @@
+"""Tests for the async runner and its multi-loop pool mode."""
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+from getpaid import async_runner
+from getpaid.async_runner import AsyncRunner, AsyncRunnerPool
+
+
+async def _thread_name():
+    await asyncio.sleep(0)
+    return threading.current_thread().name
+
+
+@pytest.fixture
+def pool():
+    runner_pool = AsyncRunnerPool(3, strategy='backend')
+    yield runner_pool
+    runner_pool.shutdown()
+
+
+class TestAsyncRunner:
+    def test_runs_awaitable_on_named_loop_thread(self):
+        runner = AsyncRunner(name='getpaid-test-runner')
+        try:
+            assert runner.run(_thread_name()) == 'getpaid-test-runner'
+        finally:
+            runner.shutdown()
+
+    def test_queue_depth_tracks_in_flight_calls(self):
+        runner = AsyncRunner(name='getpaid-test-runner')
+        started = threading.Event()
+        depths = []
+
+        async def observe():
+            started.set()
+            await asyncio.sleep(0.05)
+
+        def call():
+            runner.run(observe())
+
+        worker = threading.Thread(target=call)
+        try:
+            worker.start()
+            started.wait(timeout=1)
+            depths.append(runner.queue_depth)
+            worker.join(timeout=1)
+            depths.append(runner.queue_depth)
+        finally:
+            runner.shutdown()
+
+        assert depths == [1, 0]
+
+
+class TestAsyncRunnerPool:
+    def test_backend_strategy_pins_key_to_one_loop(self, pool):
+        names = {pool.run(_thread_name(), key='paynow') for _ in range(5)}
+
+        assert len(names) == 1
+        assert names.pop().startswith('getpaid-async-runner-')
+
+    def test_least_loaded_picks_idle_loop(self):
+        runner_pool = AsyncRunnerPool(2, strategy='least_loaded')
+        busy = runner_pool.runners[0]
+        busy._depth = 5
+        try:
+            assert runner_pool.select() is runner_pool.runners[1]
+        finally:
+            busy._depth = 0
+            runner_pool.shutdown()
+
+    def test_exposes_per_loop_queue_depth(self, pool):
+        pool.run(_thread_name(), key='dummy')
+
+        assert pool.queue_depths() == {
+            'getpaid-async-runner-0': 0,
+            'getpaid-async-runner-1': 0,
+            'getpaid-async-runner-2': 0,
+        }
+
+    def test_rejects_unknown_strategy(self):
+        with pytest.raises(ValueError, match='strategy'):
+            AsyncRunnerPool(2, strategy='random')
+
+
+class TestConfiguredRunner:
+    def test_single_loop_by_default(self, settings):
+        settings.GETPAID = {}
+
+        assert async_runner.get_runner() is async_runner._runner
+
+    def test_pool_built_from_settings(self, settings):
+        settings.GETPAID = {
+            'ASYNC_RUNNER_LOOPS': 2,
+            'ASYNC_RUNNER_STRATEGY': 'backend',
+        }
+
+        runner = async_runner.get_runner()
+
+        assert isinstance(runner, AsyncRunnerPool)
+        assert runner.strategy == 'backend'
+        assert len(async_runner.queue_depths()) == 2
+        assert async_runner.run_awaitable(_thread_name(), key='dummy') in (
+            async_runner.queue_depths()
+        )
+
+
+async def _thread_ident():
+    await asyncio.sleep(0)
+    return threading.get_ident()
+
+
+class TestForkSafety:
+    def test_child_reset_starts_a_new_loop_thread(self):
+        runner = AsyncRunner(name='getpaid-test-runner')
+        try:
+            parent_thread = runner.run(_thread_ident())
+
+            async_runner._after_fork_in_child()
+
+            assert runner._thread is None
+            assert runner.run(_thread_ident()) != parent_thread
+        finally:
+            runner.shutdown()
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+    def test_runner_works_in_forked_child(self):
+        assert async_runner.run_awaitable(_thread_name())
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the child
+            status = 1
+            try:
+                os.write(
+                    write_end,
+                    async_runner.run_awaitable(_thread_name()).encode(),
+                )
+                status = 0
+            finally:
+                os._exit(status)
+        os.close(write_end)
+        _pid, status = os.waitpid(pid, 0)
+        with os.fdopen(read_end, 'rb') as output:
+            name = output.read().decode()
+
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert name == 'getpaid-async-runner'
+
+    @pytest.mark.django_db
+    def test_first_request_warms_up_runner(self, monkeypatch):
+        from django.core.signals import request_started
+
+        runner = AsyncRunner(name='getpaid-test-runner')
+        monkeypatch.setattr(async_runner, '_warmed_pid', None)
+        monkeypatch.setattr(async_runner, 'get_runner', lambda: runner)
+        try:
+            request_started.send(sender=None)
+
+            assert runner._thread is not None
+            assert runner._thread.is_alive()
+        finally:
+            runner.shutdown()
@@ -1,8 +1,15 @@
 """Tests for ProcessorBridge — the single async/sync call seam."""
 
+import asyncio
+import threading
 from unittest.mock import AsyncMock, Mock, patch
 
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from getpaid import deadline
 from getpaid.bridge import ProcessorBridge
+from getpaid.exceptions import CommunicationError
 
 
 class TestBridgeCall:
@@ -212,3 +219,82 @@ class TestBridgeSingleton:
         method = Mock(return_value='ok')
         result = bridge.call(Mock(), method)
         assert result == 'ok'
+
+
+class _SlowProcessor:
+    slug = 'slow'
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.cancelled = threading.Event()
+        self.seen_remaining = None
+
+    async def charge(self, **kwargs):
+        self.seen_remaining = deadline.remaining()
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+
+
+class TestBridgeDeadline:
+    """Processor calls run under the backend's ``timeout`` deadline."""
+
+    def test_timeout_cancels_call_and_raises(self):
+        processor = _SlowProcessor({'timeout': 0.05})
+
+        with pytest.raises(CommunicationError, match=r'slow\.charge timed out'):
+            ProcessorBridge().call(processor, processor.charge)
+
+        # Cancellation reaches the runner loop thread asynchronously.
+        assert processor.cancelled.wait(timeout=1)
+        assert 0 < processor.seen_remaining <= 0.05
+
+    def test_global_default_timeout(self, settings):
+        settings.GETPAID = {'PROCESSOR_TIMEOUT': 0.05}
+        processor = _SlowProcessor()
+
+        with pytest.raises(CommunicationError):
+            ProcessorBridge().call(processor, processor.charge)
+
+    async def test_acall_timeout(self):
+        processor = _SlowProcessor({'timeout': 0.05})
+
+        with pytest.raises(CommunicationError):
+            await ProcessorBridge().acall(processor, processor.charge)
+
+        assert processor.cancelled.is_set()
+
+    def test_outer_deadline_wins_when_earlier(self):
+        processor = _SlowProcessor({'timeout': 60})
+
+        with deadline.limit(0.05), pytest.raises(CommunicationError):
+            ProcessorBridge().call(processor, processor.charge)
+
+        assert processor.seen_remaining <= 0.05
+
+    def test_expired_deadline_skips_call(self):
+        method = Mock()
+
+        with deadline.limit(0), pytest.raises(CommunicationError):
+            ProcessorBridge().call(Mock(), method)
+
+        method.assert_not_called()
+
+    def test_call_many_returns_timeout_per_call(self):
+        slow = _SlowProcessor({'timeout': 0.05})
+        fast = AsyncMock(return_value='ok')
+
+        results = ProcessorBridge().call_many(
+            [(slow, slow.charge, {}), (Mock(), fast, {})]
+        )
+
+        assert isinstance(results[0], CommunicationError)
+        assert results[1] == 'ok'
+
+    def test_rejects_non_numeric_timeout(self):
+        processor = _SlowProcessor({'timeout': '5'})
+
+        with pytest.raises(ImproperlyConfigured):
+            ProcessorBridge().call(processor, processor.charge)
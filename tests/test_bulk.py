@@ -0,0 +1,325 @@
+"""Tests for the batched payment operation engine."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+import swapper
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connections
+from django.db.models import QuerySet
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from getpaid.backends.dummy.processor import (
+    PaymentProcessor as DummyPaymentProcessor,
+)
+from getpaid.bridge import bridge
+from getpaid.bulk import (
+    enqueue_bulk_job,
+    process_next_chunk,
+    run_bulk_operation,
+    run_worker,
+)
+from getpaid.models import BulkJob, BulkJobStatus, PaymentOperation
+from getpaid.types import PaymentStatus as ps
+
+pytestmark = pytest.mark.django_db
+
+Payment = swapper.load_model('getpaid', 'Payment')
+
+
+@pytest.fixture
+def lock_spy(monkeypatch):
+    calls = []
+    original = QuerySet.select_for_update
+
+    def spy(qs, *args, **kwargs):
+        calls.append(kwargs)
+        return original(qs, *args, **kwargs)
+
+    monkeypatch.setattr(QuerySet, 'select_for_update', spy)
+    return calls
+
+
+class TestRunBulkOperation:
+    def test_charges_every_matching_payment(self, payment_factory):
+        payments = [payment_factory(status=ps.PRE_AUTH) for _ in range(3)]
+        ignored = payment_factory(status=ps.NEW)
+
+        report = run_bulk_operation(
+            Payment.objects.all(), 'charge', status=ps.PRE_AUTH
+        )
+
+        assert sorted(report.succeeded) == sorted(p.pk for p in payments)
+        assert report.failed == {}
+        assert report.skipped == []
+        for payment in payments:
+            payment.refresh_from_db()
+            assert payment.status != ps.PRE_AUTH
+        ignored.refresh_from_db()
+        assert ignored.status == ps.NEW
+
+    def test_locks_rows_in_chunks_skipping_locked(
+        self, payment_factory, lock_spy
+    ):
+        for _ in range(5):
+            payment_factory(status=ps.PRE_AUTH)
+
+        report = run_bulk_operation(
+            Payment.objects.all(),
+            'release_lock',
+            status=ps.PRE_AUTH,
+            chunk_size=2,
+        )
+
+        assert len(report.succeeded) == 5
+        assert lock_spy == [{'skip_locked': True}] * 3
+
+    def test_failed_gateway_call_does_not_abort_the_batch(
+        self, payment_factory
+    ):
+        good = payment_factory(status=ps.PRE_AUTH)
+        bad = payment_factory(status=ps.PRE_AUTH)
+        original_charge = DummyPaymentProcessor.charge
+
+        async def flaky_charge(self, amount=None, **kwargs):
+            if self.payment.pk == bad.pk:
+                raise RuntimeError('gateway exploded')
+            return await original_charge(self, amount=amount, **kwargs)
+
+        with patch.object(DummyPaymentProcessor, 'charge', flaky_charge):
+            report = run_bulk_operation(
+                Payment.objects.all(), 'charge', status=ps.PRE_AUTH
+            )
+
+        assert report.succeeded == [good.pk]
+        assert str(report.failed[bad.pk]) == 'gateway exploded'
+        bad.refresh_from_db()
+        assert bad.status == ps.PRE_AUTH
+
+    def test_invalid_transition_is_reported_per_payment(self, payment_factory):
+        payment = payment_factory(status=ps.NEW)
+
+        report = run_bulk_operation(Payment.objects.all(), 'start_refund')
+
+        assert report.succeeded == []
+        assert 'Cannot start refund' in str(report.failed[payment.pk])
+
+    def test_bulk_save_sends_post_save(self, payment_factory):
+        payment = payment_factory(status=ps.PAID)
+        payment.amount_paid = payment.amount_required
+        payment.save()
+        saved = []
+
+        def receiver(sender, instance, created, **kwargs):
+            saved.append((instance.pk, instance.status, created))
+
+        post_save.connect(receiver, sender=Payment)
+        try:
+            run_bulk_operation(
+                Payment.objects.all(), 'start_refund', status=ps.PAID
+            )
+        finally:
+            post_save.disconnect(receiver, sender=Payment)
+
+        assert saved == [(payment.pk, ps.REFUND_STARTED, False)]
+
+    def test_rejects_unknown_operation(self):
+        with pytest.raises(ValueError, match='Unknown bulk'):
+            run_bulk_operation(Payment.objects.all(), 'prepare')
+
+    def test_rejects_invalid_chunk_size_setting(self, settings):
+        settings.GETPAID = {'BULK_ACTION_CHUNK_SIZE': 0}
+
+        with pytest.raises(ImproperlyConfigured):
+            run_bulk_operation(Payment.objects.all(), 'charge')
+
+
+class TestCallMany:
+    def test_bounds_async_concurrency_and_keeps_order(self):
+        in_flight = 0
+        peak = 0
+
+        async def call(value):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if value == 3:
+                raise RuntimeError('boom')
+            return value
+
+        results = bridge.call_many(
+            [(None, call, {'value': value}) for value in range(8)],
+            concurrency=2,
+        )
+
+        assert peak == 2
+        assert results[:3] == [0, 1, 2]
+        assert isinstance(results[3], RuntimeError)
+        assert results[4:] == [4, 5, 6, 7]
+
+    def test_sync_methods_run_inline(self):
+        def call(value):
+            if value:
+                raise ValueError('sync boom')
+            return 'ok'
+
+        results = bridge.call_many([
+            (None, call, {'value': 0}),
+            (None, call, {'value': 1}),
+        ])
+
+        assert results[0] == 'ok'
+        assert isinstance(results[1], ValueError)
+
+
+class TestBulkJobs:
+    def test_worker_processes_job_in_chunks(self, payment_factory):
+        payments = [payment_factory(status=ps.PRE_AUTH) for _ in range(5)]
+        job = enqueue_bulk_job(
+            Payment.objects.all(), 'release_lock', status=ps.PRE_AUTH
+        )
+        assert job.status == BulkJobStatus.PENDING
+        assert job.total == 5
+
+        first = process_next_chunk(chunk_size=2)
+
+        assert first.status == BulkJobStatus.RUNNING
+        assert (first.processed, first.progress) == (2, 40)
+
+        call_command('getpaid_worker', '--once', '--chunk-size', '2')
+
+        job.refresh_from_db()
+        assert job.status == BulkJobStatus.DONE
+        assert (job.processed, job.succeeded, job.failed) == (5, 5, 0)
+        assert job.finished_on is not None
+        assert not Payment.objects.filter(
+            pk__in=[p.pk for p in payments], status=ps.PRE_AUTH
+        ).exists()
+
+    def test_records_failures_and_skips(self, payment_factory):
+        good = payment_factory(status=ps.PRE_AUTH)
+        bad = payment_factory(status=ps.PRE_AUTH)
+        moved = payment_factory(status=ps.PRE_AUTH)
+        job = enqueue_bulk_job(
+            Payment.objects.all(), 'charge', status=ps.PRE_AUTH
+        )
+        Payment.objects.filter(pk=moved.pk).update(status=ps.FAILED)
+        original_charge = DummyPaymentProcessor.charge
+
+        async def flaky_charge(self, amount=None, **kwargs):
+            if self.payment.pk == bad.pk:
+                raise RuntimeError('gateway exploded')
+            return await original_charge(self, amount=amount, **kwargs)
+
+        with patch.object(DummyPaymentProcessor, 'charge', flaky_charge):
+            run_worker(once=True)
+
+        job.refresh_from_db()
+        assert (job.succeeded, job.failed, job.skipped) == (1, 1, 1)
+        assert job.failures == {str(bad.pk): 'gateway exploded'}
+        good.refresh_from_db()
+        assert good.status != ps.PRE_AUTH
+
+    def test_empty_job_is_done_immediately(self):
+        job = enqueue_bulk_job(Payment.objects.none(), 'charge')
+
+        assert job.status == BulkJobStatus.DONE
+        assert process_next_chunk() is None
+
+    def test_expired_chunk_is_claimed_again(self, payment_factory):
+        for _ in range(3):
+            payment_factory(status=ps.PRE_AUTH)
+        job = enqueue_bulk_job(
+            Payment.objects.all(), 'release_lock', status=ps.PRE_AUTH
+        )
+
+        # The worker dies after claiming its chunk.
+        with (
+            patch('getpaid.bulk.run_bulk_operation', side_effect=SystemExit),
+            pytest.raises(SystemExit),
+        ):
+            process_next_chunk(chunk_size=2)
+        job.refresh_from_db()
+        assert (job.cursor, job.processed, len(job.claims)) == (2, 0, 1)
+
+        run_worker(once=True, chunk_size=2)
+        job.refresh_from_db()
+        assert job.status == BulkJobStatus.RUNNING
+        assert job.processed == 1
+
+        _expire_leases(job)
+        run_worker(once=True, chunk_size=2)
+
+        job.refresh_from_db()
+        assert job.status == BulkJobStatus.DONE
+        assert (job.processed, job.succeeded) == (3, 3)
+        assert job.claims == {}
+        assert not Payment.objects.filter(status=ps.PRE_AUTH).exists()
+
+    def test_chunk_finished_after_reclaim_is_not_counted(
+        self, payment_factory
+    ):
+        payment_factory(status=ps.PRE_AUTH)
+        job = enqueue_bulk_job(
+            Payment.objects.all(), 'release_lock', status=ps.PRE_AUTH
+        )
+        calls = []
+
+        def slow_worker(*args, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                # The lease runs out and another worker takes over.
+                _expire_leases(BulkJob.objects.get(pk=job.pk))
+                process_next_chunk()
+            return run_bulk_operation(*args, **kwargs)
+
+        with patch('getpaid.bulk.run_bulk_operation', side_effect=slow_worker):
+            process_next_chunk()
+
+        job.refresh_from_db()
+        assert len(calls) == 2
+        assert job.status == BulkJobStatus.DONE
+        assert (job.processed, job.succeeded, job.skipped) == (1, 1, 0)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_worker_calls_gateway_outside_transaction(self, payment_factory):
+        payments = [payment_factory(status=ps.PRE_AUTH) for _ in range(2)]
+        job = enqueue_bulk_job(
+            Payment.objects.all(), 'release_lock', status=ps.PRE_AUTH
+        )
+        # Processor coroutines run on the runner thread; look at the
+        # connection of the worker thread.
+        caller_connection = connections['default']
+        original = DummyPaymentProcessor.release_lock
+        seen = []
+
+        async def release_lock(self, **kwargs):
+            seen.append(caller_connection.in_atomic_block)
+            return await original(self, **kwargs)
+
+        with patch.object(DummyPaymentProcessor, 'release_lock', release_lock):
+            run_worker(once=True)
+
+        assert seen == [False, False]
+        job.refresh_from_db()
+        assert (job.status, job.succeeded) == (BulkJobStatus.DONE, 2)
+        intents = PaymentOperation.objects.filter(operation='release_lock')
+        assert {intent.payment_id for intent in intents} == {
+            str(payment.pk) for payment in payments
+        }
+        assert {intent.status for intent in intents} == {'applied'}
+        assert not BulkJob.objects.exclude(status=BulkJobStatus.DONE).exists()
+
+
+def _expire_leases(job):
+    past = timezone.now() - timedelta(seconds=1)
+    for claim in job.claims.values():
+        claim['expires_on'] = past.isoformat()
+    job.lease_expires_on = past
+    job.save()
@@ -2,14 +2,17 @@
 
 import functools
 import json
-from unittest.mock import AsyncMock, Mock
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from django.test import RequestFactory
 
 from getpaid.adapters import (
+    CallbackEnvelope,
     adapt_callback_request,
     call_processor_verify_callback,
+    callback_envelope,
 )
 
 
@@ -62,6 +65,94 @@ def test_adapt_callback_request_flattens_single_form_values(factory):
     assert data == {'status': 'paid', 'amount': '100'}
 
 
+def test_envelope_is_built_and_parsed_once_per_request(factory):
+    request = factory.post(
+        '/callback/',
+        data=json.dumps({'status': 'paid'}),
+        content_type='application/json',
+    )
+
+    with patch('getpaid.adapters.json.loads', wraps=json.loads) as loads:
+        first = adapt_callback_request(request)
+        second = adapt_callback_request(request)
+
+    assert loads.call_count == 1
+    assert callback_envelope(request) is callback_envelope(request)
+    assert first == second
+
+
+def test_stages_get_their_own_copies(factory):
+    request = factory.post(
+        '/callback/',
+        data=json.dumps({'status': 'paid', 'items': [{'id': 1}]}),
+        content_type='application/json',
+        HTTP_X_SIGNATURE='abc',
+    )
+
+    data, headers, _raw_body = adapt_callback_request(request)
+    data['status'] = 'failed'
+    data['items'][0]['id'] = 2
+    del headers['X-SIGNATURE']
+    data, headers, _raw_body = adapt_callback_request(request)
+
+    assert data == {'status': 'paid', 'items': [{'id': 1}]}
+    assert headers['x-signature'] == 'abc'
+
+
+def test_envelope_headers_are_case_insensitive(factory):
+    request = factory.post('/callback/', HTTP_X_SIGNATURE='abc')
+
+    headers = callback_envelope(request).headers
+
+    assert headers['x-signature'] == 'abc'
+    assert headers.get('X-Signature') == 'abc'
+    assert 'x-SIGNATURE' in headers
+    assert 'X-SIGNATURE' in list(headers)
+
+
+def test_envelope_is_immutable(factory):
+    envelope = callback_envelope(
+        factory.post('/callback/', data={'status': 'paid'}, HTTP_X_FOO='1')
+    )
+
+    with pytest.raises(AttributeError):
+        envelope.data = {}
+    with pytest.raises(TypeError):
+        envelope.data['status'] = 'failed'
+    with pytest.raises(TypeError):
+        envelope.headers['X-FOO'] = '2'
+
+
+def test_envelope_source_ip(factory):
+    request = factory.post('/callback/', REMOTE_ADDR='203.0.113.7')
+
+    assert callback_envelope(request).source_ip == '203.0.113.7'
+
+
+def test_envelope_uses_fast_decoder_with_stdlib_fallback(factory):
+    class DecodeError(json.JSONDecodeError):
+        pass
+
+    def loads(raw_body):
+        if b'big' in raw_body:
+            raise DecodeError('too big', '', 0)
+        return {'fast': True}
+
+    fake_orjson = SimpleNamespace(loads=loads, JSONDecodeError=DecodeError)
+
+    def envelope_for(payload):
+        request = factory.post(
+            '/callback/',
+            data=json.dumps(payload),
+            content_type='application/json',
+        )
+        return CallbackEnvelope(request)
+
+    with patch('getpaid.adapters.orjson', fake_orjson):
+        assert envelope_for({'status': 'paid'}).data == {'fast': True}
+        assert envelope_for({'big': 2**70}).data == {'big': 2**70}
+
+
 def test_call_processor_verify_callback_async():
     """Test async processor verification."""
     processor = Mock()
@@ -0,0 +1,235 @@
+"""Tests for callback deduplication by provider event id."""
+
+import io
+import json
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from getpaid.backends.dummy.processor import (
+    PaymentProcessor as DummyPaymentProcessor,
+)
+from getpaid.dedup import DatabaseDedupStore, get_dedup_store
+from getpaid.models import CallbackEvent
+from getpaid.registry import registry
+from getpaid.types import PaymentStatus as ps
+
+pytestmark = pytest.mark.django_db
+
+
+class _EventIdProcessor(DummyPaymentProcessor):
+    slug = 'dedup_dummy'
+
+    @classmethod
+    def get_callback_event_id(cls, data, headers):
+        return data.get('event_id')
+
+
+class _PaymentlessEventIdProcessor(_EventIdProcessor):
+    slug = 'dedup_global'
+
+    @classmethod
+    def extract_callback_correlation(cls, data, headers):
+        return {'payment_id': data['payment_id']}
+
+
+@pytest.fixture(autouse=True)
+def _register_processor(settings):
+    settings.DEBUG = True
+    registry.register(_EventIdProcessor)
+    registry.register(_PaymentlessEventIdProcessor)
+    yield
+    registry.unregister(_EventIdProcessor.slug)
+    registry.unregister(_PaymentlessEventIdProcessor.slug)
+
+
+@pytest.fixture(params=['cache', 'database'])
+def dedup_store(request, settings):
+    backend = {
+        'cache': 'getpaid.dedup.CacheDedupStore',
+        'database': 'getpaid.dedup.DatabaseDedupStore',
+    }[request.param]
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'getpaid-dedup-tests',
+        }
+    }
+    settings.GETPAID = {'CALLBACK_DEDUP': {'BACKEND': backend, 'TTL': 60}}
+    store = get_dedup_store()
+    yield store
+    if request.param == 'cache':
+        store.cache.clear()
+
+
+@pytest.fixture
+def lock_spy(monkeypatch):
+    locked = []
+    original = QuerySet.select_for_update
+
+    def spy(qs, *args, **kwargs):
+        locked.append(qs.model.__name__)
+        return original(qs, *args, **kwargs)
+
+    monkeypatch.setattr(QuerySet, 'select_for_update', spy)
+    return locked
+
+
+@pytest.fixture
+def prepared_payment(payment_factory):
+    return payment_factory(status=ps.PREPARED, backend=_EventIdProcessor.slug)
+
+
+@pytest.fixture
+def post(client, django_capture_on_commit_callbacks):
+    def _post(payment, event_id, new_status='paid'):
+        # Events are marked as seen on commit.
+        with django_capture_on_commit_callbacks(execute=True):
+            return client.post(
+                f'/payments/callback/{payment.pk}/',
+                data=json.dumps({
+                    'new_status': new_status,
+                    'event_id': event_id,
+                }),
+                content_type='application/json',
+            )
+
+    return _post
+
+
+class TestCallbackDedup:
+    def test_redelivery_is_acked_without_locking(
+        self, post, prepared_payment, dedup_store, lock_spy
+    ):
+        first = post(prepared_payment, 'evt_1')
+        assert first.status_code == 200
+        assert dedup_store.seen(f'{_EventIdProcessor.slug}:evt_1')
+        lock_spy.clear()
+
+        again = post(prepared_payment, 'evt_1', new_status='failed')
+
+        assert again.status_code == 200
+        assert again.content == b'Already processed'
+        assert lock_spy == []
+        prepared_payment.refresh_from_db()
+        assert prepared_payment.status == ps.PAID
+
+    def test_rejected_callback_is_not_remembered(
+        self, post, prepared_payment, dedup_store, monkeypatch
+    ):
+        from getpaid.exceptions import InvalidCallbackError
+
+        def failing_security(processor, request):
+            raise InvalidCallbackError('bad signature')
+
+        monkeypatch.setattr(
+            'getpaid.views.enforce_callback_security', failing_security
+        )
+
+        response = post(prepared_payment, 'evt_2')
+
+        assert response.status_code == 403
+        assert not dedup_store.seen(f'{_EventIdProcessor.slug}:evt_2')
+
+    def test_unmatched_event_does_not_suppress_genuine_one(
+        self,
+        client,
+        django_capture_on_commit_callbacks,
+        payment_factory,
+        dedup_store,
+    ):
+        payment = payment_factory(
+            status=ps.PREPARED, backend=_PaymentlessEventIdProcessor.slug
+        )
+
+        def post(payment_id):
+            with django_capture_on_commit_callbacks(execute=True):
+                return client.post(
+                    f'/payments/callback/{_PaymentlessEventIdProcessor.slug}/',
+                    data=json.dumps({
+                        'event_id': 'evt_3',
+                        'payment_id': payment_id,
+                        'new_status': 'paid',
+                    }),
+                    content_type='application/json',
+                )
+
+        forged = post(str(uuid.uuid4()))
+        assert forged.content == b'No matching payment'
+        assert not dedup_store.seen(
+            f'{_PaymentlessEventIdProcessor.slug}:evt_3'
+        )
+
+        genuine = post(str(payment.pk))
+
+        assert genuine.content != b'Already processed'
+        payment.refresh_from_db()
+        assert payment.status == ps.PAID
+        assert dedup_store.seen(f'{_PaymentlessEventIdProcessor.slug}:evt_3')
+
+    def test_unverified_duplicate_is_not_remembered(
+        self, post, prepared_payment, dedup_store, monkeypatch
+    ):
+        from getpaid_core.exceptions import InvalidTransitionError
+
+        def rejected_early(processor, request):
+            raise InvalidTransitionError('rejected before verification')
+
+        monkeypatch.setattr(
+            'getpaid.views.enforce_callback_security', rejected_early
+        )
+
+        response = post(prepared_payment, 'evt_4')
+
+        assert response.content == b'Already processed'
+        assert not dedup_store.seen(f'{_EventIdProcessor.slug}:evt_4')
+
+    def test_late_duplicate_is_remembered(
+        self, post, prepared_payment, dedup_store
+    ):
+        post(prepared_payment, 'evt_paid')
+
+        # A different event the FSM rejects as already applied.
+        response = post(prepared_payment, 'evt_late', new_status='pre-auth')
+
+        assert response.content == b'Already processed'
+        assert dedup_store.seen(f'{_EventIdProcessor.slug}:evt_late')
+
+    def test_callbacks_without_event_id_are_not_deduplicated(
+        self, post, prepared_payment, dedup_store, lock_spy
+    ):
+        post(prepared_payment, None, new_status='pre-auth')
+        lock_spy.clear()
+
+        post(prepared_payment, None, new_status='paid')
+
+        assert lock_spy
+        prepared_payment.refresh_from_db()
+        assert prepared_payment.status == ps.PAID
+
+
+class TestDatabaseDedupStore:
+    def test_expired_events_are_not_seen_and_pruned(self, settings):
+        settings.GETPAID = {
+            'CALLBACK_DEDUP': {'BACKEND': 'getpaid.dedup.DatabaseDedupStore'}
+        }
+        store = DatabaseDedupStore(ttl=60)
+        store.mark('dummy:old')
+        store.mark('dummy:new')
+        CallbackEvent.objects.filter(key='dummy:old').update(
+            expires_on=timezone.now() - timedelta(seconds=1)
+        )
+        out = io.StringIO()
+
+        assert not store.seen('dummy:old')
+        assert store.seen('dummy:new')
+        call_command('getpaid_prune_callback_events', stdout=out)
+
+        assert 'Deleted 1 expired' in out.getvalue()
+        assert list(CallbackEvent.objects.values_list('key', flat=True)) == [
+            'dummy:new'
+        ]
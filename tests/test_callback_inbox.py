@@ -0,0 +1,145 @@
+"""Tests for the ingest-then-apply callback inbox."""
+
+import io
+import json
+import uuid
+
+import pytest
+from django.core.management import call_command
+
+from getpaid.inbox import process_next_callback
+from getpaid.models import CallbackInbox, CallbackInboxStatus
+from getpaid.types import PaymentStatus as ps
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _ingest_mode(settings):
+    settings.DEBUG = True
+    settings.GETPAID = {'CALLBACK_MODE': 'ingest'}
+
+
+@pytest.fixture
+def prepared_payment(payment_factory):
+    return payment_factory(status=ps.PREPARED, external_id=str(uuid.uuid4()))
+
+
+def _post_status(client, payment, new_status, **extra):
+    return client.post(
+        f'/payments/callback/{payment.pk}/',
+        data=json.dumps({'new_status': new_status}),
+        content_type='application/json',
+        **extra,
+    )
+
+
+class TestIngest:
+    def test_callback_is_stored_not_applied(self, client, prepared_payment):
+        response = _post_status(
+            client, prepared_payment, 'paid', HTTP_X_SIGNATURE='abc'
+        )
+
+        assert response.status_code == 200
+        prepared_payment.refresh_from_db()
+        assert prepared_payment.status == ps.PREPARED
+        entry = CallbackInbox.objects.get()
+        assert entry.payment_id == str(prepared_payment.pk)
+        assert entry.status == CallbackInboxStatus.PENDING
+        assert json.loads(bytes(entry.body)) == {'new_status': 'paid'}
+        assert entry.meta['HTTP_X_SIGNATURE'] == 'abc'
+
+    def test_ingest_does_not_lock_payment(
+        self, client, prepared_payment, monkeypatch
+    ):
+        from django.db.models import QuerySet
+
+        def forbid(qs, *args, **kwargs):
+            raise AssertionError('ingest must not lock the payment row')
+
+        monkeypatch.setattr(QuerySet, 'select_for_update', forbid)
+
+        response = _post_status(client, prepared_payment, 'paid')
+
+        assert response.status_code == 200
+
+    def test_verification_failure_stores_nothing(
+        self, client, prepared_payment, monkeypatch
+    ):
+        from getpaid.exceptions import InvalidCallbackError
+
+        def failing_verify(processor, request):
+            raise InvalidCallbackError('bad signature')
+
+        monkeypatch.setattr(
+            'getpaid.inbox.call_processor_verify_callback', failing_verify
+        )
+
+        response = _post_status(client, prepared_payment, 'paid')
+
+        assert response.status_code == 403
+        assert not CallbackInbox.objects.exists()
+
+
+class TestDrain:
+    def test_applies_entries_in_order(self, client, prepared_payment):
+        _post_status(client, prepared_payment, 'pre-auth')
+        _post_status(client, prepared_payment, 'paid')
+        out = io.StringIO()
+
+        call_command('getpaid_drain_callbacks', '--once', stdout=out)
+
+        assert 'Applied 2 callback(s).' in out.getvalue()
+        prepared_payment.refresh_from_db()
+        assert prepared_payment.status == ps.PAID
+        assert set(CallbackInbox.objects.values_list('status', flat=True)) == {
+            CallbackInboxStatus.APPLIED
+        }
+
+    def test_later_entry_waits_for_pending_earlier_one(
+        self, client, prepared_payment, monkeypatch
+    ):
+        _post_status(client, prepared_payment, 'pre-auth')
+        _post_status(client, prepared_payment, 'paid')
+
+        def boom(entry):
+            raise RuntimeError('gateway down')
+
+        monkeypatch.setattr('getpaid.inbox._apply_entry', boom)
+
+        first = process_next_callback()
+
+        assert first.status == CallbackInboxStatus.PENDING
+        assert first.attempts == 1
+        assert first.last_error == 'gateway down'
+        # The first entry is backing off; the second must not overtake it.
+        assert process_next_callback() is None
+
+    def test_duplicate_is_marked_applied(self, client, prepared_payment):
+        _post_status(client, prepared_payment, 'paid')
+        _post_status(client, prepared_payment, 'pre-auth')
+
+        process_next_callback()
+        duplicate = process_next_callback()
+
+        assert duplicate.status == CallbackInboxStatus.APPLIED
+        assert duplicate.last_error == 'Already processed'
+
+    def test_gives_up_after_max_attempts(
+        self, client, prepared_payment, monkeypatch, settings
+    ):
+        settings.GETPAID = {
+            'CALLBACK_MODE': 'ingest',
+            'CALLBACK_INBOX_MAX_ATTEMPTS': 1,
+        }
+        _post_status(client, prepared_payment, 'paid')
+
+        def boom(entry):
+            raise RuntimeError('gateway down')
+
+        monkeypatch.setattr('getpaid.inbox._apply_entry', boom)
+
+        entry = process_next_callback()
+
+        assert entry.status == CallbackInboxStatus.FAILED
+        assert entry.processed_on is not None
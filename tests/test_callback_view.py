@@ -1,5 +1,6 @@
 """Functional tests for CallbackDetailView (locking + error handling)."""
 
+import asyncio
 import json
 import uuid
 
@@ -139,3 +140,28 @@ class TestCallbackErrorHandling:
         response = _post_status(client, prepared_payment, 'paid')
 
         assert response.status_code == 403
+
+    def test_forged_callback_never_locks_payment(
+        self, client, prepared_payment, monkeypatch
+    ):
+        """Signature checks run before the payment row is locked."""
+        from django.db.models import QuerySet
+
+        from getpaid.backends.dummy.processor import PaymentProcessor
+        from getpaid.exceptions import InvalidCallbackError
+
+        async def forged(self, data, headers, **kwargs):
+            await asyncio.sleep(0)
+            raise InvalidCallbackError('bad signature')
+
+        def forbid(qs, *args, **kwargs):
+            raise AssertionError('unverified callback locked the payment')
+
+        monkeypatch.setattr(PaymentProcessor, 'verify_callback', forged)
+        monkeypatch.setattr(QuerySet, 'select_for_update', forbid)
+
+        response = _post_status(client, prepared_payment, 'paid')
+
+        assert response.status_code == 403
+        prepared_payment.refresh_from_db()
+        assert prepared_payment.status == ps.PREPARED
@@ -0,0 +1,164 @@
+"""Tests for the per-backend circuit breaker."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from getpaid import circuit
+from getpaid.bridge import ProcessorBridge
+from getpaid.circuit import CircuitBreaker
+from getpaid.exceptions import (
+    CircuitOpenError,
+    CommunicationError,
+    InvalidCallbackError,
+)
+from getpaid.registry import registry
+
+
+@pytest.fixture(autouse=True)
+def _breaker_enabled(settings):
+    settings.GETPAID = {
+        'CIRCUIT_BREAKER': {
+            'ENABLED': True,
+            'MIN_CALLS': 4,
+            'ERROR_RATE': 0.5,
+            'OPEN_DURATION': 30,
+        },
+    }
+    yield
+    circuit.reset()
+
+
+def _processor(slug='dummy'):
+    processor = Mock(slug=slug, config={})
+    processor.payment = None
+    return processor
+
+
+def _failing(*args, **kwargs):
+    raise CommunicationError('gateway down')
+
+
+def _trip(processor):
+    bridge = ProcessorBridge()
+    for _ in range(4):
+        with pytest.raises(CommunicationError):
+            bridge.call(processor, _failing)
+
+
+class TestCircuitBreaker:
+    def test_opens_at_error_rate_and_fails_fast(self):
+        processor = _processor()
+        _trip(processor)
+        method = Mock()
+
+        with pytest.raises(CircuitOpenError):
+            ProcessorBridge().call(processor, method)
+
+        method.assert_not_called()
+
+    def test_needs_min_calls(self):
+        breaker = CircuitBreaker('dummy', min_calls=4)
+        for _ in range(3):
+            breaker.record(0.1, RuntimeError())
+
+        assert breaker.state == circuit.CLOSED
+
+    def test_slow_calls_open_breaker(self):
+        breaker = CircuitBreaker(
+            'dummy', min_calls=2, slow_call_duration=1.0, slow_call_rate=0.5
+        )
+        breaker.record(0.1)
+        breaker.record(2.0)
+
+        assert breaker.state == circuit.OPEN
+
+    def test_ignores_verification_errors(self):
+        breaker = CircuitBreaker('dummy', min_calls=2)
+        breaker.record(0.1, InvalidCallbackError())
+        breaker.record(0.1, InvalidCallbackError())
+
+        assert breaker.state == circuit.CLOSED
+
+    def test_half_open_trial_closes_on_success(self):
+        breaker = CircuitBreaker('dummy', min_calls=1, open_duration=30)
+        with patch('getpaid.circuit.time.monotonic', return_value=100.0):
+            breaker.record(0.1, RuntimeError())
+        assert breaker.state == circuit.OPEN
+
+        with patch('getpaid.circuit.time.monotonic', return_value=131.0):
+            breaker.acquire()
+            # Only one trial call at a time.
+            with pytest.raises(CircuitOpenError):
+                breaker.acquire()
+            breaker.record(0.1)
+
+        assert breaker.state == circuit.CLOSED
+
+    def test_half_open_trial_failure_reopens(self):
+        breaker = CircuitBreaker('dummy', min_calls=1, open_duration=30)
+        with patch('getpaid.circuit.time.monotonic', return_value=100.0):
+            breaker.record(0.1, RuntimeError())
+        with patch('getpaid.circuit.time.monotonic', return_value=131.0):
+            breaker.acquire()
+            breaker.record(0.1, RuntimeError())
+
+            assert breaker.state == circuit.OPEN
+            assert not breaker.available()
+
+    def test_disabled_by_default(self, settings):
+        settings.GETPAID = {}
+        processor = _processor()
+
+        for _ in range(10):
+            with pytest.raises(CommunicationError):
+                ProcessorBridge().call(processor, _failing)
+
+        assert circuit.is_available('dummy')
+
+
+class TestBackendChoices:
+    def test_open_backend_is_not_offered(self):
+        assert 'dummy' in dict(registry.get_choices('PLN'))
+
+        _trip(_processor('dummy'))
+
+        assert 'dummy' not in dict(registry.get_choices('PLN'))
+        assert all(
+            backend.slug != 'dummy' for backend in registry.get_backends('PLN')
+        )
+
+    def test_open_backend_changes_cache_key(self):
+        key = registry.get_backends_cache_key('PLN')
+
+        _trip(_processor('dummy'))
+
+        assert registry.get_backends_cache_key('PLN') != key
+        assert registry.get_backends_cache_key('PLN').endswith(':dummy')
+
+
+class TestCallbacks:
+    def test_open_breaker_does_not_block_callback_handling(self):
+        processor = _processor()
+        _trip(processor)
+        processor.handle_callback = Mock(__name__='handle_callback')
+
+        ProcessorBridge().call(processor, processor.handle_callback, {}, {})
+
+        processor.handle_callback.assert_called_once()
+
+    def test_failing_callback_handling_does_not_count(self):
+        processor = _processor()
+        processor.handle_callback = Mock(
+            __name__='handle_callback',
+            side_effect=CommunicationError('handler failed'),
+        )
+
+        for _ in range(10):
+            with pytest.raises(CommunicationError):
+                ProcessorBridge().call(
+                    processor, processor.handle_callback, {}, {}
+                )
+
+        assert circuit.is_available('dummy')
+        assert circuit.breaker_for('dummy').state == circuit.CLOSED
@@ -0,0 +1,93 @@
+"""Tests for the shared processor client registry."""
+
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from getpaid.clients import clients, close_clients
+from getpaid.processor import BaseProcessor
+
+
+class FakeClient:
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncClient(FakeClient):
+    async def aclose(self):
+        await asyncio.sleep(0)
+        self.closed = True
+
+
+class ClientProcessor(BaseProcessor):
+    slug = 'client-test'
+    client_class = FakeClient
+    share_client = True
+
+    def get_client_params(self):
+        return {'api_key': self.get_setting('api_key')}
+
+
+def _processor(processor_class=ClientProcessor, api_key='key-1'):
+    return processor_class(Mock(backend='client-test'), {'api_key': api_key})
+
+
+@pytest.fixture(autouse=True)
+def _empty_registry():
+    clients.forget()
+    yield
+    clients.forget()
+
+
+def test_instances_share_one_client():
+    first, second = _processor(), _processor()
+
+    assert first.client is second.client
+    assert len(clients) == 1
+
+
+def test_different_params_get_different_clients():
+    assert _processor().client is not _processor(api_key='key-2').client
+
+
+def test_sharing_is_opt_in():
+    class PrivateClientProcessor(BaseProcessor):
+        slug = 'client-test'
+        client_class = FakeClient
+
+    assert (
+        _processor(PrivateClientProcessor).client
+        is not _processor(PrivateClientProcessor).client
+    )
+    assert len(clients) == 0
+
+
+def test_close_closes_sync_and_async_clients():
+    class AsyncClientProcessor(ClientProcessor):
+        client_class = FakeAsyncClient
+
+    sync_client = _processor().client
+    async_client = _processor(AsyncClientProcessor).client
+
+    close_clients()
+
+    assert sync_client.closed
+    assert async_client.closed
+    assert len(clients) == 0
+    assert _processor().client is not sync_client
+
+
+def test_clients_are_rebuilt_after_fork():
+    inherited = _processor().client
+
+    with patch('getpaid.clients.os.getpid', return_value=-1):
+        rebuilt = _processor().client
+
+    assert rebuilt is not inherited
+    # Clients inherited from the parent are dropped, never closed.
+    assert not inherited.closed
@@ -0,0 +1,199 @@
+"""Tests for the gateway communication log."""
+
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from getpaid.bridge import bridge
+from getpaid.commlog import (
+    CommunicationLogger,
+    get_communication_logger,
+    redact,
+)
+from getpaid.models import CommunicationLogEntry
+from getpaid.types import PaymentStatus as ps
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def comm_log(settings, monkeypatch):
+    # Records are flushed explicitly instead of by the background thread.
+    monkeypatch.setattr(
+        CommunicationLogger, '_ensure_flusher', lambda self: None
+    )
+    settings.DEBUG = True
+    settings.GETPAID = {
+        'COMMUNICATION_LOG': {'ENABLED': True, 'MAX_BODY_SIZE': 16}
+    }
+    return get_communication_logger()
+
+
+class _Processor:
+    slug = 'dummy'
+
+    def charge(self, amount=None, **kwargs):
+        return {'amount': amount, 'token': 'tok_live_123'}
+
+    def release_lock(self):
+        raise RuntimeError('gateway down')
+
+
+def test_disabled_by_default():
+    assert get_communication_logger() is None
+
+
+def test_outbound_calls_are_logged(comm_log):
+    bridge.call(_Processor(), _Processor().charge, amount=10, note='x' * 50)
+    with pytest.raises(RuntimeError):
+        bridge.call(_Processor(), _Processor().release_lock)
+
+    assert comm_log.flush() == 2
+    charge, release = CommunicationLogEntry.objects.order_by('id')
+    assert (charge.direction, charge.backend, charge.method) == (
+        'outbound',
+        'dummy',
+        'charge',
+    )
+    assert charge.duration_ms is not None
+    assert charge.payload_size > len(charge.body) == 16
+    assert charge.response == "{'amount': 10, '"
+    assert release.error == 'RuntimeError: gateway down'
+    assert not release.response
+
+
+def test_bodies_and_responses_are_redacted(comm_log, settings):
+    settings.GETPAID = {
+        'COMMUNICATION_LOG': {'ENABLED': True, 'MAX_BODY_SIZE': 200}
+    }
+    processor = _Processor()
+
+    bridge.call(processor, processor.charge, amount=10, card={'number': '4111'})
+    get_communication_logger().flush()
+
+    entry = CommunicationLogEntry.objects.get()
+    assert entry.body == "{'amount': 10, 'card': '[redacted]'}"
+    assert entry.response == "{'amount': 10, 'token': '[redacted]'}"
+
+
+def test_custom_redactor(comm_log, settings):
+    settings.GETPAID = {
+        'COMMUNICATION_LOG': {
+            'ENABLED': True,
+            'REDACTOR': 'tests.test_commlog.redact_everything',
+        }
+    }
+    processor = _Processor()
+
+    bridge.call(processor, processor.charge, amount=10)
+    get_communication_logger().flush()
+
+    entry = CommunicationLogEntry.objects.get()
+    assert (entry.body, entry.response) == ('***', '***')
+
+
+def redact_everything(data):
+    return '***'
+
+
+def test_inbound_callback_is_logged_once(comm_log, client, payment_factory):
+    payment = payment_factory(status=ps.PREPARED)
+    body = json.dumps({'new_status': 'paid', 'padding': 'x' * 100})
+
+    client.post(
+        f'/payments/callback/{payment.pk}/',
+        data=body,
+        content_type='application/json',
+    )
+    comm_log.flush()
+
+    entry = CommunicationLogEntry.objects.get(direction='inbound')
+    assert entry.payment_id == str(payment.pk)
+    assert entry.method == f'POST /payments/callback/{payment.pk}/'
+    assert entry.payload_size == len(body)
+    assert entry.body == "{'new_status': '"
+
+
+def test_inbound_bodies_are_redacted(
+    comm_log, settings, client, payment_factory
+):
+    settings.GETPAID = {
+        'COMMUNICATION_LOG': {'ENABLED': True, 'MAX_BODY_SIZE': 200}
+    }
+    payment = payment_factory(status=ps.PREPARED)
+
+    client.post(
+        f'/payments/callback/{payment.pk}/',
+        data={'new_status': 'paid', 'signature': 'abc', 'cvv': '123'},
+    )
+    get_communication_logger().flush()
+
+    entry = CommunicationLogEntry.objects.get(direction='inbound')
+    assert entry.body == (
+        "{'cvv': '[redacted]', 'new_status': 'paid', 'signature': '[redacted]'}"
+    )
+
+
+def test_plain_text_bodies_are_redacted():
+    assert redact('id=1&card_number=4111&token=abc') == (
+        'id=1&card_number=[redacted]&token=[redacted]'
+    )
+    assert redact('<signature>abc</signature>') == (
+        '<signature>abc</signature>'
+    )
+
+
+def test_sampling_and_full_buffer(settings, monkeypatch):
+    monkeypatch.setattr(
+        CommunicationLogger, '_ensure_flusher', lambda self: None
+    )
+    settings.GETPAID = {
+        'COMMUNICATION_LOG': {'ENABLED': True, 'SAMPLE_RATE': 0}
+    }
+    bridge.call(_Processor(), _Processor().charge)
+    assert get_communication_logger().flush() == 0
+
+    comm_logger = CommunicationLogger(buffer_size=2)
+    for method in ('a', 'b', 'c'):
+        comm_logger.submit({'direction': 'outbound', 'method': method})
+
+    assert comm_logger.dropped == 1
+    assert comm_logger.flush() == 2
+    assert list(
+        CommunicationLogEntry.objects.order_by('id').values_list(
+            'method', flat=True
+        )
+    ) == ['b', 'c']
+
+
+def test_prune_command(comm_log):
+    _old, recent = CommunicationLogEntry.objects.bulk_create([
+        CommunicationLogEntry(
+            direction='outbound',
+            method='charge',
+            created_on=timezone.now() - timedelta(days=31),
+        ),
+        CommunicationLogEntry(direction='outbound', method='charge'),
+    ])
+    out = io.StringIO()
+
+    call_command('getpaid_prune_communication_log', stdout=out)
+
+    assert 'Deleted 1 communication log entries.' in out.getvalue()
+    assert list(CommunicationLogEntry.objects.values_list('pk', flat=True)) == [
+        recent.pk
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_background_thread_flushes():
+    comm_logger = CommunicationLogger(batch_size=1, flush_interval=0.05)
+
+    comm_logger.submit({'direction': 'outbound', 'method': 'charge'})
+    comm_logger.stop()
+
+    assert CommunicationLogEntry.objects.filter(method='charge').exists()
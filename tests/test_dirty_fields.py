@@ -0,0 +1,133 @@
+"""Tests for payment dirty-field tracking and narrowed saves."""
+
+import pytest
+import swapper
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test.utils import CaptureQueriesContext
+
+from getpaid.repository import DjangoPaymentRepository
+from getpaid.types import PaymentStatus as ps
+
+pytestmark = pytest.mark.django_db
+
+Payment = swapper.load_model('getpaid', 'Payment')
+
+
+@pytest.fixture
+def payment(payment_factory):
+    created = payment_factory(status=ps.PREPARED)
+    return Payment.objects.get(pk=created.pk)
+
+
+def _payment_updates(queries):
+    prefix = f'UPDATE "{Payment._meta.db_table}"'
+    return [q['sql'] for q in queries if q['sql'].startswith(prefix)]
+
+
+def test_unchanged_save_is_skipped(payment, django_assert_num_queries):
+    version = payment.version
+
+    with django_assert_num_queries(0):
+        DjangoPaymentRepository(Payment)._save(payment)
+
+    assert payment.version == version
+
+
+def test_save_writes_only_changed_columns(payment):
+    payment.status = ps.PAID
+    payment.updated_on = None
+
+    with CaptureQueriesContext(connection) as ctx:
+        DjangoPaymentRepository(Payment)._save(payment)
+
+    [sql] = _payment_updates(ctx.captured_queries)
+    assert '"status"' in sql
+    assert '"version"' in sql
+    assert '"updated_on"' in sql
+    assert '"provider_data"' not in sql
+    assert '"fraud_message"' not in sql
+    assert payment.get_dirty_fields() == []
+    payment.refresh_from_db()
+    assert payment.updated_on is not None
+
+
+@pytest.mark.parametrize('optimistic', [False, True])
+def test_narrowed_saves_stamp_auto_now_fields(settings, payment, optimistic):
+    settings.GETPAID = {'OPTIMISTIC_LOCKING': optimistic}
+    Payment.objects.filter(pk=payment.pk).update(updated_on=None)
+    payment.refresh_from_db()
+    payment.status = ps.PAID
+
+    DjangoPaymentRepository(Payment)._save(payment)
+
+    payment.refresh_from_db()
+    assert payment.status == ps.PAID
+    assert payment.updated_on is not None
+
+
+def test_plain_save_keeps_the_model_save_contract(payment):
+    Payment.objects.filter(pk=payment.pk).update(updated_on=None)
+    payment.refresh_from_db()
+    saved = []
+
+    def receiver(sender, instance, **kwargs):
+        saved.append(kwargs['update_fields'])
+
+    post_save.connect(receiver, sender=Payment)
+    try:
+        # Nothing changed, yet Model.save() still writes and signals.
+        payment.save()
+    finally:
+        post_save.disconnect(receiver, sender=Payment)
+
+    assert saved == [None]
+    payment.refresh_from_db()
+    assert payment.updated_on is not None
+
+
+def test_in_place_json_change_is_dirty(payment):
+    payment.provider_data['session'] = 'abc'
+
+    assert payment.get_dirty_fields() == ['provider_data']
+
+
+def test_partial_refresh_keeps_other_changes_dirty(payment):
+    payment.fraud_message = 'check'
+    Payment.objects.filter(pk=payment.pk).update(status=ps.PAID)
+
+    payment.refresh_from_db(fields=['status'])
+
+    assert payment.status == ps.PAID
+    assert payment.get_dirty_fields() == ['fraud_message']
+
+
+def test_unsaved_payment_has_no_snapshot(order_factory):
+    order = order_factory()
+    payment = Payment(order=order, amount_required=1, currency='PLN')
+
+    assert payment.get_dirty_fields() is None
+
+
+def test_bulk_save_skips_unchanged_payments(payment_factory):
+    first, second = (
+        Payment.objects.get(pk=payment_factory(status=ps.PREPARED).pk)
+        for _ in range(2)
+    )
+    first.status = ps.PAID
+    saved = []
+
+    def receiver(sender, instance, **kwargs):
+        saved.append((instance.pk, kwargs['update_fields']))
+
+    post_save.connect(receiver, sender=Payment)
+    try:
+        DjangoPaymentRepository(Payment)._bulk_save([first, second])
+    finally:
+        post_save.disconnect(receiver, sender=Payment)
+
+    assert saved == [
+        (first.pk, frozenset({'status', 'updated_on', 'version'}))
+    ]
+    second.refresh_from_db()
+    assert second.status == ps.PREPARED
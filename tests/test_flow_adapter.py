@@ -10,7 +10,12 @@ from django import forms
 from django.http import HttpResponseRedirect
 from getpaid_core.exceptions import GetPaidException
 
-from getpaid.flow_adapter import DjangoPaymentFlowAdapter, prepare_transaction
+from getpaid import flow_adapter
+from getpaid.flow_adapter import (
+    DjangoPaymentFlowAdapter,
+    clear_backend_cache,
+    prepare_transaction,
+)
 from getpaid.status import PaymentStatus as ps
 
 pytestmark = pytest.mark.django_db
@@ -193,3 +198,77 @@ class TestPrepareTransaction:
         assert len(result['form']['fields']) == 2
         assert result['form']['fields'][0]['name'] == 'amount'
         assert result['form']['fields'][1]['name'] == 'currency'
+
+
+class TestResolvedBackendCache:
+    @pytest.fixture(autouse=True)
+    def _empty_cache(self):
+        clear_backend_cache()
+        yield
+        clear_backend_cache()
+
+    def test_resolution_is_memoized_per_backend(self):
+        payment = _make_payment()
+
+        with patch(
+            'getpaid.flow_adapter._resolve_backend_config',
+            wraps=flow_adapter._resolve_backend_config,
+        ) as resolve:
+            first = flow_adapter._get_processor(payment, Payment)
+            second = flow_adapter._get_processor(payment, Payment)
+
+        assert resolve.call_count == 1
+        assert type(first) is type(second)
+        assert first is not second
+
+    def test_settings_change_invalidates_cache(self, settings):
+        payment = _make_payment()
+        flow_adapter._get_processor(payment, Payment)
+
+        settings.GETPAID_BACKEND_SETTINGS = {
+            'getpaid.backends.dummy': {'paywall_method': 'POST'}
+        }
+
+        processor = flow_adapter._get_processor(payment, Payment)
+        assert processor.get_setting('paywall_method') == 'POST'
+
+    def test_registry_change_invalidates_cache(self):
+        from getpaid.registry import registry
+
+        from .tools import Plugin
+
+        payment = _make_payment()
+        flow_adapter._get_processor(payment, Payment)
+        generation = registry.generation
+
+        registry.register(Plugin)
+        try:
+            assert registry.generation > generation
+            with patch(
+                'getpaid.flow_adapter._resolve_backend_config',
+                wraps=flow_adapter._resolve_backend_config,
+            ) as resolve:
+                flow_adapter._get_processor(payment, Payment)
+            assert resolve.call_count == 1
+        finally:
+            registry.unregister(Plugin.slug)
+
+    def test_processor_config_is_not_shared_between_instances(self):
+        payment = _make_payment()
+        first = flow_adapter._get_processor(payment, Payment)
+        first.config['mutated'] = True
+
+        second = flow_adapter._get_processor(payment, Payment)
+
+        assert 'mutated' not in second.config
+
+    def test_prepare_transaction_builds_one_processor(self):
+        payment = _make_payment()
+
+        with patch(
+            'getpaid.flow_adapter._get_processor',
+            wraps=flow_adapter._get_processor,
+        ) as get_processor:
+            prepare_transaction(payment)
+
+        assert get_processor.call_count == 1
@@ -6,6 +6,7 @@ event body via the backend processor's ``extract_callback_correlation`` hook,
 then runs the same locked machinery as the per-payment ``CallbackDetailView``.
 """
 
+import asyncio
 import json
 import uuid
 
@@ -208,3 +209,27 @@ class TestGlobalCallbackErrorHandling:
             {'payment_id': str(prepared_payment.pk), 'new_status': 'paid'},
         )
         assert response.status_code == 403
+
+    def test_forged_callback_never_locks_payment(
+        self, client, prepared_payment, monkeypatch
+    ):
+        from django.db.models import QuerySet
+
+        from getpaid.exceptions import InvalidCallbackError
+
+        async def forged(self, data, headers, **kwargs):
+            await asyncio.sleep(0)
+            raise InvalidCallbackError('bad signature')
+
+        def forbid(qs, *args, **kwargs):
+            raise AssertionError('unverified callback locked the payment')
+
+        monkeypatch.setattr(_GlobalDummyProcessor, 'verify_callback', forged)
+        monkeypatch.setattr(QuerySet, 'select_for_update', forbid)
+
+        response = _post(
+            client,
+            'global_dummy',
+            {'payment_id': str(prepared_payment.pk), 'new_status': 'paid'},
+        )
+        assert response.status_code == 403
@@ -0,0 +1,156 @@
+"""Tests for compiled callback IP allowlists."""
+
+import os
+from ipaddress import ip_address
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory
+
+from getpaid import ipindex
+from getpaid.callback_security import enforce_callback_security
+from getpaid.exceptions import InvalidCallbackError
+from getpaid.ipindex import IPNetworkIndex, compile_networks, network_file
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache():
+    ipindex.clear()
+    yield
+    ipindex.clear()
+
+
+class TestIPNetworkIndex:
+    def test_matches_ipv4_and_ipv6_networks(self):
+        index = IPNetworkIndex([
+            '203.0.113.0/24',
+            '198.51.100.7',
+            '2001:db8::/32',
+        ])
+
+        assert '203.0.113.255' in index
+        assert '198.51.100.7' in index
+        assert '198.51.100.8' not in index
+        assert ip_address('2001:db8:1::1') in index
+        assert '2001:db9::1' not in index
+
+    def test_adjacent_and_overlapping_networks_are_merged(self):
+        index = IPNetworkIndex([
+            '10.0.0.0/25',
+            '10.0.0.128/25',
+            '10.0.0.64/26',
+            '192.0.2.1',
+        ])
+
+        assert len(index) == 2
+        assert '10.0.0.200' in index
+        assert '10.0.1.0' not in index
+
+    def test_address_only_matches_its_ip_version(self):
+        index = IPNetworkIndex(['0.0.0.0/0'])
+
+        assert '::ffff:203.0.113.1' not in index
+        assert '203.0.113.1' in index
+
+    def test_empty_index_is_falsy(self):
+        assert not IPNetworkIndex()
+
+    def test_invalid_entry_raises(self):
+        with pytest.raises(ValueError, match='does not appear to be'):
+            IPNetworkIndex(['not-an-ip'])
+
+
+class TestCompiledCache:
+    def test_same_list_is_compiled_once(self):
+        allowlist = ['203.0.113.0/24']
+
+        assert compile_networks(allowlist) is compile_networks(allowlist)
+        assert compile_networks(['203.0.113.0/24']) is not compile_networks(
+            allowlist
+        )
+
+    def test_cache_is_cleared_on_settings_change(self, settings):
+        proxies = ['10.0.0.0/8']
+        first = compile_networks(proxies)
+
+        settings.GETPAID = {'CALLBACK_TRUSTED_PROXIES': proxies}
+
+        assert compile_networks(proxies) is not first
+
+
+class TestNetworkFile:
+    def test_loads_networks_and_skips_comments(self, tmp_path):
+        path = tmp_path / 'allowlist.txt'
+        path.write_text(
+            '# provider ranges\n203.0.113.0/24\n\n2001:db8::/32 # v6\n'
+        )
+
+        index = network_file(str(path))
+
+        assert '203.0.113.9' in index
+        assert '2001:db8::1' in index
+
+    def test_file_is_reread_when_it_changes(self, tmp_path, settings):
+        settings.GETPAID = {'CALLBACK_IP_ALLOWLIST_REFRESH': 0}
+        path = tmp_path / 'allowlist.txt'
+        path.write_text('203.0.113.0/24\n')
+        assert '198.51.100.1' not in network_file(str(path))
+
+        path.write_text('198.51.100.0/24\n')
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert '198.51.100.1' in network_file(str(path))
+
+    def test_broken_refresh_keeps_previous_networks(self, tmp_path, settings):
+        settings.GETPAID = {'CALLBACK_IP_ALLOWLIST_REFRESH': 0}
+        path = tmp_path / 'allowlist.txt'
+        path.write_text('203.0.113.0/24\n')
+        network_file(str(path))
+
+        path.unlink()
+
+        assert '203.0.113.1' in network_file(str(path))
+
+    def test_missing_file_is_a_configuration_error(self, tmp_path):
+        with pytest.raises(ImproperlyConfigured):
+            network_file(str(tmp_path / 'missing.txt'))
+
+
+class _Processor:
+    def __init__(self, **config):
+        self.config = config
+
+    def get_setting(self, name, default=None):
+        return self.config.get(name, default)
+
+    def verify_callback(self, request):
+        pass
+
+
+class TestEnforceAllowlist:
+    def test_allowlist_file_admits_listed_source(self, tmp_path):
+        path = tmp_path / 'allowlist.txt'
+        path.write_text('203.0.113.0/24\n')
+        processor = _Processor(callback_ip_allowlist_file=str(path))
+        factory = RequestFactory()
+
+        enforce_callback_security(
+            processor, factory.post('/', REMOTE_ADDR='203.0.113.5')
+        )
+        with pytest.raises(InvalidCallbackError):
+            enforce_callback_security(
+                processor, factory.post('/', REMOTE_ADDR='198.51.100.5')
+            )
+
+    def test_inline_list_and_file_are_combined(self, tmp_path):
+        path = tmp_path / 'allowlist.txt'
+        path.write_text('203.0.113.0/24\n')
+        processor = _Processor(
+            callback_ip_allowlist=['198.51.100.5'],
+            callback_ip_allowlist_file=str(path),
+        )
+
+        enforce_callback_security(
+            processor, RequestFactory().post('/', REMOTE_ADDR='198.51.100.5')
+        )
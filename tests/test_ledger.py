@@ -0,0 +1,179 @@
+"""Tests for the append-only payment ledger."""
+
+import json
+
+import pytest
+import swapper
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from getpaid_core.enums import PaymentEvent
+from getpaid_core.types import PaymentUpdate
+
+from getpaid import ledger
+from getpaid.models import PaymentLedgerEntry
+from getpaid.repository import DjangoPaymentRepository
+from getpaid.types import PaymentStatus as ps
+
+pytestmark = pytest.mark.django_db
+
+Payment = swapper.load_model('getpaid', 'Payment')
+
+
+@pytest.fixture
+def prepared_payment(payment_factory):
+    return payment_factory(status=ps.PREPARED)
+
+
+def _capture(payment, **provider_data):
+    return PaymentUpdate(
+        payment_event=PaymentEvent.PAYMENT_CAPTURED,
+        paid_amount=payment.amount_required,
+        provider_data=provider_data,
+    )
+
+
+def test_callback_update_is_recorded(
+    client, settings, prepared_payment, django_capture_on_commit_callbacks
+):
+    settings.DEBUG = True
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(
+            f'/payments/callback/{prepared_payment.pk}/',
+            data=json.dumps({'new_status': 'paid'}),
+            content_type='application/json',
+        )
+
+    entry = PaymentLedgerEntry.objects.get()
+    assert entry.payment_id == str(prepared_payment.pk)
+    assert entry.source == 'callback'
+    assert entry.payment_event == PaymentEvent.PAYMENT_CAPTURED.value
+    assert (entry.status_before, entry.status_after) == (ps.PREPARED, ps.PAID)
+    assert entry.amount_paid == prepared_payment.amount_required
+    assert entry.period == entry.created_on.date().replace(day=1)
+
+
+def test_entries_are_written_in_one_batch_on_commit(
+    payment_factory, django_capture_on_commit_callbacks
+):
+    payments = [payment_factory(status=ps.PREPARED) for _ in range(3)]
+    repository = DjangoPaymentRepository(Payment)
+
+    with CaptureQueriesContext(connection) as ctx:
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                for payment in payments:
+                    repository._apply_update(
+                        payment, lambda p=payment: _capture(p), source='test'
+                    )
+                assert not PaymentLedgerEntry.objects.exists()
+
+    table = PaymentLedgerEntry._meta.db_table
+    inserts = [
+        query
+        for query in ctx.captured_queries
+        if query['sql'].startswith(f'INSERT INTO "{table}"')
+    ]
+    assert len(inserts) == 1
+    assert PaymentLedgerEntry.objects.filter(source='test').count() == 3
+
+
+def test_rolled_back_savepoint_leaves_no_entry(
+    payment_factory, django_capture_on_commit_callbacks
+):
+    kept, rolled_back = (payment_factory(status=ps.PREPARED) for _ in range(2))
+    repository = DjangoPaymentRepository(Payment)
+
+    def apply_and_fail():
+        with transaction.atomic():
+            repository._apply_update(rolled_back, lambda: _capture(rolled_back))
+            raise RuntimeError
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            repository._apply_update(kept, lambda: _capture(kept))
+            with pytest.raises(RuntimeError):
+                apply_and_fail()
+
+    assert list(
+        PaymentLedgerEntry.objects.values_list('payment_id', flat=True)
+    ) == [str(kept.pk)]
+
+
+def test_rolled_back_transaction_does_not_swallow_next_entries(
+    payment_factory, django_capture_on_commit_callbacks
+):
+    rolled_back, kept = (payment_factory(status=ps.PREPARED) for _ in range(2))
+    repository = DjangoPaymentRepository(Payment)
+
+    def apply_and_fail():
+        with transaction.atomic():
+            repository._apply_update(rolled_back, lambda: _capture(rolled_back))
+            raise RuntimeError
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            apply_and_fail()
+        with transaction.atomic():
+            repository._apply_update(kept, lambda: _capture(kept))
+
+    assert list(
+        PaymentLedgerEntry.objects.values_list('payment_id', flat=True)
+    ) == [str(kept.pk)]
+
+
+def test_naive_datetimes_are_supported(
+    settings, prepared_payment, django_capture_on_commit_callbacks
+):
+    settings.USE_TZ = False
+
+    with django_capture_on_commit_callbacks(execute=True):
+        DjangoPaymentRepository(Payment)._apply_update(
+            prepared_payment, lambda: _capture(prepared_payment)
+        )
+
+    entry = PaymentLedgerEntry.objects.get()
+    assert entry.period == entry.created_on.date().replace(day=1)
+
+
+def test_provider_data_delta_and_noop_updates(
+    prepared_payment, django_capture_on_commit_callbacks
+):
+    prepared_payment.provider_data = {'keep': 1, 'drop': 2}
+    before = ledger.capture(prepared_payment)
+    prepared_payment.provider_data = {'keep': 1, 'new': 3}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ledger.record(prepared_payment, PaymentUpdate(), before, source='test')
+        ledger.record(
+            prepared_payment,
+            PaymentUpdate(),
+            ledger.capture(prepared_payment),
+            source='noop',
+        )
+
+    entry = PaymentLedgerEntry.objects.get()
+    assert entry.provider_data_delta == {'new': 3, 'drop': None}
+
+
+def test_entries_are_append_only(
+    prepared_payment, django_capture_on_commit_callbacks
+):
+    before = ledger.capture(prepared_payment)
+    prepared_payment.status = ps.FAILED
+    with django_capture_on_commit_callbacks(execute=True):
+        ledger.record(prepared_payment, PaymentUpdate(), before)
+    entry = PaymentLedgerEntry.objects.get()
+
+    with pytest.raises(ValueError, match='append-only'):
+        entry.save()
+
+
+def test_ledger_can_be_disabled(settings, prepared_payment):
+    settings.GETPAID = {'PAYMENT_LEDGER': False}
+
+    DjangoPaymentRepository(Payment)._apply_update(
+        prepared_payment, lambda: _capture(prepared_payment)
+    )
+
+    assert not PaymentLedgerEntry.objects.exists()
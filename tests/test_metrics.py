@@ -0,0 +1,180 @@
+"""Tests for the Prometheus-style metrics surface."""
+
+import asyncio
+import json
+import threading
+
+import pytest
+import swapper
+from getpaid_core.exceptions import InvalidTransitionError
+
+from getpaid import metrics
+from getpaid.async_runner import AsyncRunner
+from getpaid.flow_adapter import DjangoPaymentFlowAdapter
+from getpaid.types import PaymentStatus as ps
+
+pytestmark = pytest.mark.django_db
+
+Payment = swapper.load_model('getpaid', 'Payment')
+
+BACKEND = 'getpaid.backends.dummy'
+
+
+@pytest.fixture(autouse=True)
+def _enabled(settings):
+    settings.GETPAID = {'METRICS_ENABLED': True}
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _charge(payment_factory):
+    payment = payment_factory(status=ps.PRE_AUTH)
+    payment.amount_locked = payment.amount_required
+    DjangoPaymentFlowAdapter(payment, Payment).charge(
+        amount=payment.amount_required
+    )
+
+
+def test_adapter_operation_is_counted_and_timed(payment_factory):
+
+    _charge(payment_factory)
+
+    assert (
+        metrics.operations.value(
+            operation='charge', backend=BACKEND, outcome='success'
+        )
+        == 1
+    )
+    assert (
+        metrics.operation_duration.count(operation='charge', backend=BACKEND)
+        == 1
+    )
+    assert (
+        metrics.transitions.value(
+            backend=BACKEND, from_status=ps.PRE_AUTH, to_status=ps.PAID
+        )
+        == 1
+    )
+
+
+def test_invalid_transition_outcome(payment_factory):
+    payment = payment_factory(status=ps.NEW)
+
+    with pytest.raises(InvalidTransitionError):
+        DjangoPaymentFlowAdapter(payment, Payment).release_lock()
+
+    assert (
+        metrics.operations.value(
+            operation='release_lock',
+            backend=BACKEND,
+            outcome='invalid_transition',
+        )
+        == 1
+    )
+
+
+def test_callbacks_are_counted_by_outcome(client, settings, payment_factory):
+    settings.DEBUG = True
+    payment = payment_factory(status=ps.PREPARED)
+    url = f'/payments/callback/{payment.pk}/'
+
+    client.post(
+        url,
+        data=json.dumps({'new_status': 'paid'}),
+        content_type='application/json',
+    )
+    client.post(url, data='{', content_type='application/json')
+    client.post(
+        '/payments/callback/nope/',
+        data='{}',
+        content_type='application/json',
+    )
+
+    client.post(
+        '/payments/callback/other/',
+        data='{}',
+        content_type='application/json',
+    )
+
+    assert metrics.callbacks.value(backend=BACKEND, outcome='accepted') == 1
+    assert metrics.callbacks.value(backend=BACKEND, outcome='malformed') == 1
+    assert metrics.callback_duration.count(backend=BACKEND) == 2
+    assert metrics.callbacks.value(backend='nope', outcome='not_found') == 0
+    assert (
+        metrics.callbacks.value(backend='unknown', outcome='not_found') == 2
+    )
+
+
+def test_disabled_records_nothing(settings, payment_factory, client):
+    settings.GETPAID = {}
+
+    _charge(payment_factory)
+
+    assert (
+        metrics.operations.value(
+            operation='charge', backend=BACKEND, outcome='success'
+        )
+        == 0
+    )
+    assert client.get('/payments/metrics/').status_code == 404
+
+
+def test_endpoint_renders_text_format(client, payment_factory):
+    _charge(payment_factory)
+
+    response = client.get('/payments/metrics/')
+
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    body = response.content.decode()
+    assert '# TYPE getpaid_operations counter' in body
+    assert (
+        'getpaid_operations_total{operation="charge",'
+        f'backend="{BACKEND}",outcome="success"}} 1'
+    ) in body
+    assert (
+        'getpaid_operation_duration_seconds_bucket{operation="charge",'
+        f'backend="{BACKEND}",le="+Inf"}} 1'
+    ) in body
+    assert 'getpaid_async_runner_inflight{loop="getpaid-async-runner"} 0' in (
+        body
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram('h', 'Test.', ('kind',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, kind='a')
+
+    assert histogram.samples() == [
+        'h_bucket{kind="a",le="0.1"} 1',
+        'h_bucket{kind="a",le="1"} 2',
+        'h_bucket{kind="a",le="+Inf"} 3',
+        'h_sum{kind="a"} 5.55',
+        'h_count{kind="a"} 3',
+    ]
+
+
+def test_runner_separates_queued_and_running():
+    runner = AsyncRunner(name='getpaid-test-runner')
+    started = threading.Event()
+    release = threading.Event()
+
+    async def block():
+        started.set()
+        while not release.is_set():
+            await asyncio.sleep(0.005)
+
+    worker = threading.Thread(target=runner.run, args=(block(),))
+    try:
+        worker.start()
+        started.wait(timeout=1)
+        observed = (runner.queued, runner.running)
+        release.set()
+        worker.join(timeout=1)
+    finally:
+        runner.shutdown()
+
+    assert observed == (0, 1)
+    assert (runner.queued, runner.running) == (0, 0)
@@ -0,0 +1,155 @@
+"""Tests for opt-in optimistic locking of payment transitions."""
+
+import json
+
+import pytest
+import swapper
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F, QuerySet
+from getpaid_core.enums import PaymentEvent
+from getpaid_core.types import PaymentUpdate
+
+from getpaid.exceptions import ConcurrentUpdateError
+from getpaid.repository import DjangoPaymentRepository
+from getpaid.types import PaymentStatus as ps
+
+pytestmark = pytest.mark.django_db
+
+Payment = swapper.load_model('getpaid', 'Payment')
+
+
+@pytest.fixture
+def optimistic(settings):
+    settings.DEBUG = True
+    settings.GETPAID = {'OPTIMISTIC_LOCKING': True}
+
+
+@pytest.fixture
+def prepared_payment(payment_factory):
+    return payment_factory(status=ps.PREPARED)
+
+
+@pytest.fixture
+def repository():
+    return DjangoPaymentRepository(Payment)
+
+
+def _bump_version(payment):
+    Payment.objects.filter(pk=payment.pk).update(version=F('version') + 1)
+
+
+def _paid(payment):
+    return PaymentUpdate(
+        payment_event=PaymentEvent.PAYMENT_CAPTURED,
+        paid_amount=payment.amount_required,
+    )
+
+
+def test_save_increments_version(prepared_payment):
+    version = prepared_payment.version
+
+    prepared_payment.save(update_fields=['description'])
+
+    prepared_payment.refresh_from_db()
+    assert prepared_payment.version == version + 1
+
+
+@pytest.mark.usefixtures('optimistic')
+class TestVersionedSave:
+    def test_stale_save_raises(self, prepared_payment, repository):
+        stale = Payment.objects.get(pk=prepared_payment.pk)
+        prepared_payment.fraud_message = 'first'
+        repository._save(prepared_payment)
+
+        stale.fraud_message = 'second'
+        with pytest.raises(ConcurrentUpdateError):
+            repository._save(stale)
+
+        stale.refresh_from_db()
+        assert stale.fraud_message == 'first'
+
+    def test_apply_update_retries_on_conflict(
+        self, prepared_payment, repository
+    ):
+        attempts = []
+
+        def build_update():
+            attempts.append(prepared_payment.version)
+            if len(attempts) == 1:
+                _bump_version(prepared_payment)
+            return _paid(prepared_payment)
+
+        repository._apply_update(prepared_payment, build_update)
+
+        assert len(attempts) == 2
+        prepared_payment.refresh_from_db()
+        assert prepared_payment.status == ps.PAID
+        assert prepared_payment.version == attempts[1] + 1
+
+    def test_apply_update_gives_up(
+        self, prepared_payment, repository, settings
+    ):
+        settings.GETPAID = {
+            'OPTIMISTIC_LOCKING': True,
+            'OPTIMISTIC_LOCKING_RETRIES': 1,
+        }
+
+        def build_update():
+            _bump_version(prepared_payment)
+            return _paid(prepared_payment)
+
+        with pytest.raises(ConcurrentUpdateError):
+            repository._apply_update(prepared_payment, build_update)
+
+    def test_invalid_retries_setting(
+        self, prepared_payment, repository, settings
+    ):
+        settings.GETPAID = {
+            'OPTIMISTIC_LOCKING': True,
+            'OPTIMISTIC_LOCKING_RETRIES': -1,
+        }
+
+        with pytest.raises(ImproperlyConfigured):
+            repository._apply_update(
+                prepared_payment, lambda: _paid(prepared_payment)
+            )
+
+
+@pytest.mark.usefixtures('optimistic')
+class TestOptimisticCallbacks:
+    def _post(self, client, payment, new_status='paid'):
+        return client.post(
+            f'/payments/callback/{payment.pk}/',
+            data=json.dumps({'new_status': new_status}),
+            content_type='application/json',
+        )
+
+    def test_callback_does_not_lock_row(
+        self, client, prepared_payment, monkeypatch
+    ):
+        def forbid(qs, *args, **kwargs):
+            raise AssertionError('optimistic mode must not lock the row')
+
+        monkeypatch.setattr(QuerySet, 'select_for_update', forbid)
+
+        response = self._post(client, prepared_payment)
+
+        assert response.status_code == 200
+        prepared_payment.refresh_from_db()
+        assert prepared_payment.status == ps.PAID
+
+    def test_exhausted_retries_answer_409(
+        self, client, prepared_payment, monkeypatch
+    ):
+        def conflict(self, payment):
+            raise ConcurrentUpdateError('lost the race')
+
+        monkeypatch.setattr(
+            DjangoPaymentRepository, '_save_if_unchanged', conflict
+        )
+
+        response = self._post(client, prepared_payment)
+
+        assert response.status_code == 409
+        prepared_payment.refresh_from_db()
+        assert prepared_payment.status == ps.PREPARED
@@ -0,0 +1,139 @@
+"""Tests for the deep readiness check."""
+
+import asyncio
+import logging
+import threading
+
+import pytest
+
+from getpaid import health
+from getpaid.backends.dummy.processor import (
+    PaymentProcessor as DummyPaymentProcessor,
+)
+
+pytestmark = pytest.mark.django_db
+
+URL = '/payments/health/ready/'
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    health.reset_cache()
+    yield
+    health.reset_cache()
+
+
+def test_ready_when_dependencies_answer(client):
+    response = client.get(URL)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data['status'] == 'ok'
+    assert set(data['checks']) == {'database', 'async_runner'}
+    assert data['checks']['database']['status'] == 'ok'
+    assert 'latency_ms' in data['checks']['async_runner']
+
+
+def test_database_failure_is_not_ready(client, monkeypatch, caplog):
+    def broken():
+        raise RuntimeError('connection refused by 10.0.0.5')
+
+    monkeypatch.setattr(health, '_check_database', broken)
+
+    with caplog.at_level(logging.WARNING, logger='getpaid.health'):
+        response = client.get(URL)
+
+    assert response.status_code == 503
+    data = response.json()
+    assert data['status'] == 'fail'
+    # Details stay in the log, out of the unauthenticated response.
+    assert data['checks']['database'] == {
+        'status': 'fail',
+        'error': 'RuntimeError',
+        'latency_ms': data['checks']['database']['latency_ms'],
+    }
+    assert '10.0.0.5' not in response.content.decode()
+    assert 'connection refused by 10.0.0.5' in caplog.text
+
+
+def test_hung_check_times_out(settings, monkeypatch):
+    settings.GETPAID = {'READINESS_TIMEOUT': 0.05}
+    release = threading.Event()
+    monkeypatch.setattr(health, '_check_database', release.wait)
+
+    try:
+        report = health.check_readiness()
+    finally:
+        release.set()
+
+    assert report['status'] == 'fail'
+    assert report['checks']['database']['error'] == 'TimeoutError'
+    assert report['checks']['async_runner']['status'] == 'ok'
+
+
+def test_probes_get_previous_report_during_refresh(settings, monkeypatch):
+    settings.GETPAID = {'READINESS_CACHE_TTL': 0}
+    previous = health.check_readiness()
+    started = threading.Event()
+    release = threading.Event()
+
+    def hung():
+        started.set()
+        release.wait()
+
+    monkeypatch.setattr(health, '_check_database', hung)
+    refresh = threading.Thread(target=health.check_readiness)
+    refresh.start()
+    started.wait(timeout=5)
+    try:
+        assert health.check_readiness() is previous
+    finally:
+        release.set()
+        refresh.join()
+
+
+def test_slow_runner_exceeds_latency_budget(settings, monkeypatch):
+    settings.GETPAID = {'READINESS_LATENCY_BUDGET': 0.01}
+    real_sleep = asyncio.sleep
+
+    async def slow_sleep(delay):
+        await real_sleep(0.2)
+
+    monkeypatch.setattr(health.asyncio, 'sleep', slow_sleep)
+
+    report = health.check_readiness()
+
+    assert report['status'] == 'fail'
+    assert report['checks']['async_runner']['error'] == 'TimeoutError'
+
+
+def test_failing_backend_probe_degrades(client, monkeypatch):
+    async def probe(cls, config):
+        await asyncio.sleep(0)
+        raise ConnectionError('gateway unreachable')
+
+    monkeypatch.setattr(
+        DummyPaymentProcessor,
+        'check_readiness',
+        classmethod(probe),
+        raising=False,
+    )
+
+    response = client.get(URL)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data['status'] == 'degraded'
+    assert data['checks']['backend:dummy']['error'] == 'ConnectionError'
+
+
+def test_report_is_cached(settings, monkeypatch):
+    settings.GETPAID = {'READINESS_CACHE_TTL': 60}
+    calls = []
+    monkeypatch.setattr(health, '_check_database', lambda: calls.append(1))
+
+    first = health.check_readiness()
+    second = health.check_readiness()
+
+    assert first is second
+    assert len(calls) == 1
@@ -0,0 +1,130 @@
+"""Tests for bulk PULL-mode status reconciliation."""
+
+import asyncio
+import io
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+import swapper
+from django.core.management import call_command
+from django.utils import timezone
+
+from getpaid.backends.dummy.processor import (
+    PaymentProcessor as DummyPaymentProcessor,
+)
+from getpaid.reconcile import RateLimiter, reconcile_payments
+from getpaid.types import PaymentStatus as ps
+
+pytestmark = pytest.mark.django_db
+
+Payment = swapper.load_model('getpaid', 'Payment')
+
+
+@pytest.fixture
+def stale_payments(payment_factory):
+    payments = [payment_factory(status=ps.PREPARED) for _ in range(3)]
+    Payment.objects.update(created_on=timezone.now() - timedelta(hours=1))
+    return payments
+
+
+class TestReconcilePayments:
+    def test_applies_fetched_status_in_batches(self, stale_payments):
+        report = reconcile_payments(batch_size=2)
+
+        assert (report.scanned, report.updated, report.batches) == (3, 3, 2)
+        assert report.failed == {}
+        assert report.elapsed > 0
+        assert set(Payment.objects.values_list('status', flat=True)) == {
+            ps.PAID
+        }
+
+    def test_skips_recent_and_other_statuses(
+        self, stale_payments, payment_factory
+    ):
+        recent = payment_factory(status=ps.PREPARED)
+        paid = stale_payments[0]
+        Payment.objects.filter(pk=paid.pk).update(status=ps.PAID)
+
+        report = reconcile_payments()
+
+        assert report.scanned == 2
+        recent.refresh_from_db()
+        assert recent.status == ps.PREPARED
+
+    def test_reports_unchanged_unsupported_and_failed(self, stale_payments):
+        first, second, third = stale_payments
+
+        async def fetch(self, **kwargs):
+            await asyncio.sleep(0)
+            if self.payment.pk == first.pk:
+                return
+            if self.payment.pk == second.pk:
+                raise NotImplementedError
+            raise RuntimeError('gateway down')
+
+        with patch.object(DummyPaymentProcessor, 'fetch_payment_status', fetch):
+            report = reconcile_payments()
+
+        assert report.unchanged == 1
+        assert report.unsupported == 1
+        assert str(report.failed[third.pk]) == 'gateway down'
+        assert report.updated == 0
+
+    def test_skips_payment_whose_status_changed_during_fetch(
+        self, stale_payments
+    ):
+        target = stale_payments[0]
+
+        def racing_call_many(calls, **kwargs):
+            from getpaid.bridge import ProcessorBridge
+
+            results = ProcessorBridge().call_many(calls, **kwargs)
+            Payment.objects.filter(pk=target.pk).update(status=ps.FAILED)
+            return results
+
+        with patch(
+            'getpaid.reconcile.bridge.call_many', side_effect=racing_call_many
+        ):
+            report = reconcile_payments()
+
+        assert (report.updated, report.skipped) == (2, 1)
+        target.refresh_from_db()
+        assert target.status == ps.FAILED
+
+    def test_rate_limit_wait_is_not_charged_to_the_deadline(
+        self, settings, stale_payments
+    ):
+        settings.GETPAID = {'PROCESSOR_TIMEOUT': 0.05}
+
+        async def fetch(self, **kwargs):
+            await asyncio.sleep(0)
+
+        with patch.object(DummyPaymentProcessor, 'fetch_payment_status', fetch):
+            # Three calls 0.04s apart wait longer than the timeout in total.
+            report = reconcile_payments(rate_limits={'dummy': 25})
+
+        assert report.failed == {}
+        assert report.unchanged == 3
+
+    def test_command_prints_throughput(self, stale_payments):
+        out = io.StringIO()
+
+        call_command(
+            'getpaid_reconcile', '--rate-limit', 'dummy=1000', stdout=out
+        )
+
+        assert 'Scanned 3 payment(s)' in out.getvalue()
+        assert 'payments/s' in out.getvalue()
+        assert 'Updated 3' in out.getvalue()
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(50)
+
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.wait()
+
+    assert time.monotonic() - started >= 3 / 50
@@ -1,6 +1,9 @@
+from unittest.mock import patch
+
 import pytest
 from django.conf import settings
 from django.http import HttpResponse
+from django.template import Context, Template
 from getpaid_core.registry import registry as core_registry
 
 from getpaid.processor import BaseProcessor
@@ -68,3 +71,151 @@ class TestRegistry:
             assert registry[CoreOnlyPlugin.slug] is CoreOnlyPlugin
         finally:
             core_registry.unregister(CoreOnlyPlugin.slug)
+            # Direct core unregistration needs an explicit invalidation.
+            registry.invalidate()
+
+
+class TestRegistryIndex:
+    @pytest.fixture(autouse=True)
+    def setup_plugin(self):
+        if Plugin.slug not in registry:
+            registry.register(Plugin)
+
+    def test_lookups_do_not_rebuild_index(self, monkeypatch):
+        registry.get_by_slug(dummy)
+        monkeypatch.setattr(
+            registry,
+            '_build_index',
+            lambda generation: pytest.fail('index rebuilt on lookup'),
+        )
+
+        assert registry[dummy].slug == 'dummy'
+        assert dummy in registry
+        assert 'dummy' in registry.get_aliases(dummy)
+        assert registry.get_choices('usd')
+
+    def test_choices_are_precomputed_per_currency(self, monkeypatch):
+        choices = registry.get_choices('USD')
+        monkeypatch.setattr(
+            registry,
+            '_build_index',
+            lambda generation: pytest.fail('index rebuilt on lookup'),
+        )
+
+        assert isinstance(choices, list)
+        assert registry.get_choices('usd') == choices
+        assert registry.get_choices('usd') is not choices
+        assert registry.get_backends('USD') == registry.get_backends('usd')
+
+    def test_backends_cache_key_follows_backends(self):
+        key = registry.get_backends_cache_key('eur')
+
+        registry.register(CoreOnlyPlugin)
+        try:
+            assert registry.get_backends_cache_key('EUR') != key
+        finally:
+            registry.unregister(CoreOnlyPlugin.slug)
+
+        assert key.startswith('EUR:')
+        assert registry.get_backends_cache_key('EUR') == key
+
+    def test_backends_cache_key_is_shared_across_processes(self):
+        key = registry.get_backends_cache_key('PLN')
+
+        # Another process has another generation but the same backends.
+        registry.invalidate()
+
+        assert registry.get_backends_cache_key('PLN') == key
+        assert (
+            registry.get_backends_cache_key('XXX').split(':')[1]
+            != key.split(':')[1]
+        )
+
+    def test_register_and_unregister_bump_generation(self):
+        generation = registry.generation
+
+        registry.register(CoreOnlyPlugin)
+        try:
+            assert registry.generation > generation
+            assert CoreOnlyPlugin.slug in registry
+        finally:
+            registry.unregister(CoreOnlyPlugin.slug)
+
+        assert CoreOnlyPlugin.slug not in registry
+        assert 'tests.test_registry' not in registry
+
+    def test_invalidate_picks_up_core_registration(self):
+        generation = registry.generation
+
+        core_registry.register(CoreOnlyPlugin)
+        try:
+            assert CoreOnlyPlugin.slug in registry
+            registry.invalidate()
+            assert registry.generation > generation
+            assert registry.get_backends('EUR').count(CoreOnlyPlugin) == 1
+        finally:
+            core_registry.unregister(CoreOnlyPlugin.slug)
+            registry.invalidate()
+
+        assert CoreOnlyPlugin not in registry.get_backends('EUR')
+        assert CoreOnlyPlugin.slug not in registry
+
+    def test_core_registration_after_first_lookup_is_adopted(self):
+        assert 'dummy' in registry  # builds the index
+        core_registry.register(CoreOnlyPlugin)
+        try:
+            assert CoreOnlyPlugin.slug in registry
+            assert registry.get_aliases(CoreOnlyPlugin.slug) == {
+                CoreOnlyPlugin.slug,
+                'tests.test_registry',
+                'tests.test_registry.CoreOnlyPlugin',
+            }
+            assert CoreOnlyPlugin.slug in list(registry)
+            assert (CoreOnlyPlugin.slug, 'Core-only plugin') in (
+                registry.get_choices('EUR')
+            )
+        finally:
+            core_registry.unregister(CoreOnlyPlugin.slug)
+            registry.invalidate()
+
+        assert CoreOnlyPlugin.slug not in registry
+
+    def test_core_registry_internals_are_left_alone(self):
+        backends = core_registry._backends
+
+        registry.register(CoreOnlyPlugin)
+        registry.unregister(CoreOnlyPlugin.slug)
+
+        assert core_registry._backends is backends
+        assert type(backends) is dict
+
+    def test_aliases_resolve_to_slug(self):
+        aliases = registry.get_aliases('dummy')
+
+        assert {
+            'dummy',
+            'getpaid.backends.dummy',
+            'getpaid.backends.dummy.processor',
+            'getpaid.backends.dummy.processor.PaymentProcessor',
+        } <= aliases
+        assert all(registry.resolve_backend(a) == 'dummy' for a in aliases)
+
+    def test_unknown_backend_raises_key_error(self):
+        with pytest.raises(KeyError):
+            registry.get_by_slug('no-such-backend')
+
+
+def test_backends_cache_key_tag_varies_by_language():
+    template = Template(
+        '{% load getpaid %}{% get_backends_cache_key currency %}'
+    )
+    context = {'currency': 'pln'}
+
+    with patch('getpaid.templatetags.getpaid.get_language', return_value='pl'):
+        polish = template.render(Context(context))
+    with patch('getpaid.templatetags.getpaid.get_language', return_value='en'):
+        english = template.render(Context(context))
+
+    assert polish.startswith('PLN:')
+    assert polish.endswith(':pl')
+    assert english == polish.removesuffix('pl') + 'en'
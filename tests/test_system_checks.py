@@ -3,7 +3,9 @@
 import pytest
 
 from getpaid.checks import (
+    check_async_runner_settings,
     check_backend_settings,
+    check_callback_mode,
     check_order_model,
 )
 
@@ -66,3 +68,34 @@ class TestBackendSettingsCheck:
         }
         assert 'check_order_model' in registered
         assert 'check_backend_settings' in registered
+
+
+class TestAsyncRunnerSettingsCheck:
+    def test_defaults_yield_no_errors(self):
+        assert check_async_runner_settings(app_configs=None) == []
+
+    def test_non_positive_loop_count_is_reported(self, settings):
+        settings.GETPAID = {'ASYNC_RUNNER_LOOPS': 0}
+
+        errors = check_async_runner_settings(app_configs=None)
+
+        assert [error.id for error in errors] == ['getpaid.E004']
+
+    def test_unknown_strategy_is_reported(self, settings):
+        settings.GETPAID = {'ASYNC_RUNNER_STRATEGY': 'round_robin'}
+
+        errors = check_async_runner_settings(app_configs=None)
+
+        assert [error.id for error in errors] == ['getpaid.E005']
+
+
+class TestCallbackModeCheck:
+    def test_default_yields_no_errors(self):
+        assert check_callback_mode(app_configs=None) == []
+
+    def test_unknown_mode_is_reported(self, settings):
+        settings.GETPAID = {'CALLBACK_MODE': 'queue'}
+
+        errors = check_callback_mode(app_configs=None)
+
+        assert [error.id for error in errors] == ['getpaid.E006']
@@ -0,0 +1,96 @@
+"""Tests for the optional OpenTelemetry spans."""
+
+import asyncio
+import contextvars
+from contextlib import contextmanager
+
+import pytest
+import swapper
+
+from getpaid import tracing
+from getpaid.async_runner import run_awaitable
+from getpaid.flow_adapter import DjangoPaymentFlowAdapter
+from getpaid.types import PaymentStatus as ps
+
+Payment = swapper.load_model('getpaid', 'Payment')
+
+
+class FakeSpan:
+    def __init__(self, name, attributes, parent):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.parent = parent
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+
+class FakeTracer:
+    """Records spans and keeps the current one in a context variable."""
+
+    def __init__(self):
+        self.spans = []
+        self.current = contextvars.ContextVar('current_span', default=None)
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        span = FakeSpan(name, attributes or {}, self.current.get())
+        self.spans.append(span)
+        token = self.current.set(span)
+        try:
+            yield span
+        finally:
+            self.current.reset(token)
+
+    def get(self, name):
+        return next(span for span in self.spans if span.name == name)
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    fake = FakeTracer()
+    monkeypatch.setattr(tracing, '_tracer', fake)
+    return fake
+
+
+def test_noop_without_opentelemetry(monkeypatch):
+    monkeypatch.setattr(tracing, 'trace', None)
+    monkeypatch.setattr(tracing, '_tracer', None)
+
+    with tracing.span('getpaid.test', backend='dummy') as current:
+        tracing.set_attributes(current, status='paid')
+
+    assert current is None
+
+
+@pytest.mark.django_db
+def test_operation_spans_nest(tracer, payment_factory):
+    payment = payment_factory(status=ps.PRE_AUTH)
+    payment.amount_locked = payment.amount_required
+
+    DjangoPaymentFlowAdapter(payment, Payment).charge(
+        amount=payment.amount_required
+    )
+
+    operation = tracer.get('getpaid.operation.charge')
+    assert operation.parent is None
+    assert operation.attributes == {
+        'getpaid.operation': 'charge',
+        'getpaid.backend': 'getpaid.backends.dummy',
+        'getpaid.payment_id': str(payment.pk),
+    }
+    assert tracer.get('getpaid.processor.charge').parent is operation
+    fsm = tracer.get('getpaid.fsm.apply')
+    assert fsm.parent is operation
+    assert fsm.attributes['getpaid.status_before'] == ps.PRE_AUTH
+    assert fsm.attributes['getpaid.status_after'] == ps.PAID
+    assert tracer.get('getpaid.repository.save').parent is operation
+
+
+def test_context_propagates_to_runner_thread(tracer):
+    async def current_span_name():
+        await asyncio.sleep(0)
+        return tracer.current.get().name
+
+    with tracing.span('getpaid.outer'):
+        assert run_awaitable(current_span_name()) == 'getpaid.outer'
@@ -0,0 +1,201 @@
+"""Tests for two-phase payment operations."""
+
+import asyncio
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+import swapper
+from django.core.management import call_command
+from django.db import connections
+from django.utils import timezone
+
+from getpaid.backends.dummy.processor import (
+    PaymentProcessor as DummyPaymentProcessor,
+)
+from getpaid.exceptions import InvalidTransitionError, OperationInProgressError
+from getpaid.models import PaymentOperation, PaymentOperationStatus
+from getpaid.types import PaymentStatus as ps
+
+pytestmark = pytest.mark.django_db
+
+Payment = swapper.load_model('getpaid', 'Payment')
+
+
+@pytest.fixture(autouse=True)
+def _two_phase(settings):
+    settings.GETPAID = {'TWO_PHASE_OPERATIONS': True}
+
+
+@pytest.fixture
+def locked_payment(payment_factory):
+    payment = payment_factory(status=ps.PRE_AUTH)
+    payment.amount_locked = payment.amount_required
+    payment.save()
+    return payment
+
+
+def _record_transaction_state(seen):
+    # Processor coroutines run on the runner thread; look at the
+    # connection of the thread that called the payment method.
+    caller_connection = connections['default']
+    original = DummyPaymentProcessor.charge
+
+    async def charge(self, amount=None, **kwargs):
+        seen.append(caller_connection.in_atomic_block)
+        return await original(self, amount=amount, **kwargs)
+
+    return patch.object(DummyPaymentProcessor, 'charge', charge)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_gateway_call_runs_outside_transaction(locked_payment):
+    seen = []
+
+    with _record_transaction_state(seen):
+        locked_payment.charge(amount=locked_payment.amount_required)
+
+    assert seen == [False]
+    locked_payment.refresh_from_db()
+    assert locked_payment.status == ps.PAID
+    intent = PaymentOperation.objects.get()
+    assert intent.operation == 'charge'
+    assert intent.status == PaymentOperationStatus.APPLIED
+    assert intent.status_before == ps.PRE_AUTH
+    assert intent.amount == locked_payment.amount_required
+    assert intent.finished_on is not None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_gateway_call_runs_in_transaction_by_default(settings, locked_payment):
+    settings.GETPAID = {}
+    seen = []
+
+    with _record_transaction_state(seen):
+        locked_payment.charge(amount=locked_payment.amount_required)
+
+    assert seen == [True]
+    assert not PaymentOperation.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_status_fetch_does_not_lock_during_gateway_call(payment_factory):
+    payment = payment_factory(status=ps.PREPARED)
+    caller_connection = connections['default']
+    original = DummyPaymentProcessor.fetch_payment_status
+    seen = []
+
+    async def fetch(self, **kwargs):
+        seen.append(caller_connection.in_atomic_block)
+        return await original(self, **kwargs)
+
+    with patch.object(DummyPaymentProcessor, 'fetch_payment_status', fetch):
+        payment.fetch_and_update_status()
+
+    assert seen == [False]
+    payment.refresh_from_db()
+    assert payment.status == ps.PAID
+
+
+def test_gateway_failure_marks_intent_failed(locked_payment):
+    async def charge(self, amount=None, **kwargs):
+        await asyncio.sleep(0)
+        raise RuntimeError('gateway down')
+
+    with (
+        patch.object(DummyPaymentProcessor, 'charge', charge),
+        pytest.raises(RuntimeError),
+    ):
+        locked_payment.charge()
+
+    intent = PaymentOperation.objects.get()
+    assert intent.status == PaymentOperationStatus.FAILED
+    assert intent.error == 'gateway down'
+    locked_payment.refresh_from_db()
+    assert locked_payment.status == ps.PRE_AUTH
+
+
+def test_update_is_checked_against_reloaded_payment(locked_payment):
+    from getpaid.bridge import ProcessorBridge
+
+    def racing_call(processor, method, **kwargs):
+        result = ProcessorBridge().call(processor, method, **kwargs)
+        Payment.objects.filter(pk=locked_payment.pk).update(status=ps.FAILED)
+        return result
+
+    with (
+        patch('getpaid.operations.bridge.call', side_effect=racing_call),
+        pytest.raises(InvalidTransitionError),
+    ):
+        locked_payment.charge()
+
+    assert locked_payment.status == ps.FAILED
+    intent = PaymentOperation.objects.get()
+    assert intent.status == PaymentOperationStatus.FAILED
+    assert 'Cannot charge' in intent.error
+
+
+def test_second_operation_waits_for_pending_one(locked_payment):
+    PaymentOperation.objects.create(
+        payment_id=str(locked_payment.pk),
+        backend=locked_payment.backend,
+        operation='charge',
+        status_before=ps.PRE_AUTH,
+    )
+
+    with pytest.raises(OperationInProgressError):
+        locked_payment.release_lock()
+
+    locked_payment.refresh_from_db()
+    assert locked_payment.status == ps.PRE_AUTH
+
+
+class TestRecovery:
+    def _stale_intent(self, payment):
+        return PaymentOperation.objects.create(
+            payment_id=str(payment.pk),
+            backend=payment.backend,
+            operation='fetch_status',
+            status_before=payment.status,
+            created_on=timezone.now() - timedelta(hours=1),
+        )
+
+    def test_command_fetches_status_of_stale_intents(self, payment_factory):
+        payment = payment_factory(status=ps.PREPARED)
+        stale = self._stale_intent(payment)
+        recent = PaymentOperation.objects.create(
+            payment_id='other',
+            backend=payment.backend,
+            operation='charge',
+            status_before=ps.PRE_AUTH,
+        )
+        out = io.StringIO()
+
+        call_command('getpaid_recover_operations', stdout=out)
+
+        assert 'Reconciled 1 operation(s).' in out.getvalue()
+        stale.refresh_from_db()
+        assert stale.status == PaymentOperationStatus.ABANDONED
+        recent.refresh_from_db()
+        assert recent.status == PaymentOperationStatus.PENDING
+        payment.refresh_from_db()
+        assert payment.status == ps.PAID
+
+    def test_unsupported_status_fetch_is_reported(self, payment_factory):
+        payment = payment_factory(status=ps.PREPARED)
+        stale = self._stale_intent(payment)
+
+        async def fetch(self, **kwargs):
+            raise NotImplementedError
+
+        err = io.StringIO()
+        with patch.object(DummyPaymentProcessor, 'fetch_payment_status', fetch):
+            call_command(
+                'getpaid_recover_operations', stdout=io.StringIO(), stderr=err
+            )
+
+        stale.refresh_from_db()
+        assert stale.status == PaymentOperationStatus.ABANDONED
+        assert 'reconcile manually' in stale.error
+        assert f'Operation {stale.pk}' in err.getvalue()